@@ -0,0 +1,170 @@
+# ============================================================
+# 🏗️ Referenz-Build – Quarto-Dokumente → Abschnitts-Fragmente + Index
+# ============================================================
+#
+# Zerlegt quarto/formulas.qmd und quarto/python_syntax_reference.qmd an den
+# ##-Überschriften in Abschnitte, schreibt jeden Abschnitt als kleines
+# Markdown-Fragment nach app/reference/<doc>/<slug>.md und legt daneben
+# index.json an (Titel, Keyword-Index, passende Abschnitte je Task-Kategorie).
+# Die App lädt damit nie das ganze (>1 MB) HTML, sondern nur einen Abschnitt.
+#
+#   python app/build_reference.py
+#
+# Nach Änderungen an den .qmd-Dateien erneut ausführen und das Ergebnis committen.
+#
+import json
+import re
+import shutil
+from collections import Counter
+from pathlib import Path
+
+from reference import REFERENCE_DIR, Reference, tokenize
+
+ROOT = Path(__file__).resolve().parent.parent
+SOURCES = {
+    "formulas": ROOT / "quarto" / "formulas.qmd",
+    "syntax": ROOT / "quarto" / "python_syntax_reference.qmd",
+}
+TASKS_PATH = Path(__file__).parent / "tasks.json"
+
+TITLE_WEIGHT = 3.0
+SECTIONS_PER_CATEGORY = 6
+
+# Wörter/Wortpaare der Kategorienamen → Begriffe, unter denen die Referenz das Thema führt
+CATEGORY_TERMS = {
+    "variables": ["variables", "assignment", "type"],
+    "types": ["type", "numeric"],
+    "lists": ["lists"],
+    "dictionaries": ["dictionaries", "dict"],
+    "sets": ["sets", "union", "intersection"],
+    "tuples": ["tuples"],
+    "string": ["strings"],
+    "control": ["control flow"],
+    "loops": ["loops"],
+    "conditionals": ["control flow"],
+    "functions": ["functions"],
+    "object": ["classes"],
+    "oop": ["classes"],
+    "inheritance": ["classes"],
+    "numpy": ["numpy"],
+    "pandas": ["pandas"],
+    "merging": ["pandas", "reshaping"],
+    "data manipulation": ["pandas"],
+    "advanced data": ["pandas"],
+    "integration data": ["pandas"],
+    "matplotlib": ["matplotlib"],
+    "regular": ["strings"],
+    "debugging": ["type", "identity"],
+    "fun": ["fibonacci", "palindrome"],
+}
+
+HEADING_RE = re.compile(r"^(#{1,2})\s+(.*\S)\s*$")
+RULE_RE = re.compile(r"^-{3,}\s*$")
+
+
+def strip_front_matter(text):
+    if text.startswith("---"):
+        end = text.find("\n---", 3)
+        if end != -1:
+            return text[end + 4:]
+    return text
+
+
+def split_sections(text):
+    """Yield (group, title, body lines) per ## section; # headings only set the group."""
+    group, title, body, in_code = None, None, [], False
+    for line in strip_front_matter(text).splitlines():
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+        match = None if in_code else HEADING_RE.match(line)
+        if match:
+            if title is not None:
+                yield group, title, body
+            level, heading = match.groups()
+            if level == "#":
+                group, title, body = heading, None, []
+            else:
+                title, body = heading, []
+        elif title is not None:
+            body.append(line)
+    if title is not None:
+        yield group, title, body
+
+
+def render_fragment(body):
+    """Markdown that st.markdown renders directly (no horizontal rules, trimmed blank lines)."""
+    lines = [line.rstrip() for line in body if not RULE_RE.match(line)]
+    text = re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+    return text + "\n"
+
+
+def slugify(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def build_index(sections, texts):
+    index = {}
+    for pos, (section, text) in enumerate(zip(sections, texts)):
+        weights = Counter(tokenize(text))
+        for token in tokenize(f"{section['group'] or ''} {section['title']}"):
+            weights[token] += TITLE_WEIGHT
+        for token, weight in weights.items():
+            index.setdefault(token, []).append([pos, round(float(weight), 2)])
+    return dict(sorted(index.items()))
+
+
+def category_sections(reference, categories):
+    mapping = {}
+    for category in categories:
+        name = re.sub(r"\(.*?\)", " ", category)
+        tokens = tokenize(name)
+        keys = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        terms = [term for key in keys for term in CATEGORY_TERMS.get(key, [])]
+        scores = Counter()
+        for term in dict.fromkeys(terms):
+            for rank, section in enumerate(reference.search(term, limit=SECTIONS_PER_CATEGORY)):
+                scores[reference.sections.index(section)] += SECTIONS_PER_CATEGORY - rank
+        mapping[category] = [pos for pos, _ in scores.most_common(SECTIONS_PER_CATEGORY)]
+    return mapping
+
+
+def main():
+    if REFERENCE_DIR.exists():
+        shutil.rmtree(REFERENCE_DIR)
+
+    sections, texts = [], []
+    for doc, path in SOURCES.items():
+        (REFERENCE_DIR / doc).mkdir(parents=True)
+        seen = Counter()
+        for group, title, body in split_sections(path.read_text(encoding="utf-8")):
+            slug = slugify(title)
+            seen[slug] += 1
+            if seen[slug] > 1:
+                slug = f"{slug}-{seen[slug]}"
+            fragment = render_fragment(body)
+            rel_path = f"{doc}/{slug}.md"
+            (REFERENCE_DIR / rel_path).write_text(fragment, encoding="utf-8")
+            sections.append({"id": f"{doc}/{slug}", "doc": doc, "group": group, "title": title, "path": rel_path})
+            texts.append(fragment)
+
+    data = {"sections": sections, "index": build_index(sections, texts), "categories": {}}
+    index_path = REFERENCE_DIR / "index.json"
+    index_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+    with open(TASKS_PATH, encoding="utf-8") as f:
+        categories = sorted({t["category"] for t in json.load(f)})
+    data["categories"] = category_sections(Reference(REFERENCE_DIR), categories)
+    index_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+    total = sum(p.stat().st_size for p in REFERENCE_DIR.rglob("*") if p.is_file())
+    largest = max(len(t.encode("utf-8")) for t in texts)
+    print(f"✅ {len(sections)} Abschnitte, {len(data['index'])} Keywords → {REFERENCE_DIR} "
+          f"({total / 1024:.0f} KB gesamt, index.json {index_path.stat().st_size / 1024:.0f} KB, "
+          f"größtes Fragment {largest / 1024:.1f} KB)")
+    for category, positions in data["categories"].items():
+        if not positions:
+            print(f"⚠️ keine Referenz für Kategorie: {category}")
+
+
+if __name__ == "__main__":
+    main()
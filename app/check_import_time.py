@@ -0,0 +1,139 @@
+# ============================================================
+# ⏱️ Kaltstart-Budget – erste Session von streamlit_app.py bis zum ersten Paint
+# ============================================================
+#
+# Startet die App in einem frischen Interpreter mit streamlit.testing.AppTest
+# (Streamlit selbst ist geladen, wie in einem laufenden Server) und misst die
+# Zeit bis zum ersten gerenderten Element (erste Delta-Nachricht) sowie bis
+# zum Ende des ersten Skriptlaufs. Schlägt fehl, wenn
+#   • der erste Paint das Budget überschreitet oder
+#   • ein schweres Paket schon durch die Imports auf Modulebene geladen wird.
+#
+# Zur Diagnose zeigt `python -X importtime` die teuersten Top-Level-Imports.
+#
+#   python app/check_import_time.py --budget-ms 1500
+#
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+APP_PATH = Path(__file__).parent / "streamlit_app.py"
+
+# läuft im frischen Interpreter: Zeit bis zur ersten Delta-Nachricht und bis zum Skriptende
+FIRST_PAINT_PROBE = """
+import json, sys, time
+from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+from streamlit.testing.v1 import AppTest
+
+first = []
+enqueue = ForwardMsgQueue.enqueue
+
+def timed_enqueue(self, msg):
+    if not first and msg.WhichOneof("type") == "delta":
+        first.append(time.perf_counter())
+    return enqueue(self, msg)
+
+ForwardMsgQueue.enqueue = timed_enqueue
+start = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+end = time.perf_counter()
+print(json.dumps({"first_paint": (first[0] - start) * 1000 if first else None,
+                  "script_run": (end - start) * 1000, "exceptions": len(at.exception)}))
+"""
+
+# dürfen erst bei der ersten Verwendung geladen werden
+DEFERRED_MODULES = {
+    "pandas", "altair", "supabase", "requests", "streamlit_ace",
+    "matplotlib", "seaborn", "scipy", "review_log",
+}
+
+
+def module_level_imports(path):
+    """Import statements that run at module level (not inside functions or blocks)."""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def measure(statements):
+    """Run ``statements`` under -X importtime; return {module: (self_us, cumulative_us, depth)}."""
+    env = {**os.environ, "PYTHONPATH": str(APP_PATH.parent)}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "\n".join(statements)],
+        cwd=APP_PATH.parent, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, package = line[len("import time:"):].split("|")
+        depth = (len(package) - len(package.lstrip()) - 1) // 2
+        modules[package.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def measure_first_paint():
+    """{first_paint, script_run} in ms (plus exception count) for one cold session in a fresh interpreter."""
+    env = {**os.environ, "PYTHONPATH": str(APP_PATH.parent), "MPLBACKEND": "Agg"}
+    proc = subprocess.run(
+        [sys.executable, "-c", FIRST_PAINT_PROBE, str(APP_PATH)],
+        cwd=APP_PATH.parent, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "app run failed")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start (first paint) budget for streamlit_app.py.")
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="bis zum ersten gerenderten Element")
+    parser.add_argument("--runs", type=int, default=3, help="bester von N Läufen (Rauschen)")
+    args = parser.parse_args()
+
+    paints = [measure_first_paint() for _ in range(args.runs)]
+    best = min(paints, key=lambda run: run["first_paint"] if run["first_paint"] is not None else float("inf"))
+    first_paint = best["first_paint"]
+
+    statements = module_level_imports(APP_PATH)
+    startup = set(measure([]))  # Interpreter-Start (site, encodings, ...) nicht mitzählen
+    modules = {name: stats for name, stats in measure(statements).items() if name not in startup}
+    top_level = sorted(
+        ((name, cum) for name, (_, cum, depth) in modules.items() if depth == 0),
+        key=lambda item: -item[1],
+    )
+
+    if first_paint is None:
+        print(f"{APP_PATH.name}: kein Element gerendert ({best['script_run']:.0f} ms Skriptlauf)")
+    else:
+        print(f"Erster Paint von {APP_PATH.name}: {first_paint:.0f} ms (Budget {args.budget_ms:.0f} ms), "
+              f"erster Skriptlauf komplett: {best['script_run']:.0f} ms")
+    print(f"Top-Level-Imports im frischen Interpreter (inkl. streamlit): {sum(cum for _, cum in top_level) / 1000:.0f} ms")
+    for name, cum in top_level[:10]:
+        print(f"  {cum / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if best["exceptions"]:
+        failures.append(f"{best['exceptions']} Exception(s) im ersten Skriptlauf")
+    eager = sorted({name.split(".")[0] for name in modules} & DEFERRED_MODULES)
+    if eager:
+        failures.append(f"vor dem ersten Paint geladen: {', '.join(eager)}")
+    if first_paint is None:
+        failures.append("kein Element gerendert")
+    elif first_paint > args.budget_ms:
+        failures.append(f"Budget überschritten: {first_paint:.0f} ms > {args.budget_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Kaltstart-Budget eingehalten.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+# ============================================================
+# 📓 Notebook-Check – Notebook-Lauf == frischer Lauf (Namespace + Ausgabe)
+# ============================================================
+#
+# Für jede Musterlösung (und einige gezielte Fälle) wird eine Notebook-Session
+# durch eine Folge von Editor-Ständen geschickt: Original, unverändert, dann
+# jede Zelle einzeln "geändert" (in `if True:` verpackt – gleiche Semantik,
+# anderer AST). Nach jedem Schritt muss der Notebook-Lauf dasselbe liefern wie
+# run_code auf demselben Code in einem frischen Namespace:
+#
+#   • dieselben Nutzer-Namen mit gleichen Werten (DataFrames, Arrays, Objekte)
+#   • dieselbe Ausgabe (stdout) und derselbe Fehler-Typ
+#   • dieselben st.*-Aufrufe (Figuren inklusive)
+#
+# Lösungen, die schon frisch zweimal Verschiedenes liefern (Zufall ohne Seed,
+# Uhrzeit), werden übersprungen.
+#
+#   python app/check_notebook.py --limit 100
+#
+import argparse
+import ast
+import json
+import math
+import os
+import sys
+import tempfile
+import types
+from pathlib import Path
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+from executor import StreamlitRecorder, build_user_globals, run_code  # noqa: E402
+from notebook import NotebookStore  # noqa: E402
+from sandbox import _serve_datasets  # noqa: E402
+
+TASKS_PATH = Path(__file__).parent / "tasks.json"
+BASE = build_user_globals()  # vorgeladene Module – gleiche Objekte in jedem Namespace
+
+# (Name, Original, geänderter Stand) – Änderungen, die der Notebook-Modus früher falsch nachgezogen hat
+CASES = [
+    ("Aufruf mit Keyword-Argument",
+     "def add(l):\n    l.append(1)\nxs = []\nadd(xs)\nprint(xs)",
+     "def add(l):\n    l.append(1)\nxs = []\nadd(l=xs)\nprint(xs)"),
+    ("Funktion ändert globale Liste",
+     "xs = []\ndef f():\n    xs.append(1)\nf()\nprint(xs)",
+     "xs = []\ndef f():\n    xs.append(1)\nr = f()\nprint(xs)"),
+    ("Methode ändert Objekt",
+     "class A:\n    def __init__(self):\n        self.n = 0\n    def inc(self):\n        self.n += 1\n"
+     "a = A()\na.inc()\nprint(a.n)",
+     "class A:\n    def __init__(self):\n        self.n = 0\n    def inc(self):\n        self.n += 1\n"
+     "a = A()\n_ = a.inc()\nprint(a.n)"),
+    ("Comprehension mit Seiteneffekt",
+     "xs = []\n[xs.append(i) for i in range(3)]\nprint(xs)",
+     "xs = []\n_ = [xs.append(i) for i in range(3)]\nprint(xs)"),
+    ("random mit Seed",
+     "import random\nrandom.seed(1)\nx = random.random()\ny = random.random()\nprint(x, y)",
+     "import random\nrandom.seed(1)\nx = random.random()\ny = random.random() + 0\nprint(x, y)"),
+    ("np.random mit Seed",
+     "import numpy as np\nnp.random.seed(0)\na = np.random.rand(3)\nb = np.random.rand(3)",
+     "import numpy as np\nnp.random.seed(0)\na = np.random.rand(3)\nb = np.random.rand(3) * 1"),
+    ("pandas inplace",
+     "import pandas as pd\ndf = pd.DataFrame({'a': [1, None]})\ndf.dropna(inplace=True)\nprint(len(df))",
+     "import pandas as pd\ndf = pd.DataFrame({'a': [1, None]})\ndf.dropna(inplace=True, axis=0)\nprint(len(df))"),
+    ("Plot in früherer Zelle",
+     "import matplotlib.pyplot as plt\nxs = [1, 2, 3]\nplt.plot(xs)\nst.pyplot(plt.gcf())\nprint('ok')",
+     "import matplotlib.pyplot as plt\nxs = [1, 2, 3]\nplt.plot(xs)\nst.pyplot(plt.gcf())\nprint('ok!')"),
+    ("df.plot + st.pyplot",
+     "import pandas as pd\ndf = pd.DataFrame({'a': [1, 2]})\ndf.plot()\nst.pyplot()",
+     "import pandas as pd\ndf = pd.DataFrame({'a': [1, 2]})\ndf.plot()\nst.pyplot(clear_figure=True)"),
+]
+
+
+# ============================
+# ⚖️ Vergleich
+# ============================
+def same(a, b, depth=0):
+    """Value equality that works for DataFrames, arrays, user objects, functions and figures."""
+    if type(a).__name__ != type(b).__name__:
+        return False
+    if depth > 4 or a is b:
+        return True
+    module = type(a).__module__
+    if isinstance(a, types.ModuleType):
+        return a.__name__ == b.__name__
+    if isinstance(a, (types.FunctionType, types.MethodType, type)):
+        return a.__qualname__ == b.__qualname__
+    if module.startswith(("matplotlib", "seaborn")) or isinstance(a, StreamlitRecorder):
+        return True
+    if module.startswith("pandas") and hasattr(a, "equals"):
+        return a.equals(b)
+    if module == "numpy" and hasattr(a, "shape"):
+        import numpy as np
+
+        try:
+            return a.shape == b.shape and bool(np.array_equal(a, b, equal_nan=a.dtype.kind in "fc"))
+        except TypeError:
+            return bool(np.array_equal(a, b))
+    if isinstance(a, float):
+        return a == b or (math.isnan(a) and math.isnan(b))
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(same(x, y, depth + 1) for x, y in zip(a, b))
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(same(a[k], b[k], depth + 1) for k in a)
+    if module == "__main__" and hasattr(a, "__dict__"):
+        return same(vars(a), vars(b), depth + 1)
+    try:
+        return bool(a == b)
+    except Exception:
+        return repr(a) == repr(b)
+
+
+def snapshot(result):
+    return {k: v for k, v in result.globals.items()
+            if not k.startswith("__") and BASE.get(k, k) is not v and not isinstance(v, StreamlitRecorder)}
+
+
+def differences(notebook, fresh):
+    """What the notebook result gets wrong compared to a fresh run."""
+    problems = []
+    if notebook.stdout != fresh.stdout:
+        problems.append(f"stdout {notebook.stdout[-80:]!r} ≠ {fresh.stdout[-80:]!r}")
+    if type(notebook.error).__name__ != type(fresh.error).__name__:
+        problems.append(f"Fehler {notebook.error!r} ≠ {fresh.error!r}")
+    if [c[0] for c in notebook.st_calls] != [c[0] for c in fresh.st_calls]:
+        problems.append(f"st.* {[c[0] for c in notebook.st_calls]} ≠ {[c[0] for c in fresh.st_calls]}")
+    ours, theirs = snapshot(notebook), snapshot(fresh)
+    if ours.keys() != theirs.keys():
+        problems.append(f"Namen {sorted(ours.keys() ^ theirs.keys())}")
+    for name in ours.keys() & theirs.keys():
+        if not same(ours[name], theirs[name]):
+            problems.append(f"`{name}`: {ours[name]!r:.60} ≠ {theirs[name]!r:.60}")
+    return problems
+
+
+def deterministic(source):
+    first, second = run_code(source), run_code(source)
+    return not differences(first, second), second
+
+
+# ============================
+# 🔁 Editor-Folgen
+# ============================
+def cell_edits(source):
+    """The source with each top-level statement wrapped in ``if True:`` in turn (same meaning, new AST)."""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return []
+    variants = []
+    for i in range(len(tree.body)):
+        body = list(tree.body)
+        body[i] = ast.If(test=ast.Constant(True), body=[body[i]], orelse=[])
+        variants.append(ast.unparse(ast.fix_missing_locations(ast.Module(body=body, type_ignores=[]))))
+    return variants
+
+
+def check_sequence(store, key, sources):
+    """Run ``sources`` one after another in one notebook session; problems per step."""
+    problems = []
+    for step, source in enumerate(sources):
+        ok, fresh = deterministic(source)
+        if not ok:
+            return None
+        notebook = store.run(key, source)
+        problems.extend(f"Schritt {step}: {p}" for p in differences(notebook, fresh))
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Notebook mode must match a fresh run.")
+    parser.add_argument("--limit", type=int, default=0, help="nur die ersten N Musterlösungen (0 = alle)")
+    args = parser.parse_args()
+    # wie ein Sandbox-Worker: eigenes Temp-Verzeichnis, "data/..." liest aus dem Repo
+    workdir = tempfile.TemporaryDirectory(prefix="check-notebook-")
+    os.chdir(workdir.name)
+    _serve_datasets()
+
+    with open(TASKS_PATH, encoding="utf-8") as f:
+        tasks = json.load(f)
+    if args.limit:
+        tasks = tasks[:args.limit]
+
+    store = NotebookStore()
+    failures, skipped, checked = [], 0, 0
+    for name, before, after in CASES:
+        problems = check_sequence(store, ("case", name), [before, before, after, before])
+        checked += 1
+        failures.extend(f"{name}: {p}" for p in problems or [])
+
+    for task in tasks:
+        source = task.get("solution_code") or ""
+        problems = check_sequence(store, ("task", task["id"]), [source, source, *cell_edits(source), source])
+        if problems is None:
+            skipped += 1
+            continue
+        checked += 1
+        failures.extend(f"Task {task['id']}: {p}" for p in problems)
+
+    print(f"{checked} Code-Folgen geprüft ({len(CASES)} gezielte Fälle), {skipped} nicht deterministisch übersprungen")
+    for failure in failures[:30]:
+        print(f"❌ {failure}")
+    if failures:
+        print(f"… {len(failures)} Abweichungen")
+        sys.exit(1)
+    print("✅ Notebook-Läufe entsprechen frischen Läufen.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+# ============================================================
+# 📮 Outbox-Check – Senden, Retry, Leases und Dedup gegen einen lokalen Gist-Stub
+# ============================================================
+#
+# Ein lokaler HTTP-Server nimmt POSTs wie die Gist-API entgegen (prüft Header
+# und Payload-Form, antwortet nach Drehbuch mit 201 oder Fehlercodes). Jeder
+# Fall bekommt eine frische Outbox-Datei:
+#
+#   1. submit → drain: Zeile wird gesendet, gist_url gespeichert
+#   2. 503 → Retry: Backoff, erst fällig wieder versucht, dann gesendet;
+#      4xx und max_attempts enden als "failed"
+#   3. Leases: gültiger Lease eines anderen Prozesses blockiert, ein
+#      abgelaufener wird übernommen; zwei Sender auf einer Datei posten jede
+#      Zeile genau einmal
+#   4. Dedup: doppeltes submit ergibt eine Zeile; nach dem Senden darf
+#      dasselbe Issue erneut gemeldet werden
+#   5. Migration: alte Outbox (UNIQUE dedup_key, ohne Lease-Spalte)
+#
+#   python app/check_outbox.py
+#
+import json
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from issue_outbox import IssueOutbox
+
+TOKEN = "stub-token"
+
+
+# ============================
+# 🧪 Gist-Stub
+# ============================
+class GistStub:
+    """Local stand-in for POST /gists; ``script`` holds the status codes for the next requests (then 201)."""
+
+    def __init__(self):
+        self.posts = []
+        self.problems = []
+        self.script = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub._validate(self.path, self.headers, body)
+                with stub._lock:
+                    stub.posts.append(body)
+                    status = stub.script.pop(0) if stub.script else 201
+                    number = len(stub.posts)
+                reply = {"html_url": f"https://gist.example/{number}"} if status == 201 else {"message": "stub"}
+                data = json.dumps(reply).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/gists"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def _validate(self, path, headers, body):
+        """Request shape of https://docs.github.com/rest/gists/gists#create-a-gist."""
+        if path != "/gists":
+            self.problems.append(f"Pfad {path}")
+        if headers.get("Authorization") != f"token {TOKEN}":
+            self.problems.append(f"Authorization {headers.get('Authorization')!r}")
+        if "application/vnd.github+json" not in headers.get("Accept", ""):
+            self.problems.append(f"Accept {headers.get('Accept')!r}")
+        files = body.get("files")
+        if body.get("public") is not False or not isinstance(files, dict) or len(files) != 1:
+            self.problems.append(f"Payload {body!r:.80}")
+            return
+        (name, file), = files.items()
+        if not name.startswith("issue_task_") or not isinstance(file.get("content"), str):
+            self.problems.append(f"Datei {name!r}")
+
+    def reset(self, script=()):
+        with self._lock:
+            self.posts, self.script = [], list(script)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# ============================
+# 📋 Fälle
+# ============================
+def rows(outbox):
+    with outbox._connect() as conn:
+        return [dict(row) for row in conn.execute("SELECT * FROM outbox ORDER BY id")]
+
+
+def case_submit_drain(tmp, stub):
+    outbox = IssueOutbox(tmp / "a.sqlite3", TOKEN, api_url=stub.url)
+    problems = []
+    if not outbox.submit(7, {"title": "Tippfehler"}):
+        problems.append("submit meldet Duplikat")
+    sent = outbox.drain_once()
+    (row,) = rows(outbox)
+    if sent != 1 or row["status"] != "sent" or row["gist_url"] != "https://gist.example/1":
+        problems.append(f"gesendet={sent}, Zeile {row['status']}/{row['gist_url']}")
+    if json.loads(stub.posts[0]["files"]["issue_task_7.json"]["content"]) != {"title": "Tippfehler"}:
+        problems.append("Payload-Inhalt verändert")
+
+    # derselbe Weg über den Hintergrund-Thread
+    outbox.start()
+    outbox.submit(8, {"title": "Thread"})
+    deadline = time.time() + 5
+    while outbox.pending_count() and time.time() < deadline:
+        time.sleep(0.02)
+    outbox.stop()
+    if outbox.pending_count() or len(stub.posts) != 2:
+        problems.append(f"Hintergrund-Thread: {outbox.pending_count()} wartend, {len(stub.posts)} POSTs")
+    return problems
+
+
+def case_retry(tmp, stub):
+    problems = []
+    stub.reset([503, 201])
+    outbox = IssueOutbox(tmp / "b.sqlite3", TOKEN, api_url=stub.url, base_backoff=30.0)
+    outbox.submit(1, {"title": "Retry"})
+    first = outbox.drain_once()
+    (row,) = rows(outbox)
+    if first or row["status"] != "pending" or row["attempts"] != 1 or not row["last_error"].startswith("HTTP 503"):
+        problems.append(f"nach 503: {row['status']}, Versuche {row['attempts']}, Fehler {row['last_error']!r:.30}")
+    if not 24 <= row["next_attempt"] - time.time() <= 36:  # base_backoff ± 20 % Jitter
+        problems.append(f"Backoff {row['next_attempt'] - time.time():.1f} s statt ~30 s")
+    if outbox.drain_once() or len(stub.posts) != 1:
+        problems.append("vor Ablauf des Backoffs erneut gesendet")
+    if outbox.drain_once(now=row["next_attempt"] + 1) != 1 or rows(outbox)[0]["status"] != "sent":
+        problems.append("nach dem Backoff nicht gesendet")
+    elif rows(outbox)[0]["attempts"] != 2:
+        problems.append(f"Versuche {rows(outbox)[0]['attempts']} statt 2")
+
+    stub.reset([422])
+    outbox.submit(2, {"title": "kaputt"})
+    outbox.drain_once()
+    if rows(outbox)[1]["status"] != "failed":
+        problems.append("422 nicht als failed markiert")
+
+    stub.reset([500, 500])
+    capped = IssueOutbox(tmp / "b2.sqlite3", TOKEN, api_url=stub.url, base_backoff=0.0, max_attempts=2)
+    capped.submit(3, {"title": "gibt auf"})
+    capped.drain_once()
+    capped.drain_once()
+    (row,) = rows(capped)
+    if row["status"] != "failed" or row["attempts"] != 2 or len(stub.posts) != 2:
+        problems.append(f"max_attempts: {row['status']} nach {row['attempts']} Versuchen, {len(stub.posts)} POSTs")
+    return problems
+
+
+def case_leases(tmp, stub):
+    problems = []
+    stub.reset()
+    path = tmp / "c.sqlite3"
+    crashed = IssueOutbox(path, TOKEN, api_url=stub.url)  # "Prozess", der mitten im Senden abstürzt
+    survivor = IssueOutbox(path, TOKEN, api_url=stub.url)
+    crashed.submit(1, {"title": "Lease"})
+    row_id = rows(crashed)[0]["id"]
+
+    if not crashed._claim(row_id, time.time()):
+        problems.append("freie Zeile nicht geleast")
+    if survivor.drain_once() or stub.posts:
+        problems.append("gültiger Lease eines anderen Senders ignoriert")
+    if survivor._claim(row_id, time.time()):
+        problems.append("Lease doppelt vergeben")
+
+    with survivor._connect() as conn:  # Lease läuft ab, als wäre er vor LEASE_SECONDS vergeben worden
+        conn.execute("UPDATE outbox SET claimed_until = ? WHERE id = ?", (time.time() - 1, row_id))
+    if survivor.drain_once() != 1 or rows(survivor)[0]["status"] != "sent" or len(stub.posts) != 1:
+        problems.append("abgelaufener Lease nicht übernommen")
+
+    # zwei Sender leeren dieselbe Datei gleichzeitig → jede Zeile genau ein POST
+    stub.reset()
+    for i in range(40):
+        crashed.submit(100 + i, {"title": f"Last {i}"})
+    barrier = threading.Barrier(2)
+    counts = []
+
+    def drain(outbox):
+        barrier.wait()
+        counts.append(outbox.drain_once())
+
+    threads = [threading.Thread(target=drain, args=(outbox,)) for outbox in (crashed, survivor)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    posted = sorted(next(iter(post["files"])) for post in stub.posts)
+    if sum(counts) != 40 or len(posted) != 40 or len(set(posted)) != 40:
+        problems.append(f"parallel: {counts} gesendet, {len(posted)} POSTs, {len(set(posted))} verschieden")
+    return problems
+
+
+def case_dedup(tmp, stub):
+    problems = []
+    stub.reset()
+    outbox = IssueOutbox(tmp / "d.sqlite3", TOKEN, api_url=stub.url)
+    data = {"title": "doppelt", "details": "gleich"}
+    first, second = outbox.submit(5, data), outbox.submit(5, data)
+    if (first, second) != (True, False) or outbox.pending_count() != 1:
+        problems.append(f"submit ×2 → {first}/{second}, {outbox.pending_count()} wartend")
+    if not outbox.submit(5, {**data, "details": "anders"}):
+        problems.append("anderes Issue zur selben Aufgabe als Duplikat verworfen")
+    outbox.drain_once()
+    if not outbox.submit(5, data) or len(rows(outbox)) != 3:
+        problems.append("nach dem Senden kein erneutes Melden möglich")
+    return problems
+
+
+def case_migration(tmp, stub):
+    path = tmp / "e.sqlite3"
+    with sqlite3.connect(path) as conn:
+        conn.execute("""CREATE TABLE outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, dedup_key TEXT NOT NULL UNIQUE, task_id INTEGER,
+            payload TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt REAL NOT NULL, created_at REAL NOT NULL, last_error TEXT, gist_url TEXT)""")
+        conn.execute("INSERT INTO outbox (dedup_key, task_id, payload, status, next_attempt, created_at) "
+                     "VALUES ('k', 1, '{}', 'sent', 0, 0)")
+    outbox = IssueOutbox(path, TOKEN, api_url=stub.url)
+    problems = []
+    if len(rows(outbox)) != 1 or "claimed_until" not in rows(outbox)[0]:
+        problems.append("Zeilen oder Lease-Spalte fehlen nach der Migration")
+    with outbox._connect() as conn:
+        conn.execute("INSERT INTO outbox (dedup_key, task_id, payload, next_attempt, created_at) "
+                     "VALUES ('k', 1, '{}', 0, 0)")  # scheiterte am alten UNIQUE
+    return problems
+
+
+CASES = [
+    ("submit → drain", case_submit_drain),
+    ("503 → Retry", case_retry),
+    ("Leases", case_leases),
+    ("Dedup", case_dedup),
+    ("Migration", case_migration),
+]
+
+
+def main():
+    stub = GistStub()
+    failures = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, case in CASES:
+                stub.reset()
+                try:
+                    problems = case(Path(tmp), stub)
+                except Exception as e:
+                    problems = [f"{type(e).__name__}: {e}"]
+                problems += stub.problems
+                stub.problems = []
+                print(f"{name:<16} {'✅' if not problems else '❌'}")
+                failures.extend(f"{name}: {p}" for p in problems)
+    finally:
+        stub.close()
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Outbox sendet jede Meldung genau einmal.")
+
+
+if __name__ == "__main__":
+    main()
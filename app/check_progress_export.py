@@ -0,0 +1,103 @@
+# ============================================================
+# 🔁 Export-Check – Lernstände über mehrere Seiten exportieren und zurücklesen
+# ============================================================
+#
+# Legt synthetische User in einer SQLite-Datei an (Seiten mit unterschiedlichen
+# Rating-Mengen, User ohne Fortschritt, unbewertete Aufgaben), exportiert sie
+# seitenweise als Arrow IPC und Parquet, importiert jede Datei in einen leeren
+# Store und vergleicht Aufgabe für Aufgabe mit dem Original.
+#
+#   python app/check_progress_export.py --users 60 --batch-size 7
+#
+import argparse
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from progress import Progress
+from progress_admin import export_progress, import_progress
+from progress_store import SQLiteProgressStore
+from scheduling import RATINGS, SECONDS_PER_DAY
+
+FIELDS = ("attempts", "rating", "interval", "last_review")
+
+
+def synthetic_users(n_users, seed):
+    """(username, progress dict) pairs; each user rates from its own subset of RATINGS."""
+    rng = random.Random(seed)
+    now = 1_700_000_000.0
+    users = []
+    for i in range(n_users):
+        progress = Progress(60)
+        ratings = RATINGS[i % len(RATINGS):][:1 + i % 2] if i % 5 else ()  # jeder 5. User ohne Bewertung
+        for tid in rng.sample(range(1, 60), rng.randint(0, 12)):
+            if ratings:
+                progress.record_rating(tid, rng.choice(ratings), now=now - rng.uniform(0, 30) * SECONDS_PER_DAY)
+            else:
+                progress.attempts[tid] = rng.randint(1, 3)  # versucht, aber nie bewertet
+        users.append((f"user{i:04d}", progress.to_dict()))
+    return users
+
+
+def compare(expected, actual):
+    """Differences between two progress dicts, field by field over the touched tasks."""
+    a, b = Progress.from_dict(expected), Progress.from_dict(actual)
+    ids_a, ids_b = a.touched_ids(), b.touched_ids()
+    if not np.array_equal(ids_a, ids_b):
+        return [f"Aufgaben {ids_a.tolist()} ≠ {ids_b.tolist()}"]
+    problems = []
+    for name in FIELDS:
+        left, right = getattr(a, name)[ids_a], getattr(b, name)[ids_b]
+        reviewed = a.last_review[ids_a] > 0
+        if name == "interval":  # ohne Review exportiert der Export kein Intervall
+            left, right = left[reviewed], right[reviewed]
+        if not np.array_equal(left, right):
+            problems.append(f"{name}: {left.tolist()} ≠ {right.tolist()}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round-trip check for progress_admin export/import.")
+    parser.add_argument("--users", type=int, default=60)
+    parser.add_argument("--batch-size", type=int, default=7, help="User pro Export-Seite")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    users = synthetic_users(args.users, args.seed)
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        source = SQLiteProgressStore(Path(tmp) / "source.db")
+        source.upsert_many(users)
+        source.create_user("user_leer")  # User ohne jeden Fortschritt
+        expected = dict(page_row for page in source.iter_pages(args.batch_size) for page_row in page)
+
+        for suffix in (".arrow", ".parquet"):
+            path = Path(tmp) / f"export{suffix}"
+            try:
+                export_progress(source, path, args.batch_size)
+                target = SQLiteProgressStore(Path(tmp) / f"target{suffix}.db")
+                import_progress(target, path, args.batch_size)
+            except Exception as e:
+                failures.append(f"{suffix}: {type(e).__name__}: {e}")
+                continue
+            imported = dict(page_row for page in target.iter_pages(args.batch_size) for page_row in page)
+            if imported.keys() != expected.keys():
+                failures.append(f"{suffix}: User {sorted(expected.keys() ^ imported.keys())} fehlen/zu viel")
+            for username in expected.keys() & imported.keys():
+                failures.extend(f"{suffix} {username}: {problem}"
+                                for problem in compare(expected[username], imported[username]))
+            pages = -(-len(expected) // args.batch_size)
+            print(f"{suffix:<9} {len(imported)} User in {pages} Seiten exportiert und zurückgelesen")
+
+    for failure in failures[:20]:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Export → Import ergibt dieselben Lernstände.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# ============================================================
+# 🔁 Rerun-Check – genau eine Skriptausführung pro Interaktion
+# ============================================================
+#
+# Spielt die typischen Zustandswechsel (Filter, Kategorie, Task-ID, Next,
+# Bewertung) mit streamlit.testing.AppTest durch, zählt die Skriptläufe pro
+# Interaktion und schlägt fehl, sobald eine davon mehr als einen Lauf braucht
+# (z. B. durch st.rerun()). Gemessen wird außerdem die Latenz je Interaktion;
+# jeder eingesparte Zusatzlauf spart etwa eine komplette Skriptausführung.
+#
+# Mit 🎯 Fokus und eingeloggtem User darf eine Bewertung die Alias-Tabellen
+# nicht komplett neu aufbauen (WeightedPicker.refresh) – nur das Gewicht der
+# bewerteten Aufgabe ändert sich.
+#
+#   python app/check_reruns.py --repeat 5
+#
+import argparse
+import atexit
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from streamlit.runtime.scriptrunner import script_runner
+from streamlit.testing.v1 import AppTest
+
+from sampling import WeightedPicker
+
+APP_PATH = Path(__file__).parent / "streamlit_app.py"
+
+
+class RunCounter:
+    """Counts script executions, including those started by st.rerun() inside one AppTest.run()."""
+
+    def __init__(self):
+        self.runs = 0
+        self._original = script_runner.exec_func_with_error_handling
+
+    def __enter__(self):
+        def counting(func, ctx):
+            self.runs += 1
+            return self._original(func, ctx)
+
+        script_runner.exec_func_with_error_handling = counting
+        return self
+
+    def __exit__(self, *exc):
+        script_runner.exec_func_with_error_handling = self._original
+
+
+class RefreshCounter:
+    """Counts full WeightedPicker rebuilds (the app imports the same ``sampling`` module)."""
+
+    def __init__(self):
+        self.refreshes = 0
+        self._original = WeightedPicker.refresh
+
+    def __enter__(self):
+        original = self._original
+
+        def counting(picker, *args, **kwargs):
+            self.refreshes += 1
+            return original(picker, *args, **kwargs)
+
+        WeightedPicker.refresh = counting
+        return self
+
+    def __exit__(self, *exc):
+        WeightedPicker.refresh = self._original
+
+
+def title(at):
+    return at.title[0].value if at.title else ""
+
+
+def interactions(at, picker):
+    """(name, action, check) – action triggers the interaction, check validates the result."""
+    return [
+        ("Fokus an", lambda: at.toggle(key="focus_weak").set_value(True),
+         lambda: True),
+        ("Filter → Kategorie", lambda: at.radio(key="filter_mode").set_value("Nach Kategorie"),
+         lambda: at.selectbox(key="filter_cat") is not None),
+        ("Kategorie wechseln", lambda: at.selectbox(key="filter_cat").select_index(3),
+         lambda: True),
+        ("Filter → Task-ID", lambda: at.radio(key="filter_mode").set_value("Direkte Task-ID"),
+         lambda: True),
+        ("Task-ID 42", lambda: at.number_input(key="filter_id").set_value(42),
+         lambda: title(at).startswith("🧠 Task 42/")),
+        ("Nächste Aufgabe", lambda: next(b for b in at.button if "Nächste" in b.label).click(),
+         lambda: any("Nächste Aufgabe: #42" in s.value for s in at.success)),
+        ("Bewertung Mittel", lambda: next(b for b in at.button if "Mittel" in b.label).click(),
+         lambda: any("MEDIUM" in i.value for i in at.info) and picker.refreshes == 0),
+        ("Filter → Alle", lambda: at.radio(key="filter_mode").set_value("Alle Aufgaben"),
+         lambda: True),
+        ("Bewertung Schwer", lambda: next(b for b in at.button if "Schwer" in b.label).click(),
+         lambda: any("HARD" in w.value for w in at.warning) and picker.refreshes == 0),
+    ]
+
+
+def run_once(app_path, workdir, username):
+    """One round; progress store, review log and issue outbox all live in ``workdir``."""
+    at = AppTest.from_file(str(app_path), default_timeout=60)
+    at.secrets["PROGRESS_SQLITE_PATH"] = str(workdir / f"store-{username}.db")
+    at.secrets["REVIEW_LOG_DIR"] = str(workdir / "review_events")
+    at.secrets["ISSUE_OUTBOX_PATH"] = str(workdir / "issue_outbox.sqlite3")
+
+    results = []
+    with RunCounter() as counter, RefreshCounter() as picker:
+        start = time.perf_counter()
+        at.run()
+        results.append(("Erster Aufruf", counter.runs, time.perf_counter() - start, not at.exception))
+
+        at.text_input(key="login_username").set_value(username)
+        at.run()
+
+        for name, action, check in interactions(at, picker):
+            counter.runs = picker.refreshes = 0
+            action()
+            start = time.perf_counter()
+            at.run()
+            elapsed = time.perf_counter() - start
+            results.append((name, counter.runs, elapsed, not at.exception and check()))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assert one script run per interaction.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--app", type=Path, default=APP_PATH)
+    args = parser.parse_args()
+
+    # Zustand der App nur im Temp-Verzeichnis (wie check_notebook). Gelöscht wird es erst beim Prozessende, nach
+    # dem atexit-close des Review-Logs (atexit läuft rückwärts, dieses ist zuerst registriert)
+    workdir = Path(tempfile.mkdtemp(prefix="check-reruns-"))
+    atexit.register(shutil.rmtree, workdir, ignore_errors=True)
+    # get_progress_store ist cache_resource: alle Runden teilen den ersten Store – daher je Runde ein neuer
+    # User, sonst holt die erste Bewertung die Stände der Vorrunde als echte fremde Änderungen
+    rounds = [run_once(args.app.resolve(), workdir, f"rerun-check-{i}") for i in range(args.repeat)]
+
+    failures = []
+    single_runs = []
+    print(f"{'Interaktion':<22} {'Läufe':>5} {'Median':>9}  OK")
+    for column in zip(*rounds):
+        name = column[0][0]
+        runs = max(r[1] for r in column)
+        median = statistics.median(r[2] for r in column)
+        ok = all(r[3] for r in column)
+        if runs == 1:
+            single_runs.append(median)
+        print(f"{name:<22} {runs:>5} {median * 1000:>7.0f}ms  {'✅' if ok and runs == 1 else '❌'}")
+        if runs != 1:
+            failures.append(f"{name}: {runs} Skriptläufe")
+        if not ok:
+            failures.append(f"{name}: Ergebnis falsch, Exception oder Alias-Tabelle neu aufgebaut")
+
+    if single_runs:
+        print(f"\nEin Skriptlauf dauert im Median {statistics.median(single_runs) * 1000:.0f} ms – "
+              f"so viel spart jede Interaktion, die vorher per st.rerun() zweimal lief.")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Jede Interaktion braucht genau einen Skriptlauf.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# ============================================================
+# 📜 Review-Log-Check – Übernahme verwaister Segmente, Absturzsicherheit, append ohne Disk
+# ============================================================
+#
+#   1. Verwaiste Writer: viele beendete Writer mit je einem kleinen Segment
+#      (wie nach Neustarts) → compact fasst sie zusammen, kein Event geht
+#      verloren oder zählt doppelt
+#   2. Absturz beim Kompaktieren: nach dem Eintrag in merged, nach dem
+#      Schreiben des Ziels – Leser sehen jedes Event genau einmal, ein
+#      späterer Writer räumt auf
+#   3. Lebende Writer: deren Segmente werden nicht übernommen
+#   4. Hintergrund-Thread: append wartet nicht auf fsync; close schreibt den Rest
+#   5. Parallel: mehrere Logs schreiben und kompaktieren gleichzeitig
+#
+#   python app/check_review_log.py
+#
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from review_log import ReviewLog
+
+RATINGS = ("hard", "medium", "easy")
+TIMEOUT = 0.2  # beendete Writer (close) gelten sofort, andere nach 0,2 s als verwaist
+
+
+def open_log(directory, **kwargs):
+    return ReviewLog(directory, writer_timeout=TIMEOUT, **kwargs)
+
+
+def write_events(log, n, user="u", start=0):
+    for i in range(n):
+        log.append(f"{user}{i % 3}", 1 + (start + i) % 50, RATINGS[i % 3], 1.0, 1.5, ts=1_700_000_000.0 + start + i)
+
+
+def fingerprint(log):
+    """Sorted (ts, task_id, rating) over everything the log reads – equal means no event lost or doubled."""
+    chunks = list(log.iter_chunks())
+    if not chunks:
+        return np.empty(0)
+    rows = np.concatenate([np.stack([c["ts"], c["task_id"], c["rating"]], axis=1) for c in chunks])
+    return rows[np.lexsort(rows.T[::-1])]
+
+
+def segment_files(directory):
+    return sorted(p.name for p in Path(directory).glob("seg-*.bin"))
+
+
+def retired(directory, n_writers, events_each):
+    """``n_writers`` writers that flushed once and exited (the situation after many restarts)."""
+    for w in range(n_writers):
+        log = open_log(directory)
+        write_events(log, events_each, start=w * 1000)
+        log.close()
+
+
+# ============================
+# 📋 Fälle
+# ============================
+def case_orphans(tmp):
+    problems = []
+    retired(tmp, 18, 7)
+    log = open_log(tmp)
+    before = fingerprint(log)
+    merged = log.compact()
+    after = fingerprint(log)
+    if merged != 18 or len(segment_files(tmp)) != 1:
+        problems.append(f"{merged} übernommen, {len(segment_files(tmp))} Segmente übrig")
+    if not np.array_equal(before, after) or len(after) != 18 * 7:
+        problems.append(f"Events {len(before)} → {len(after)}")
+    return problems
+
+
+def case_crash(tmp):
+    problems = []
+    retired(tmp, 4, 5)
+    expected = fingerprint(open_log(tmp))
+
+    # a) Absturz nach dem Eintrag in merged, bevor das Ziel existiert
+    crashed = open_log(tmp)
+    crashed._write_segment = lambda *args: (_ for _ in ()).throw(OSError("Absturz"))
+    try:
+        crashed.compact()
+    except OSError:
+        pass
+    crashed.close()
+    if not np.array_equal(fingerprint(open_log(tmp)), expected):
+        problems.append("nach Absturz vor dem Ziel: Events fehlen")
+
+    # b) Absturz nach dem Schreiben des Ziels, bevor die Quellen gelöscht sind
+    crashed = open_log(tmp)
+    crashed._remove_merged = lambda: None
+    crashed.compact()
+    crashed.close()
+    leftovers = len(segment_files(tmp))
+    if not np.array_equal(fingerprint(open_log(tmp)), expected):
+        problems.append("nach Absturz vor dem Löschen: Events doppelt oder verloren")
+    if leftovers < 2:
+        problems.append("Absturz nicht nachgestellt (Quellen schon gelöscht)")
+
+    # ein späterer Writer räumt auf
+    later = open_log(tmp)
+    later.compact()
+    if not np.array_equal(fingerprint(later), expected) or len(segment_files(tmp)) != 1:
+        problems.append(f"Aufräumen: {len(segment_files(tmp))} Segmente, Events stimmen "
+                        f"{'' if np.array_equal(fingerprint(later), expected) else 'nicht'}")
+    return problems
+
+
+def case_alive(tmp):
+    problems = []
+    other = open_log(tmp)
+    write_events(other, 10)
+    other.flush()  # lebt weiter (Lebenszeichen frisch)
+    log = open_log(tmp)
+    write_events(log, 10, start=100)
+    log.flush()
+    if log.compact():
+        problems.append("Segment eines lebenden Writers übernommen")
+    return problems
+
+
+def case_background(tmp):
+    problems = []
+    real_fsync = os.fsync
+    os.fsync = lambda fd: (time.sleep(0.5), real_fsync(fd))  # langsame Platte
+    try:
+        log = open_log(tmp, flush_interval=0.0, heartbeat=0.05).start()
+        start = time.perf_counter()
+        write_events(log, 20)
+        elapsed = time.perf_counter() - start
+        if elapsed > 0.2:
+            problems.append(f"20× append dauerte {elapsed:.2f} s – wartet auf fsync")
+        if len(fingerprint(log)) != 20:
+            problems.append("noch nicht geschriebene Events fehlen beim Lesen")
+        log.close()
+    finally:
+        os.fsync = real_fsync
+    if len(fingerprint(open_log(tmp))) != 20:
+        problems.append("close hat nicht alles geschrieben")
+    return problems
+
+
+def case_parallel(tmp):
+    problems = []
+    logs = [open_log(tmp, flush_interval=0.0, compact_after=2, heartbeat=0.01) for _ in range(4)]
+    barrier = threading.Barrier(len(logs))
+
+    def work(i, log):
+        barrier.wait()
+        for round_ in range(10):
+            write_events(log, 5, user=f"w{i}-", start=i * 10_000 + round_ * 5)
+            log.compact()
+        if i % 2:
+            log.close()  # die Hälfte endet – die anderen übernehmen deren Segmente
+
+    threads = [threading.Thread(target=work, args=(i, log)) for i, log in enumerate(logs)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for log in logs[::2]:
+        log.compact()
+    reader = open_log(tmp)
+    rows = fingerprint(reader)
+    if len(rows) != 4 * 10 * 5 or len(np.unique(rows[:, 0])) != len(rows):
+        problems.append(f"{len(rows)} Events gelesen, {len(np.unique(rows[:, 0]))} verschieden (200 erwartet)")
+    return problems
+
+
+CASES = [
+    ("Verwaiste Writer", case_orphans),
+    ("Absturz", case_crash),
+    ("Lebende Writer", case_alive),
+    ("Hintergrund", case_background),
+    ("Parallel", case_parallel),
+]
+
+
+def main():
+    failures = []
+    for name, case in CASES:
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                problems = case(Path(tmp))
+            except Exception as e:
+                problems = [f"{type(e).__name__}: {e}"]
+        print(f"{name:<18} {'✅' if not problems else '❌'}")
+        failures.extend(f"{name}: {p}" for p in problems)
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Review-Log übernimmt verwaiste Segmente, jedes Event zählt genau einmal.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# ============================================================
+# 🎲 Sampling-Check – zieht die Alias-Tabelle wirklich nach den Gewichten?
+# ============================================================
+#
+# 1. Exakt: die von der Tabelle kodierte Verteilung == Gewichte / Summe
+#    (AliasTable und die zweistufige BlockAliasTable)
+# 2. Statistisch: Chi-Quadrat-Anpassungstest auf vielen Ziehungen
+# 3. Inkrementell: Gewichte + Tabelle nach Bewertungen == komplette Neuberechnung
+# 4. Plausibel: hard > medium > easy bei sonst gleichem Stand
+#
+#   python app/check_sampling.py --draws 200000 --seed 0
+#
+# Die Ziehungen sind mit festem Seed reproduzierbar. Mit den Vorgaben liegt
+# jedes p bei ≥ 0,05 – mindestens 50× über ALPHA. Ein anderer --seed ist ein
+# echter Test: jeder χ²-Fall schlägt dann mit Wahrscheinlichkeit ALPHA fehl,
+# obwohl die Tabelle stimmt (ein p um 0,002 kommt bei ~1 von 500 Seeds vor).
+#
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+from scipy import stats
+
+from progress import Progress
+from sampling import AliasTable, BlockAliasTable, WeightedPicker, task_weights
+from scheduling import SECONDS_PER_DAY
+
+ALPHA = 1e-3  # Fehlalarm-Wahrscheinlichkeit je Chi-Quadrat-Test
+MIN_EXPECTED = 5
+
+
+def synthetic_progress(n_tasks, seed, now):
+    """A learner with a mix of unrated, hard, medium and easy tasks at various ages."""
+    rng = random.Random(seed)
+    progress = Progress(n_tasks + 1)
+    for tid in range(1, n_tasks + 1):
+        for _ in range(rng.choice([0, 0, 1, 2, 5])):
+            rating = rng.choice(["hard", "medium", "easy"])
+            progress.record_rating(tid, rating, now=now - rng.uniform(0, 20) * SECONDS_PER_DAY)
+    return progress
+
+
+def weight_cases(now):
+    rng = np.random.default_rng(0)
+    progress = synthetic_progress(460, seed=1, now=now)
+    return {
+        "gleichverteilt": np.ones(50),
+        "schief (Pareto)": rng.pareto(1.5, 200) + 0.01,
+        "mit Nullgewichten": np.array([0.0, 3.0, 0.0, 1.0, 6.0, 0.0]),
+        "ein Element": np.array([2.5]),
+        "460 Aufgaben (Progress)": task_weights(progress, np.arange(1, 461), now),
+    }
+
+
+TABLES = {"Alias": AliasTable, "Block": BlockAliasTable}
+
+
+def check_exact(table_cls, weights):
+    encoded = table_cls(weights).probabilities()
+    error = float(np.abs(encoded - weights / weights.sum()).max())
+    return error < 1e-12, f"max. Abweichung {error:.1e}"
+
+
+def check_chi_square(table_cls, weights, draws, seed):
+    table = table_cls(weights)
+    rng = random.Random(seed)
+    counts = np.bincount([table.sample(rng) for _ in range(draws)], minlength=len(weights))
+    positive = weights > 0
+    if counts[~positive].any():
+        return False, f"{int(counts[~positive].sum())} Ziehungen mit Gewicht 0"
+    if positive.sum() < 2:
+        return True, "nur ein möglicher Wert"
+    observed = counts[positive]
+    expected = draws * weights[positive] / weights[positive].sum()
+    rare = expected < MIN_EXPECTED  # χ² braucht ≥ 5 erwartete Treffer je Klasse → seltene zusammenfassen
+    if rare.any():
+        observed = np.append(observed[~rare], observed[rare].sum())
+        expected = np.append(expected[~rare], expected[rare].sum())
+    p_value = stats.chisquare(observed, expected).pvalue
+    return p_value > ALPHA, f"p = {p_value:.3f}"
+
+
+def check_incremental(now):
+    progress = synthetic_progress(460, seed=2, now=now)
+    ids = np.arange(1, 461)
+    picker = WeightedPicker(ids)
+    picker.pick(progress, rev=0, now=now)
+    for rev, (tid, rating) in enumerate([(17, "hard"), (17, "hard"), (300, "easy"), (42, "medium")], start=1):
+        progress.record_rating(tid, rating, now=now)
+        picker.update(progress, tid, rev, now=now)
+    fresh = task_weights(progress, ids, now)
+    error = float(np.abs(picker.weights - fresh).max())
+    table_error = float(np.abs(picker._table.probabilities() - fresh / fresh.sum()).max())  # ohne Neuaufbau
+    ok = picker.rev == 4 and error < 1e-12 and table_error < 1e-12
+    return ok, f"max. Abweichung {error:.1e} / Tabelle {table_error:.1e}, rev {picker.rev}"
+
+
+def check_ordering(now):
+    progress = Progress(4)
+    for tid, rating in ((1, "hard"), (2, "medium"), (3, "easy")):
+        progress.record_rating(tid, rating, now=now - SECONDS_PER_DAY)
+    w = task_weights(progress, [1, 2, 3], now)
+    return bool(w[0] > w[1] > w[2]), f"hard {w[0]:.2f} > medium {w[1]:.2f} > easy {w[2]:.2f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Statistical self-check for the weighted task sampler.")
+    parser.add_argument("--draws", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0, help="Seed der Ziehungen (fest → reproduzierbar)")
+    args = parser.parse_args()
+
+    now = time.time()
+    results = []
+    for label, table_cls in TABLES.items():
+        for name, weights in weight_cases(now).items():
+            results.append((f"{label} exakt: {name}", *check_exact(table_cls, weights)))
+            results.append((f"{label} χ²: {name}", *check_chi_square(table_cls, weights, args.draws, args.seed)))
+    results.append(("inkrementell == neu berechnet", *check_incremental(now)))
+    results.append(("hard > medium > easy", *check_ordering(now)))
+
+    for name, ok, detail in results:
+        print(f"{'✅' if ok else '❌'} {name:<44} {detail}")
+
+    weights = weight_cases(now)["460 Aufgaben (Progress)"]
+    table, rng = AliasTable(weights), random.Random(0)
+    start = time.perf_counter()
+    for _ in range(10_000):
+        table.sample(rng)
+    per_pick = (time.perf_counter() - start) / 10_000
+    start = time.perf_counter()
+    AliasTable(weights)
+    build = time.perf_counter() - start
+    blocks = BlockAliasTable(weights)
+    start = time.perf_counter()
+    for i in range(100):
+        blocks.update(i, weights[i])
+    update = (time.perf_counter() - start) / 100
+    print(f"\nAlias-Tabelle (460 Aufgaben): Aufbau {build * 1000:.2f} ms, Ziehung {per_pick * 1e6:.2f} µs")
+    print(f"Block-Tabelle: ein Gewicht ändern {update * 1000:.2f} ms statt Neuaufbau")
+
+    if not all(ok for _, ok, _ in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
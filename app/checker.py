@@ -0,0 +1,311 @@
+# ============================================================
+# 🧪 Checker – Testfälle für Funktions- und Klassen-Aufgaben
+# ============================================================
+#
+# Aufgaben können optional eine Funktion (oder Klasse) samt Testfällen angeben:
+#
+#   "function_name": "add_numbers",
+#   "test_cases": [
+#       {"args": [3, 4], "expected": 7},
+#       {"args": [-1], "kwargs": {"b": 1}, "expected": 0},
+#       {"args": [], "expected_output": "Hello, World!\n"},
+#       {"args": [4, 5], "method": "area", "expected": 20},
+#       {"args": [{"$csv": "data/students.csv"}, 3.5]}
+#   ],
+#   "case_timeout": 1.0
+#
+# Der Code der Lernenden läuft dabei nur EINMAL (run_code); danach wird die
+# Funktion aus den Globals für jeden Fall aufgerufen – mit Zeit-/Schrittlimit
+# pro Fall und Abbruch beim ersten Fehler. Fehlt "expected", liefert die
+# Funktion aus solution_code den Sollwert (nötig für DataFrame-Ergebnisse).
+# "$csv"-Argumente kommen aus dem Shared-Memory-Segment (shared_state.py) oder
+# werden einmal pro Prozess geparst; jeder Aufruf bekommt eine frische Kopie.
+#
+import copy
+import functools
+import io
+import math
+import sys
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from executor import BudgetExceeded, INSTRUCTION_BUDGET, capture_output, instruction_budget, run_code
+from feedback import bounded_repr, clip_text, column_diff, first_output_difference, key_diff
+from shared_state import dataset_path, has_shared, shared_frame
+
+DEFAULT_CASE_TIMEOUT = 1.0
+FLOAT_TOLERANCE = 1e-9
+
+STATUS_SYMBOLS = {"pass": "✅", "fail": "❌", "error": "💥", "timeout": "⏱️", "skipped": "⏭️"}
+
+
+@dataclass
+class CaseResult:
+    index: int
+    status: str
+    call: str = ""
+    expected: object = None
+    actual: object = None
+    message: str = ""
+    duration: float = 0.0
+
+    @property
+    def passed(self):
+        return self.status == "pass"
+
+
+def has_cases(task):
+    return bool(task.get("function_name") and task.get("test_cases"))
+
+
+# ============================
+# 📥 Argumente & Sollwerte
+# ============================
+@functools.lru_cache(maxsize=16)
+def _parse_csv(path):
+    from pandas.io.parsers import read_csv  # nicht pd.read_csv – das leitet der Sandbox-Worker hierher um
+
+    return read_csv(path)
+
+
+def load_dataset(path):
+    """Fresh DataFrame for ``path``: from the shared segment if it holds the file, else a copy of the per-process parse.
+
+    Both are copies per call; the segment only saves the CSV parse (Arrow → pandas is much cheaper than read_csv).
+    Relative paths (``data/students.csv``) are resolved against the repository root, not the working directory.
+    """
+    df = shared_frame(path)
+    if df is not None:
+        return df
+    return _parse_csv(dataset_path(path)).copy()
+
+
+def warm_dataset(path):
+    """Make the next ``load_dataset(path)`` cheap (nothing to do if the segment holds it)."""
+    if not has_shared(path):
+        _parse_csv(dataset_path(path))
+
+
+def _resolve(value):
+    if isinstance(value, dict) and set(value) == {"$csv"}:
+        return load_dataset(value["$csv"])
+    return copy.deepcopy(value)
+
+
+@functools.lru_cache(maxsize=32)
+def reference_function(solution_code, function_name):
+    """The task's own solution, executed once per process.
+
+    Trusted code, but it runs under the same step budget as editor code: a broken solution (endless loop at
+    module level) then fails its checks with an error instead of hanging the script or prefetch thread.
+    """
+    result = run_code(solution_code, instruction_limit=INSTRUCTION_BUDGET)
+    if result.error is not None:
+        raise RuntimeError(f"solution_code failed: {result.error}")
+    return result.globals[function_name]
+
+
+def needs_reference(task):
+    return any("expected" not in case and "expected_output" not in case for case in task["test_cases"])
+
+
+def prepare_task(task):
+    """Fill the caches ``check_task`` uses (reference solution, ``$csv`` arguments) ahead of time."""
+    if not has_cases(task):
+        return
+    if needs_reference(task):
+        reference_function(task["solution_code"], task["function_name"])
+    for case in task["test_cases"]:
+        for value in [*case.get("args", []), *case.get("kwargs", {}).values()]:
+            if isinstance(value, dict) and set(value) == {"$csv"}:
+                warm_dataset(value["$csv"])
+
+
+def _call(func, case):
+    obj = func(*[_resolve(a) for a in case.get("args", [])],
+               **{k: _resolve(v) for k, v in case.get("kwargs", {}).items()})
+    if "method" in case:
+        obj = getattr(obj, case["method"])(*[_resolve(a) for a in case.get("method_args", [])])
+    return obj
+
+
+def format_call(function_name, case):
+    parts = [bounded_repr(a, 60) if not (isinstance(a, dict) and "$csv" in a) else f"<{a['$csv']}>"
+             for a in case.get("args", [])]
+    parts += [f"{k}={bounded_repr(v, 60)}" for k, v in case.get("kwargs", {}).items()]
+    call = f"{function_name}({', '.join(parts)})"
+    if "method" in case:
+        call += f".{case['method']}({', '.join(bounded_repr(a, 60) for a in case.get('method_args', []))})"
+    return call
+
+
+# ============================
+# ⚖️ Vergleich (vektorisiert für Arrays / DataFrames)
+# ============================
+def _numeric(arr):
+    return arr.dtype.kind in "biuf"
+
+
+def _arrays_equal(actual, expected, tolerance):
+    if actual.shape != expected.shape:
+        return False, f"shape {actual.shape} statt {expected.shape}"
+    if _numeric(actual) and _numeric(expected):
+        ok = np.isclose(actual.astype(np.float64), expected.astype(np.float64),
+                        rtol=0.0, atol=tolerance, equal_nan=True)
+    else:
+        ok = np.asarray(actual == expected, dtype=bool)
+    if ok.all():
+        return True, ""
+    first = np.unravel_index(np.argmin(ok), ok.shape)
+    return False, f"{(~ok).sum()} abweichende Werte, z. B. an Position {tuple(int(i) for i in first)}"
+
+
+def _frames_equal(actual, expected, tolerance, check_index):
+    import pandas as pd
+
+    if isinstance(actual, pd.Series):
+        actual, expected = actual.to_frame(), pd.Series(expected).to_frame()
+    if actual.shape != expected.shape:
+        return False, f"shape {actual.shape} statt {expected.shape}"
+    columns = column_diff(actual.columns, expected.columns)
+    if columns:
+        return False, columns
+    if check_index and not np.array_equal(actual.index.to_numpy(), expected.index.to_numpy()):
+        return False, "andere Zeilen (Index stimmt nicht überein)"
+    for a_col, e_col in zip(actual.columns, expected.columns):
+        ok, message = _arrays_equal(actual[a_col].to_numpy(), expected[e_col].to_numpy(), tolerance)
+        if not ok:
+            return False, f"Spalte `{a_col}`: {message}"
+    return True, ""
+
+
+def values_equal(actual, expected, tolerance=FLOAT_TOLERANCE):
+    """Compare a result with the expected value. Returns (ok, reason)."""
+    pd = sys.modules.get("pandas")  # nur relevant, wenn der Code pandas benutzt hat
+    if pd is not None and isinstance(actual, (pd.DataFrame, pd.Series)):
+        check_index = isinstance(expected, (pd.DataFrame, pd.Series))
+        if not check_index:
+            expected = pd.DataFrame(expected) if isinstance(actual, pd.DataFrame) else pd.Series(expected)
+        return _frames_equal(actual, expected, tolerance, check_index)
+
+    if isinstance(actual, np.ndarray) or isinstance(expected, np.ndarray):
+        try:
+            return _arrays_equal(np.asarray(actual), np.asarray(expected), tolerance)
+        except (TypeError, ValueError):
+            return False, "nicht als Array vergleichbar"
+
+    if isinstance(actual, (bool, np.bool_)) or isinstance(expected, bool):
+        return bool(actual == expected) and type(actual) in (bool, np.bool_), ""
+    if isinstance(actual, (int, float, np.number)) and isinstance(expected, (int, float)):
+        if math.isclose(float(actual), float(expected), rel_tol=0.0, abs_tol=tolerance):
+            return True, ""
+        return False, ""
+
+    if isinstance(actual, (set, frozenset)) and isinstance(expected, (list, set, frozenset)):
+        return set(actual) == set(expected), ""
+    if isinstance(actual, (list, tuple)) and isinstance(expected, (list, tuple)):
+        if len(actual) != len(expected):
+            return False, f"Länge {len(actual)} statt {len(expected)}"
+        for i, (a, e) in enumerate(zip(actual, expected)):
+            ok, _ = values_equal(a, e, tolerance)
+            if not ok:
+                return False, f"Element {i}: {bounded_repr(a, 60)} statt {bounded_repr(e, 60)}"
+        return True, ""
+    if isinstance(actual, dict) and isinstance(expected, dict):
+        keys = key_diff(set(map(str, actual)), set(map(str, expected)))
+        if keys:
+            return False, keys
+        lookup = {str(k): v for k, v in actual.items()}
+        for key, e in expected.items():
+            ok, _ = values_equal(lookup[str(key)], e, tolerance)
+            if not ok:
+                return False, f"`{key}`: {bounded_repr(lookup[str(key)], 60)} statt {bounded_repr(e, 60)}"
+        return True, ""
+
+    try:
+        return bool(np.all(actual == expected)), ""
+    except Exception:
+        return False, ""
+
+
+# ============================
+# ▶️ Fälle ausführen
+# ============================
+def run_cases(func, cases, function_name="f", reference=None, tolerance=FLOAT_TOLERANCE,
+              timeout=DEFAULT_CASE_TIMEOUT, stop_on_failure=True):
+    """Call ``func`` once per case; stop at the first non-passing case (rest: skipped)."""
+    results = []
+    for index, case in enumerate(cases):
+        call = format_call(function_name, case)
+        if stop_on_failure and results and not results[-1].passed:
+            results.append(CaseResult(index, "skipped", call))
+            continue
+
+        stdout = io.StringIO()
+        start = time.perf_counter()
+        try:
+            with capture_output(stdout), instruction_budget(INSTRUCTION_BUDGET, timeout):
+                actual = _call(func, case)
+        except BudgetExceeded as e:
+            results.append(CaseResult(index, "timeout", call, message=str(e),
+                                      duration=time.perf_counter() - start))
+            continue
+        except Exception as e:
+            results.append(CaseResult(index, "error", call, message=f"{type(e).__name__}: {e}",
+                                      duration=time.perf_counter() - start))
+            continue
+        duration = time.perf_counter() - start
+
+        if "expected_output" in case and stdout.getvalue() != case["expected_output"]:
+            results.append(CaseResult(index, "fail", call, case["expected_output"], stdout.getvalue(),
+                                      f"falsche Ausgabe (print) – "
+                                      f"{first_output_difference(stdout.getvalue(), case['expected_output'])}",
+                                      duration))
+            continue
+
+        if "expected" in case:
+            expected = case["expected"]
+        elif reference is not None and "expected_output" not in case:
+            expected = _call(reference, case)
+        else:
+            results.append(CaseResult(index, "pass", call, actual=actual, duration=duration))
+            continue
+
+        ok, reason = values_equal(actual, expected, tolerance)
+        results.append(CaseResult(index, "pass" if ok else "fail", call, expected, actual, reason, duration))
+    return results
+
+
+def check_task(task, user_globals):
+    """Run the task's test cases against the learner's function from ``user_globals``."""
+    name = task["function_name"]
+    cases = task["test_cases"]
+    func = user_globals.get(name)
+    if not callable(func):
+        return [CaseResult(0, "error", f"{name}(...)", message=f"`{name}` ist nicht definiert.")] + [
+            CaseResult(i, "skipped", format_call(name, case)) for i, case in enumerate(cases[1:], start=1)
+        ]
+
+    reference = None
+    if needs_reference(task):
+        reference = reference_function(task["solution_code"], name)
+
+    tolerance = task.get("tolerance", 0.001) if task.get("check_type") == "float_tolerance" else FLOAT_TOLERANCE
+    return run_cases(func, cases, name, reference, tolerance, task.get("case_timeout", DEFAULT_CASE_TIMEOUT))
+
+
+def format_grid(results):
+    """Compact markdown pass/fail grid: one column per case."""
+    header = "| Fall | " + " | ".join(str(r.index + 1) for r in results) + " |"
+    rule = "|---|" + "---|" * len(results)
+    row = "| | " + " | ".join(STATUS_SYMBOLS[r.status] for r in results) + " |"
+    return "\n".join([header, rule, row])
+
+
+def describe_failure(result):
+    if result.status in ("error", "timeout"):
+        return f"`{result.call}` → {clip_text(result.message, 300)}"
+    text = f"`{result.call}` → {bounded_repr(result.actual)} (expected {bounded_repr(result.expected)})"
+    return f"{text} – {result.message}" if result.message else text
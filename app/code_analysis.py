@@ -0,0 +1,91 @@
+# ============================================================
+# 🔍 Statische Code-Analyse – einmal parsen, klassifizieren, prüfen
+# ============================================================
+import ast
+from dataclasses import dataclass, field
+
+# Namen aus dem vollen Sandbox-Namespace, die den schweren Pfad brauchen
+HEAVY_NAMES = {"pd", "np", "plt", "sns", "scipy", "stats", "st", "open"}
+HEAVY_MODULES = {"pandas", "numpy", "matplotlib", "seaborn", "scipy", "streamlit"}
+
+# Module, die der leichte In-Process-Evaluator importieren darf
+LIGHT_MODULES = {
+    "math", "re", "random", "datetime", "collections", "itertools", "functools",
+    "string", "statistics", "decimal", "fractions", "operator", "copy", "logging",
+}
+
+BLOCKED_MODULES = {
+    "os", "sys", "subprocess", "shutil", "socket", "ctypes", "importlib", "multiprocessing",
+    "threading", "signal", "pty", "builtins", "pickle", "marshal", "gc", "inspect",
+}
+BLOCKED_CALLS = {"eval", "exec", "compile", "__import__", "globals", "locals", "vars", "breakpoint"}
+BLOCKED_ATTRS = {
+    "__subclasses__", "__globals__", "__builtins__", "__code__", "__closure__",
+    "__bases__", "__mro__", "__loader__", "__spec__", "__import__",
+}
+
+
+@dataclass
+class CodeProfile:
+    """Result of one AST pass over the editor content."""
+    tree: ast.Module = None
+    syntax_error: SyntaxError = None
+    modules: set = field(default_factory=set)
+    names: set = field(default_factory=set)
+    has_loops: bool = False
+    uses_io: bool = False
+    violations: list = field(default_factory=list)
+
+    @property
+    def is_trivial(self):
+        """Pure Python without the scientific stack or file I/O → leichter Pfad."""
+        return (
+            self.tree is not None
+            and not self.violations
+            and not self.uses_io
+            and not (self.names & HEAVY_NAMES)
+            and self.modules <= LIGHT_MODULES
+        )
+
+    @property
+    def route(self):
+        return "light" if self.is_trivial else "heavy"
+
+
+def analyze(source, filename="<editor>"):
+    """Parse ``source`` once and collect modules, names, loops, I/O and violations."""
+    profile = CodeProfile()
+    try:
+        profile.tree = ast.parse(source, filename=filename)
+    except SyntaxError as e:
+        profile.syntax_error = e
+        return profile
+
+    for node in ast.walk(profile.tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                profile.modules.add(alias.name.split(".")[0])
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                profile.violations.append(f"Zeile {node.lineno}: relative Imports sind nicht erlaubt.")
+            elif node.module:
+                profile.modules.add(node.module.split(".")[0])
+        elif isinstance(node, ast.Name):
+            profile.names.add(node.id)
+            if node.id in BLOCKED_CALLS and isinstance(node.ctx, ast.Load):
+                profile.violations.append(f"Zeile {node.lineno}: `{node.id}` ist nicht erlaubt.")
+        elif isinstance(node, ast.Attribute):
+            if node.attr in BLOCKED_ATTRS:
+                profile.violations.append(f"Zeile {node.lineno}: Zugriff auf `{node.attr}` ist nicht erlaubt.")
+            if node.attr in {"read_csv", "to_csv", "read_excel", "to_excel", "savefig"}:
+                profile.uses_io = True
+        elif isinstance(node, (ast.For, ast.AsyncFor, ast.While, ast.comprehension)):
+            profile.has_loops = True
+
+    for module in sorted(profile.modules & BLOCKED_MODULES):
+        profile.violations.append(f"Modul `{module}` ist nicht erlaubt.")
+
+    if "open" in profile.names:
+        profile.uses_io = True
+
+    return profile
@@ -0,0 +1,334 @@
+# ============================================================
+# ▶️ Code-Ausführung – leichter Evaluator vs. volle Sandbox
+# ============================================================
+#
+# run_code führt Editor-Code im aktuellen Prozess aus – die App ruft es nur für
+# den leichten Pfad direkt auf; schwerer Code läuft über sandbox.py in einem
+# Worker-Prozess, der dort ebenfalls run_code benutzt. Beide Pfade laufen mit
+# demselben Schritt- und Zeitbudget.
+#
+import builtins
+import contextlib
+import io
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+
+from code_analysis import analyze, BLOCKED_MODULES, LIGHT_MODULES
+
+FILENAME = "<editor>"
+
+# Max. ausgeführte Bytecode-Instruktionen + Wanduhr-Limit pro Lauf (schützt vor Endlosschleifen)
+INSTRUCTION_BUDGET = 5_000_000
+TIME_LIMIT = 10.0
+
+# st.*-Aufrufe, die Editor-Code machen darf (werden aufgezeichnet und von der App abgespielt)
+STREAMLIT_CALLS = {
+    "write", "markdown", "text", "code", "latex", "caption", "title", "header", "subheader", "divider",
+    "success", "info", "warning", "error", "metric", "json", "dataframe", "table",
+    "line_chart", "bar_chart", "area_chart", "scatter_chart", "image", "pyplot",
+}
+
+SAFE_BUILTINS = {
+    "__build_class__": __build_class__,
+    "__import__": __import__,
+    "super": super,
+    "StopIteration": StopIteration,
+
+    # core
+    "print": print,
+    "open": open,
+    "range": range,
+    "len": len,
+    "sum": sum,
+    "min": min,
+    "max": max,
+    "abs": abs,
+    "round": round,
+    "sorted": sorted,
+    "enumerate": enumerate,
+    "zip": zip,
+
+    # logic / typing
+    "any": any,
+    "all": all,
+    "bool": bool,
+    "type": type,
+    "isinstance": isinstance,
+
+    # data types
+    "int": int,
+    "float": float,
+    "str": str,
+    "list": list,
+    "dict": dict,
+    "set": set,
+    "tuple": tuple,
+
+    # decorators
+    "classmethod": classmethod,
+    "staticmethod": staticmethod,
+    "property": property,
+
+    # exceptions
+    "AssertionError": AssertionError,
+    "ValueError": ValueError,
+    "TypeError": TypeError,
+    "ZeroDivisionError": ZeroDivisionError,
+    "Exception": Exception,
+    "FileNotFoundError": FileNotFoundError,
+}
+
+
+class CodeRejected(Exception):
+    """Static analysis found a disallowed construct; nothing was executed."""
+
+
+class BudgetExceeded(BaseException):
+    """The light evaluator ran out of its instruction budget.
+
+    Derives from BaseException so ``except Exception`` in user code cannot swallow it.
+    """
+
+
+@dataclass
+class ExecResult:
+    globals: dict
+    stdout: str
+    stderr: str
+    error: BaseException = None
+    route: str = "heavy"
+    duration: float = 0.0
+    st_calls: list = field(default_factory=list)   # aufgezeichnete st.*-Aufrufe (nur schwerer Pfad)
+    cases: list = None                              # CaseResults, wenn der Worker gleich geprüft hat
+
+
+def _light_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name.split(".")[0] not in LIGHT_MODULES:
+        raise ImportError(f"Import von `{name}` ist hier nicht erlaubt.")
+    return builtins.__import__(name, globals, locals, fromlist, level)
+
+
+def _sandbox_import(name, globals=None, locals=None, fromlist=(), level=0):
+    """Runtime twin of the static module check (``__import__`` calls built at run time)."""
+    if level or name.split(".")[0] in BLOCKED_MODULES:
+        raise ImportError(f"Import von `{name}` ist hier nicht erlaubt.")
+    if name == "streamlit" and not fromlist and isinstance((globals or {}).get("st"), StreamlitRecorder):
+        return globals["st"]  # `import streamlit as st` → derselbe Rekorder
+    return builtins.__import__(name, globals, locals, fromlist, level)
+
+
+LIGHT_BUILTINS = {
+    **{k: v for k, v in SAFE_BUILTINS.items() if k != "open"},
+    "__import__": _light_import,
+}
+
+SANDBOX_BUILTINS = {**SAFE_BUILTINS, "__import__": _sandbox_import}
+
+
+# ============================
+# 🎬 st.* im Sandbox-Prozess aufzeichnen
+# ============================
+class Png:
+    """A rendered matplotlib figure (figures themselves cannot leave the sandbox process)."""
+
+    def __init__(self, data):
+        self.data = data
+
+    @classmethod
+    def from_figure(cls, figure, **savefig_kwargs):
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format="png", bbox_inches="tight", **{"dpi": 200, **savefig_kwargs})
+        return cls(buffer.getvalue())
+
+
+class StreamlitRecorder:
+    """Stand-in for ``st`` in editor code: records display calls for the app to replay."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name not in STREAMLIT_CALLS:
+            raise AttributeError(f"st.{name} ist im Editor nicht verfügbar.")
+        if name == "pyplot":
+            return self._pyplot
+
+        def record(*args, **kwargs):
+            self.calls.append((name, [_displayable(a) for a in args],
+                               {k: _displayable(v) for k, v in kwargs.items()}))
+        return record
+
+    def _pyplot(self, fig=None, clear_figure=False, **kwargs):
+        import matplotlib.pyplot as plt
+
+        figure = plt.gcf() if fig is None else fig
+        kwargs = {k: v for k, v in kwargs.items() if k not in ("width", "use_container_width")}
+        self.calls.append(("image", [Png.from_figure(figure, **kwargs)], {}))
+        if clear_figure:
+            figure.clf()
+
+
+def _displayable(value):
+    if type(value).__module__.startswith("matplotlib") and hasattr(value, "savefig"):
+        return Png.from_figure(value)
+    return value
+
+
+# ============================
+# 🧠 Shared sandbox setup
+# ============================
+def build_user_globals():
+    import numpy as np
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    import scipy
+    import scipy.stats as stats
+
+    return {
+        "__builtins__": SANDBOX_BUILTINS,
+        "__name__": "__main__",
+
+        # scientific stack
+        "np": np,
+        "pd": pd,
+        "plt": plt,
+        "sns": sns,
+        "scipy": scipy,
+        "stats": stats,
+
+        # infra
+        "st": StreamlitRecorder(),
+        "re": re,
+    }
+
+
+def build_light_globals():
+    return {
+        "__builtins__": LIGHT_BUILTINS,
+        "__name__": "__main__",
+        "re": re,
+    }
+
+
+class _ThreadStream:
+    """Stand-in for sys.stdout/sys.stderr: a thread inside ``capture_output`` writes to its own buffer."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def _target(self):
+        buffer = getattr(self._local, "buffer", None)
+        return self._stream if buffer is None else buffer
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+_STREAM_LOCK = threading.Lock()
+
+
+@contextlib.contextmanager
+def capture_output(stdout, stderr=None):
+    """Like ``redirect_stdout``/``redirect_stderr``, but only for the calling thread.
+
+    Streamlit runs each session's script in its own thread and the prefetcher runs reference solutions in
+    another – a process-wide redirect would mix their output (and restore the wrong stream).
+    """
+    streams = []
+    with _STREAM_LOCK:
+        for name, buffer in (("stdout", stdout), ("stderr", stderr)):
+            if buffer is None:
+                continue
+            stream = getattr(sys, name)
+            if not isinstance(stream, _ThreadStream):
+                stream = _ThreadStream(stream)
+                setattr(sys, name, stream)
+            streams.append((stream, buffer))
+    previous = [getattr(stream._local, "buffer", None) for stream, _ in streams]
+    for stream, buffer in streams:
+        stream._local.buffer = buffer
+    try:
+        yield
+    finally:
+        for (stream, _), buffer in zip(streams, previous):
+            stream._local.buffer = buffer
+
+
+@contextlib.contextmanager
+def instruction_budget(limit, time_limit=None):
+    """Count executed bytecode instructions of editor code and abort once ``limit`` is reached.
+
+    With ``time_limit`` (seconds) the wall clock is checked every 1024 instructions as well.
+    Time spent inside a single C call (``sum(range(10**10))``) cannot be interrupted.
+    """
+    remaining = [limit]
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+
+    def local_trace(frame, event, arg):
+        if event == "opcode":
+            remaining[0] -= 1
+            if remaining[0] < 0:
+                raise BudgetExceeded(f"Ausführung abgebrochen: mehr als {limit:,} Schritte (Endlosschleife?)")
+            if deadline is not None and not remaining[0] & 1023 and time.perf_counter() > deadline:
+                raise BudgetExceeded(f"Ausführung abgebrochen: länger als {time_limit:g} s")
+        return local_trace
+
+    def global_trace(frame, event, arg):
+        if frame.f_code.co_filename != FILENAME:
+            return None
+        frame.f_trace_opcodes = True
+        return local_trace
+
+    previous = sys.gettrace()
+    sys.settrace(global_trace)
+    try:
+        yield
+    finally:
+        sys.settrace(previous)
+
+
+def run_code(source, profile=None, instruction_limit=INSTRUCTION_BUDGET, time_limit=TIME_LIMIT):
+    """Analyse ``source`` once, then run it in this process with the light or the full namespace."""
+    profile = profile or analyze(source, FILENAME)
+    start = time.perf_counter()
+
+    if profile.syntax_error is not None:
+        return ExecResult({}, "", "", profile.syntax_error, profile.route)
+    if profile.violations:
+        return ExecResult({}, "", "", CodeRejected("\n".join(profile.violations)), profile.route)
+
+    code = compile(profile.tree, FILENAME, "exec")
+    stdout_buffer = io.StringIO()
+    stderr_buffer = io.StringIO()
+    error = None
+
+    user_globals = build_light_globals() if profile.is_trivial else build_user_globals()
+    budget = instruction_budget(instruction_limit, time_limit)
+
+    try:
+        with capture_output(stdout_buffer, stderr_buffer), budget:
+            exec(code, user_globals)
+    except (Exception, BudgetExceeded) as e:
+        error = e
+
+    recorder = user_globals.get("st")
+    return ExecResult(
+        globals=user_globals,
+        stdout=stdout_buffer.getvalue(),
+        stderr=stderr_buffer.getvalue(),
+        error=error,
+        route=profile.route,
+        duration=time.perf_counter() - start,
+        st_calls=recorder.calls if isinstance(recorder, StreamlitRecorder) else [],
+    )
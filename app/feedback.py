@@ -0,0 +1,279 @@
+# ============================================================
+# 💬 Feedback – begrenzte Darstellung großer Werte + strukturierte Diffs
+# ============================================================
+#
+# Rückmeldungen in Run & Check dürfen nie den ganzen Wert stringifizieren:
+# ein 100k-Zeilen-DataFrame oder eine riesige Liste würde sonst komplett
+# formatiert und an den Browser geschickt. Alles hier arbeitet auf
+# Ausschnitten (Kopf/Ende, Form, dtypes) und vergleicht höchstens MAX_SCAN
+# Elemente bzw. MAX_DIFF_LINES Zeilen – Zeit und Speicher hängen damit nicht
+# von der Größe des Werts ab.
+#
+import difflib
+import itertools
+
+import numpy as np
+
+MAX_CHARS = 120          # Länge einer einzelnen Wertdarstellung
+EDGE_ITEMS = 3           # Elemente am Anfang/Ende von Sequenzen
+MAX_SCAN = 100_000       # Elemente, die ein Diff höchstens vergleicht
+MAX_DIFF_LINES = 200     # Zeilen je Seite, die difflib überhaupt sieht
+MAX_DIFF_OUTPUT = 30     # Zeilen des angezeigten Unified-Diffs
+MAX_OUTPUT_CHARS = 20_000
+
+
+def clip_text(text, max_chars=MAX_OUTPUT_CHARS):
+    """Head and tail of a long text with a marker for the omitted middle."""
+    if len(text) <= max_chars:
+        return text
+    keep = max_chars // 2
+    return f"{text[:keep]}\n… ({len(text) - 2 * keep:,} Zeichen ausgelassen) …\n{text[-keep:]}"
+
+
+def _clip(text, max_chars):
+    if len(text) <= max_chars:
+        return text
+    keep = max(max_chars // 2 - 1, 1)
+    return f"{text[:keep]}…{text[-keep:]}"
+
+
+def _is_pandas(value, name):
+    return type(value).__name__ == name and type(value).__module__.startswith("pandas")
+
+
+# ============================
+# 🔎 Begrenzte Darstellung
+# ============================
+def bounded_repr(value, max_chars=MAX_CHARS, _depth=0):
+    """repr() that never formats more than a few items of a container or frame."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, bool) or value is None or isinstance(value, float):
+        return repr(value)
+    if isinstance(value, int):
+        if value.bit_length() > 256:
+            return f"<int mit ~{int(value.bit_length() * 0.30103):,} Stellen>"
+        return _clip(repr(value), max_chars)
+    if isinstance(value, (str, bytes)):
+        if len(value) <= max_chars:
+            return repr(value)
+        keep = max(max_chars // 2 - 4, 1)
+        return f"{value[:keep]!r}…{value[-keep:]!r} (Länge {len(value):,})"
+
+    if _is_pandas(value, "DataFrame"):
+        return _frame_repr(value, max_chars)
+    if _is_pandas(value, "Series"):
+        head, tail, n = _edges(value.iloc, len(value))
+        items = ", ".join(bounded_repr(v, max_chars // 4, 2) for v in head)
+        if tail:
+            items += ", …, " + ", ".join(bounded_repr(v, max_chars // 4, 2) for v in tail)
+        return _clip(f"Series {value.name!r} · {n:,} × {value.dtype} [{items}]", max_chars * 2)
+    if isinstance(value, np.ndarray):
+        body = np.array2string(value, threshold=2 * EDGE_ITEMS + 1, edgeitems=EDGE_ITEMS, max_line_width=10_000)
+        return _clip(f"ndarray {value.shape} {value.dtype} {' '.join(body.split())}", max_chars * 2)
+
+    if _depth < 2 and isinstance(value, (list, tuple)):
+        head, tail, n = _edges(value, len(value))
+        return _container_repr(value, head, tail, n, max_chars, _depth)
+    if _depth < 2 and isinstance(value, (set, frozenset)):
+        head = list(itertools.islice(value, 2 * EDGE_ITEMS))
+        return _container_repr(value, head, [], len(value), max_chars, _depth)
+    if _depth < 2 and isinstance(value, dict):
+        parts = [f"{bounded_repr(k, max_chars // 4, _depth + 1)}: {bounded_repr(v, max_chars // 4, _depth + 1)}"
+                 for k, v in itertools.islice(value.items(), 2 * EDGE_ITEMS)]
+        more = f", … (+{len(value) - len(parts):,})" if len(value) > len(parts) else ""
+        return _clip("{" + ", ".join(parts) + more + "}", max_chars)
+
+    try:
+        text = repr(value)
+    except Exception as e:
+        text = f"<{type(value).__name__}: repr fehlgeschlagen ({type(e).__name__})>"
+    return _clip(text, max_chars)
+
+
+def _edges(seq, n):
+    if n <= 2 * EDGE_ITEMS:
+        return list(seq[:n]), [], n
+    return list(seq[:EDGE_ITEMS]), list(seq[n - EDGE_ITEMS:n]), n
+
+
+def _container_repr(value, head, tail, n, max_chars, depth):
+    open_, close = {list: "[]", tuple: "()", set: "{}", frozenset: "{}"}.get(type(value), "[]")
+    items = ", ".join(bounded_repr(v, max_chars // 4, depth + 1) for v in head)
+    if tail:
+        items += ", …, " + ", ".join(bounded_repr(v, max_chars // 4, depth + 1) for v in tail)
+    elif n > len(head):
+        items += ", …"
+    suffix = f" (Länge {n:,})" if n > len(head) + len(tail) else ""
+    return _clip(open_ + items + close, max_chars) + suffix
+
+
+def _frame_repr(df, max_chars):
+    rows, cols = df.shape
+    columns = ", ".join(f"{c}:{t}" for c, t in itertools.islice(df.dtypes.items(), 2 * EDGE_ITEMS))
+    if cols > 2 * EDGE_ITEMS:
+        columns += f", … (+{cols - 2 * EDGE_ITEMS})"
+    text = f"DataFrame {rows:,}×{cols} [{columns}]"
+    if rows:
+        sample = df.iloc[[0, rows - 1] if rows > 1 else [0], : 2 * EDGE_ITEMS]
+        for label, row in sample.iterrows():
+            values = ", ".join(f"{c}={bounded_repr(v, 24, 2)}" for c, v in row.items())
+            text += f" · Zeile {bounded_repr(label, 24, 2)}: {values}"
+    return _clip(text, max_chars * 3)
+
+
+# ============================
+# ⚖️ Strukturierte Unterschiede
+# ============================
+def diff_values(actual, expected):
+    """Short description of where ``actual`` differs from ``expected`` ('' if nothing specific)."""
+    if _is_pandas(actual, "DataFrame") and _is_pandas(expected, "DataFrame"):
+        return _frame_diff(actual, expected)
+    if isinstance(actual, np.ndarray) or isinstance(expected, np.ndarray):
+        return _array_diff(np.asarray(actual), np.asarray(expected))
+    if type(actual) is not type(expected) and not (
+            isinstance(actual, (int, float)) and isinstance(expected, (int, float))):
+        return f"Typ {type(actual).__name__} statt {type(expected).__name__}"
+    if isinstance(actual, (str, bytes)):
+        return _sequence_diff(actual, expected, "Zeichen")
+    if isinstance(actual, (list, tuple)):
+        return _sequence_diff(actual, expected, "Element")
+    if isinstance(actual, (set, frozenset)):
+        return key_diff(actual, expected, "Elemente")
+    if isinstance(actual, dict):
+        keys = key_diff(actual, expected, "Schlüssel")
+        if keys:
+            return keys
+        for key, value in itertools.islice(expected.items(), MAX_SCAN):
+            if key in actual and not _same(actual[key], value):
+                return f"Schlüssel {bounded_repr(key, 40)}: {bounded_repr(actual[key], 40)} statt {bounded_repr(value, 40)}"
+    return ""
+
+
+def _same(a, b):
+    try:
+        return bool(a == b)
+    except Exception:
+        return False
+
+
+def _sequence_diff(actual, expected, unit):
+    n = min(len(actual), len(expected), MAX_SCAN)
+    for i in range(n):
+        if not _same(actual[i], expected[i]):
+            return (f"erster Unterschied bei {unit} {i:,}: "
+                    f"{bounded_repr(actual[i], 40)} statt {bounded_repr(expected[i], 40)}")
+    if len(actual) != len(expected):
+        return f"Länge {len(actual):,} statt {len(expected):,} (die ersten {n:,} stimmen)"
+    if n == MAX_SCAN and len(actual) > MAX_SCAN:
+        return f"die ersten {MAX_SCAN:,} stimmen überein"
+    return ""
+
+
+def key_diff(actual, expected, label="Schlüssel"):
+    """Missing/extra keys (or set elements), at most a few of each."""
+    missing = [k for k in itertools.islice(expected, MAX_SCAN) if k not in actual][:EDGE_ITEMS]
+    extra = [k for k in itertools.islice(actual, MAX_SCAN) if k not in expected][:EDGE_ITEMS]
+    parts = []
+    if missing:
+        parts.append(f"fehlende {label}: " + ", ".join(bounded_repr(k, 30) for k in missing))
+    if extra:
+        parts.append(f"zusätzliche {label}: " + ", ".join(bounded_repr(k, 30) for k in extra))
+    return "; ".join(parts)
+
+
+def column_diff(actual_columns, expected_columns):
+    actual_columns = [str(c) for c in actual_columns]
+    expected_columns = [str(c) for c in expected_columns]
+    keys = key_diff(actual_columns, expected_columns, "Spalten")
+    if keys:
+        return keys
+    if actual_columns != expected_columns:
+        return "gleiche Spalten, andere Reihenfolge"
+    return ""
+
+
+def _array_diff(actual, expected):
+    if actual.shape != expected.shape:
+        return f"shape {actual.shape} statt {expected.shape}"
+    if actual.dtype.kind != expected.dtype.kind and {actual.dtype.kind, expected.dtype.kind} - set("biuf"):
+        return f"dtype {actual.dtype} statt {expected.dtype}"
+    a, e = actual.reshape(-1)[:MAX_SCAN], expected.reshape(-1)[:MAX_SCAN]
+    try:
+        differs = ~np.asarray(a == e, dtype=bool)
+        if a.dtype.kind == "f" and e.dtype.kind == "f":
+            differs &= ~(np.isnan(a) & np.isnan(e))
+    except (TypeError, ValueError):
+        return ""
+    if not differs.any():
+        return f"die ersten {MAX_SCAN:,} Elemente stimmen überein" if actual.size > MAX_SCAN else ""
+    flat = int(np.argmax(differs))
+    pos = tuple(int(i) for i in np.unravel_index(flat, actual.shape))
+    return f"erster Unterschied an Position {pos}: {bounded_repr(a[flat], 40)} statt {bounded_repr(e[flat], 40)}"
+
+
+def _frame_diff(actual, expected):
+    if actual.shape != expected.shape:
+        return f"shape {actual.shape} statt {expected.shape}"
+    columns = column_diff(actual.columns, expected.columns)
+    if columns:
+        return columns
+    dtypes = [f"{c}: {a} statt {e}" for c, a, e in zip(actual.columns, actual.dtypes, expected.dtypes) if a != e]
+    if dtypes:
+        return "dtype " + "; ".join(dtypes[:EDGE_ITEMS])
+    a = actual.iloc[:MAX_SCAN].reset_index(drop=True)
+    e = expected.iloc[:MAX_SCAN].reset_index(drop=True)
+    e.columns = a.columns
+    try:
+        differs = (a.ne(e) & ~(a.isna() & e.isna())).to_numpy()
+    except (TypeError, ValueError):
+        return ""
+    if not differs.any():
+        if len(actual) > MAX_SCAN:
+            return f"die ersten {MAX_SCAN:,} Zeilen stimmen überein"
+        return "" if actual.index.equals(expected.index) else "anderer Index"
+    row, col = (int(i) for i in np.argwhere(differs)[0])
+    return (f"erster Unterschied in Zeile {row:,}, Spalte `{actual.columns[col]}`: "
+            f"{bounded_repr(a.iat[row, col], 40)} statt {bounded_repr(e.iat[row, col], 40)}")
+
+
+# ============================
+# 🖨️ Ausgabe (print) vergleichen
+# ============================
+def _lines(text, max_line=1_000):
+    """First MAX_DIFF_LINES lines without splitting (or copying) the whole text."""
+    lines, start = [], 0
+    while start < len(text) and len(lines) < MAX_DIFF_LINES:
+        end = text.find("\n", start)
+        end = len(text) if end == -1 else end
+        lines.append(text[start:min(end, start + max_line)].rstrip("\r"))
+        start = end + 1
+    return lines
+
+
+def first_output_difference(actual, expected):
+    """'Zeile 3: … statt …' for the first differing printed line ('' if equal)."""
+    actual_lines, expected_lines = _lines(actual), _lines(expected)
+    for number, (a, e) in enumerate(itertools.zip_longest(actual_lines, expected_lines), start=1):
+        if a != e:
+            shown_a = "(keine Zeile)" if a is None else bounded_repr(a, 60)
+            shown_e = "(keine Zeile)" if e is None else bounded_repr(e, 60)
+            return f"Zeile {number}: {shown_a} statt {shown_e}"
+    if actual == expected:
+        return ""
+    if MAX_DIFF_LINES in (len(actual_lines), len(expected_lines)):
+        return f"Unterschied erst nach Zeile {MAX_DIFF_LINES}"
+    return "Unterschied nur in Leerzeilen/Zeilenenden"
+
+
+def output_diff(actual, expected):
+    """Unified diff of printed vs. expected output (first MAX_DIFF_LINES lines, MAX_DIFF_OUTPUT shown)."""
+    diff = difflib.unified_diff(
+        [_clip(line, 200) for line in _lines(expected)],
+        [_clip(line, 200) for line in _lines(actual)],
+        fromfile="erwartet", tofile="deine Ausgabe", lineterm="", n=1,
+    )
+    lines = list(itertools.islice(diff, MAX_DIFF_OUTPUT + 1))
+    if len(lines) > MAX_DIFF_OUTPUT:
+        lines = lines[:MAX_DIFF_OUTPUT] + ["…"]
+    return "\n".join(lines)
@@ -0,0 +1,50 @@
+# ============================================================
+# 📅 Review-Forecast – fällige Wiederholungen pro Tag & Kategorie
+# ============================================================
+import numpy as np
+
+from scheduling import RATING_CODES, DEFAULT_MULTIPLIERS, SECONDS_PER_DAY, next_interval
+
+
+def build_category_index(tasks):
+    """Return (sorted category names, array task_id → category index)."""
+    categories = sorted({t["category"] for t in tasks})
+    lookup = {cat: i for i, cat in enumerate(categories)}
+    task_category = np.zeros(max(t["id"] for t in tasks) + 1, dtype=np.int64)
+    for t in tasks:
+        task_category[t["id"]] = lookup[t["category"]]
+    return categories, task_category
+
+
+def forecast_reviews(task_ids, interval, last_review, rating_codes, task_category, n_categories,
+                     start_ts, n_days, multipliers=DEFAULT_MULTIPLIERS):
+    """Reviews due per category and day for the next ``n_days`` days.
+
+    Takes the reviewed tasks as parallel arrays (see ``Progress``). Every
+    task is assumed to be reviewed on the day it becomes due and to receive
+    its last rating again (medium if unknown). Overdue tasks count for day 0.
+    Returns an int array of shape (n_categories, n_days).
+    """
+    counts = np.zeros(n_categories * n_days, dtype=np.int64)
+
+    task_ids = np.asarray(task_ids, dtype=np.int64)
+    valid = task_ids < len(task_category)
+    task_ids = task_ids[valid]
+    interval = np.array(interval, dtype=np.float64)[valid]
+    last_review = np.asarray(last_review, dtype=np.float64)[valid]
+    codes = np.asarray(rating_codes, dtype=np.int64)[valid]
+    codes = np.where(codes < 0, RATING_CODES["medium"], codes)
+    cats = task_category[task_ids]
+
+    # nächster Fälligkeitstag relativ zu start_ts (in Tagen, überfällig → heute)
+    due_day = np.maximum((last_review + interval * SECONDS_PER_DAY - start_ts) / SECONDS_PER_DAY, 0.0)
+
+    active = due_day < n_days
+    while active.any():
+        idx = np.flatnonzero(active)
+        counts += np.bincount(cats[idx] * n_days + due_day[idx].astype(np.int64), minlength=counts.size)
+        interval[idx] = next_interval(interval[idx], codes[idx], multipliers)
+        due_day[idx] += interval[idx]
+        active[idx] = due_day[idx] < n_days
+
+    return counts.reshape(n_categories, n_days)
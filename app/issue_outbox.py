@@ -0,0 +1,233 @@
+# ============================================================
+# 📮 Issue Outbox – lokale SQLite-Queue + Hintergrund-Upload zu GitHub Gists
+# ============================================================
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+GIST_API_URL = "https://api.github.com/gists"
+
+# HTTP-Statuscodes, bei denen sich ein erneuter Versuch lohnt
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+# Ein Sender darf eine Zeile so lange exklusiv senden; danach gilt er als
+# abgestürzt und ein anderer Prozess übernimmt sie.
+LEASE_SECONDS = 120
+
+COLUMNS = ("id, dedup_key, task_id, payload, status, attempts, next_attempt, "
+           "created_at, last_error, gist_url, claimed_until")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    dedup_key     TEXT    NOT NULL,
+    task_id       INTEGER,
+    payload       TEXT    NOT NULL,
+    status        TEXT    NOT NULL DEFAULT 'pending',
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    next_attempt  REAL    NOT NULL,
+    created_at    REAL    NOT NULL,
+    last_error    TEXT,
+    gist_url      TEXT,
+    claimed_until REAL
+)
+"""
+
+# Duplikate nur unter wartenden Zeilen – nach dem Senden darf dasselbe Issue erneut gemeldet werden
+PENDING_DEDUP_INDEX = """
+CREATE UNIQUE INDEX IF NOT EXISTS outbox_pending_dedup ON outbox (dedup_key) WHERE status = 'pending'
+"""
+
+
+class IssueOutbox:
+    """Durable outbox for issue reports, drained by a background sender thread.
+
+    ``submit`` only writes to the local SQLite file and returns immediately;
+    the sender posts pending rows to the Gist API with a pooled session,
+    timeouts and exponential backoff. ``api_url`` can point at a local stub.
+    Several server processes may share one file: each row is leased before
+    it is sent, so only one of them posts it.
+    """
+
+    def __init__(self, db_path, token, api_url=GIST_API_URL, timeout=(3.05, 10),
+                 base_backoff=2.0, max_backoff=600.0, max_attempts=12):
+        self.db_path = Path(db_path)
+        self.token = token
+        self.api_url = api_url
+        self.timeout = timeout
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+
+        self._session = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")  # mehrere Server-Prozesse starten gleichzeitig
+            conn.execute(SCHEMA)
+            self._migrate(conn)
+            conn.execute(PENDING_DEDUP_INDEX)
+
+    # --- Storage ------------------------------------------------
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _migrate(conn):
+        """Bring outboxes created by older versions (UNIQUE dedup_key, no lease column) up to date."""
+        if "claimed_until" not in {row["name"] for row in conn.execute("PRAGMA table_info(outbox)")}:
+            conn.execute("ALTER TABLE outbox ADD COLUMN claimed_until REAL")
+        if any(row["unique"] and row["origin"] == "u" for row in conn.execute("PRAGMA index_list(outbox)")):
+            conn.execute("ALTER TABLE outbox RENAME TO outbox_old")
+            conn.execute(SCHEMA)
+            conn.execute(f"INSERT INTO outbox ({COLUMNS}) SELECT {COLUMNS} FROM outbox_old")
+            conn.execute("DROP TABLE outbox_old")
+
+    def submit(self, task_id, data):
+        """Queue an issue. Returns False if an identical issue is still waiting to be sent."""
+        content = json.dumps(data, indent=2, ensure_ascii=False)
+        dedup_key = hashlib.sha256(f"{task_id}|{content}".encode("utf-8")).hexdigest()
+        now = time.time()
+
+        with self._connect() as conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO outbox (dedup_key, task_id, payload, next_attempt, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (dedup_key, task_id, content, now, now),
+            )
+            is_new = cur.rowcount == 1
+
+        self._wake.set()
+        return is_new
+
+    def pending_count(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM outbox WHERE status = 'pending'").fetchone()[0]
+
+    # --- Sending ------------------------------------------------
+    def _get_session(self):
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+            session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+            session.headers.update({
+                "Authorization": f"token {self.token}",
+                "Accept": "application/vnd.github+json",
+            })
+            self._session = session
+        return self._session
+
+    def _backoff(self, attempts):
+        delay = min(self.base_backoff * (2 ** (attempts - 1)), self.max_backoff)
+        return delay * random.uniform(0.8, 1.2)
+
+    def _send(self, row):
+        payload = {
+            "files": {f"issue_task_{row['task_id']}.json": {"content": row["payload"]}},
+            "public": False,  # secret gist
+        }
+        resp = self._get_session().post(self.api_url, json=payload, timeout=self.timeout)
+        if resp.status_code == 201:
+            return "sent", resp.json().get("html_url"), None
+        if resp.status_code in RETRYABLE_STATUS:
+            return "retry", None, f"HTTP {resp.status_code}: {resp.text[:500]}"
+        return "failed", None, f"HTTP {resp.status_code}: {resp.text[:500]}"
+
+    def _claim(self, row_id, now):
+        """Lease a pending row for this sender; False if another process holds it."""
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE outbox SET claimed_until = ? WHERE id = ? AND status = 'pending' "
+                "AND (claimed_until IS NULL OR claimed_until <= ?)",
+                (now + LEASE_SECONDS, row_id, now),
+            )
+            return cur.rowcount == 1
+
+    def drain_once(self, now=None):
+        """Try every due row once. Returns the number of successfully sent issues."""
+        now = time.time() if now is None else now
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM outbox WHERE status = 'pending' AND next_attempt <= ? "
+                "AND (claimed_until IS NULL OR claimed_until <= ?) ORDER BY id",
+                (now, now),
+            ).fetchall()
+
+        sent = 0
+        for row in rows:
+            if not self._claim(row["id"], time.time()):
+                continue
+            try:
+                outcome, url, error = self._send(row)
+            except Exception as e:  # Netzwerkfehler, Timeouts, ...
+                outcome, url, error = "retry", None, repr(e)
+
+            attempts = row["attempts"] + 1
+            if outcome == "retry" and attempts >= self.max_attempts:
+                outcome = "failed"
+
+            with self._connect() as conn:
+                if outcome == "sent":
+                    sent += 1
+                    conn.execute(
+                        "UPDATE outbox SET status = 'sent', attempts = ?, gist_url = ?, last_error = NULL, "
+                        "claimed_until = NULL WHERE id = ?",
+                        (attempts, url, row["id"]),
+                    )
+                elif outcome == "retry":
+                    conn.execute(
+                        "UPDATE outbox SET attempts = ?, next_attempt = ?, last_error = ?, claimed_until = NULL "
+                        "WHERE id = ?",
+                        (attempts, time.time() + self._backoff(attempts), error, row["id"]),
+                    )
+                else:
+                    conn.execute(
+                        "UPDATE outbox SET status = 'failed', attempts = ?, last_error = ?, claimed_until = NULL "
+                        "WHERE id = ?",
+                        (attempts, error, row["id"]),
+                    )
+        return sent
+
+    def _seconds_until_next(self):
+        with self._connect() as conn:
+            nxt = conn.execute(
+                "SELECT MIN(MAX(next_attempt, COALESCE(claimed_until, 0))) FROM outbox WHERE status = 'pending'"
+            ).fetchone()[0]
+        if nxt is None:
+            return None
+        return max(nxt - time.time(), 0.0)
+
+    # --- Background thread --------------------------------------
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.drain_once()
+                wait = self._seconds_until_next()
+            except Exception:
+                wait = self.base_backoff
+            self._wake.wait(timeout=wait)
+            self._wake.clear()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="issue-outbox", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
@@ -0,0 +1,330 @@
+# ============================================================
+# 🏋️ Lasttest – N gleichzeitige Lern-Sessions gegen einen echten Server
+# ============================================================
+#
+# Startet `streamlit run app/streamlit_app.py` als eigenen Prozess und spielt
+# N Browser-Sessions über das Websocket-Protokoll (/_stcore/stream) ab – so
+# teilen sich alle Sessions wie in Produktion einen Prozess (cache_resource,
+# GIL, Outbox-/Log-Threads). Ablauf je Iteration:
+#
+#   Aufgabe ansehen → Lösung aus tasks.json in den Editor → Run & Check
+#   → bewerten (inkl. Auto-Save) → Nächste Aufgabe   (+ ab und zu ein Issue)
+#
+# Supabase wird durch einen SQLite-Store ersetzt, die GitHub-Gist-API durch
+# einen lokalen HTTP-Stub (beides über eine temporäre secrets.toml). Ausgegeben
+# werden pro N: Durchsatz, Latenz-Perzentile je Schritt und der RSS des Servers.
+#
+#   python app/load_test.py --sessions 1 2 4 8 16 --iterations 5
+#
+# streamlit.testing.AppTest eignet sich dafür nicht: jeder AppTest.run() setzt
+# Runtime und st.secrets prozessweit um, parallele Instanzen stören sich.
+#
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+ROOT = Path(__file__).resolve().parent.parent
+APP_PATH = Path(__file__).resolve().parent / "streamlit_app.py"
+TASKS_PATH = Path(__file__).parent / "tasks.json"
+STEPS = ("load", "run_check", "rate", "next", "issue")
+RATINGS = ("Schwer", "Mittel", "Einfach")
+ACE_ID_RE = re.compile(r"ace_editor_(\d+)$")
+
+
+# ============================
+# 📮 Gist-Stub
+# ============================
+class GistStub:
+    """Local stand-in for POST /gists; counts uploads, always answers 201."""
+
+    def __init__(self):
+        self.received = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                stub.received += 1
+                body = json.dumps({"id": f"stub-{stub.received}"}).encode()
+                self.send_response(201)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/gists"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+
+
+# ============================
+# 🖥️ Server-Prozess
+# ============================
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def write_secrets(directory, gist_url):
+    secrets = {
+        "PROGRESS_SQLITE_PATH": directory / "progress.db",
+        "GITHUB_TOKEN": "load-test",
+        "GIST_API_URL": gist_url,
+        "ISSUE_OUTBOX_PATH": directory / "outbox.sqlite3",
+        "REVIEW_LOG_DIR": directory / "review_events",
+    }
+    path = directory / "secrets.toml"
+    path.write_text("".join(f"{k} = {json.dumps(str(v))}\n" for k, v in secrets.items()), encoding="utf-8")
+    return path
+
+
+class Server:
+    def __init__(self, secrets_path, port):
+        self.port = port
+        self.url = f"ws://127.0.0.1:{port}/_stcore/stream"
+        self.log = open(secrets_path.parent / "server.log", "w")
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", str(APP_PATH),
+             "--server.headless", "true", "--server.port", str(port),
+             "--server.enableXsrfProtection", "false", "--server.fileWatcherType", "none",
+             "--browser.gatherUsageStats", "false", "--secrets.files", str(secrets_path)],
+            cwd=ROOT, stdout=self.log, stderr=subprocess.STDOUT,
+            env={**os.environ, "MPLBACKEND": "Agg"},
+        )
+
+    def wait_ready(self, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Server beendet (Code {self.process.returncode}), siehe {self.log.name}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/_stcore/health", timeout=1):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise TimeoutError("Server nicht erreichbar")
+
+    def rss_mb(self):
+        """Resident set size of the server process (Linux /proc)."""
+        try:
+            with open(f"/proc/{self.process.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        return float("nan")
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.log.close()
+
+
+# ============================
+# 🧑‍🎓 Eine simulierte Browser-Session
+# ============================
+class Session:
+    """One websocket client: keeps widget values like the frontend and times each rerun."""
+
+    def __init__(self, name, url, tasks, iterations, issue_every, seed):
+        self.name = name
+        self.url = url
+        self.tasks = tasks
+        self.iterations = iterations
+        self.issue_every = issue_every
+        self.rng = random.Random(seed)
+        self.latencies = {step: [] for step in STEPS}
+        self.errors = []
+        self.widgets = {}   # Label bzw. Key → Widget-ID des letzten Laufs
+        self.values = {}    # Widget-ID → gesetzter Wert (bleibt wie im Browser erhalten)
+        self.task_id = None
+
+    def _widget(self, label):
+        return next(wid for name, wid in self.widgets.items() if label in name)
+
+    def _collect(self, element):
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            self.errors.append(f"{element.exception.type}: {element.exception.message}")
+            return
+        widget = getattr(element, kind)
+        wid = getattr(widget, "id", "") if "id" in widget.DESCRIPTOR.fields_by_name else ""
+        if not wid:
+            return
+        self.widgets[getattr(widget, "label", "") or wid] = wid
+        match = ACE_ID_RE.search(wid)
+        if match:
+            self.task_id = int(match.group(1))
+
+    async def rerun(self, ws, step, trigger=None, **values):
+        """Send one rerun_script (new widget values + optional button click), wait for script_finished."""
+        for wid, value in values.items():
+            self.values[wid] = value
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        message.rerun_script.page_script_hash = ""
+        for wid, (field, value) in self.values.items():
+            state = message.rerun_script.widget_states.widgets.add()
+            state.id = wid
+            setattr(state, field, value)
+        if trigger:
+            state = message.rerun_script.widget_states.widgets.add()
+            state.id = trigger
+            state.trigger_value = True
+
+        self.widgets = {}
+        start = time.perf_counter()
+        await ws.send(message.SerializeToString())
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await ws.recv())
+            kind = msg.WhichOneof("type")
+            if kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                self._collect(msg.delta.new_element)
+            elif kind == "script_finished":
+                break
+        if step:
+            self.latencies[step].append(time.perf_counter() - start)
+
+    async def run(self):
+        async with websockets.connect(self.url, subprotocols=["streamlit"], max_size=None,
+                                      open_timeout=60, ping_interval=None) as ws:
+            await self.rerun(ws, "load")
+            login = self.widgets["Enter Username"]
+            await self.rerun(ws, None, **{login: ("string_value", self.name)})
+
+            for i in range(self.iterations):
+                task = self.tasks[self.task_id]
+                editor = next(wid for wid in self.widgets.values() if ACE_ID_RE.search(wid))
+                code = json.dumps(task["solution_code"])
+                await self.rerun(ws, "run_check", self._widget("Run & Check"),
+                                 **{editor: ("json_value", code)})
+                await self.rerun(ws, "rate", self._widget(self.rng.choice(RATINGS)))
+                await self.rerun(ws, "next", self._widget("Nächste"))
+
+                if self.issue_every and (i + 1) % self.issue_every == 0:
+                    text = self._widget("Fehlerbeschreibung")
+                    await self.rerun(ws, "issue", self._widget("Issue Absenden"),
+                                     **{text: ("string_value", f"Lasttest {self.name}/{i}: Beschreibung")})
+
+
+# ============================
+# 📈 Ein Lastniveau
+# ============================
+async def run_level(server, n_sessions, tasks, iterations, issue_every):
+    sessions = [Session(f"load-{n_sessions}-{i}", server.url, tasks, iterations, issue_every, seed=i) for i in range(n_sessions)]
+    rss_before = server.rss_mb()
+    peak = rss_before
+
+    start = time.perf_counter()
+    runs = asyncio.gather(*(s.run() for s in sessions), return_exceptions=True)
+    while not runs.done():
+        peak = max(peak, server.rss_mb())
+        await asyncio.wait([runs], timeout=0.2)
+    wall = time.perf_counter() - start
+
+    errors = [e for s in sessions for e in s.errors]
+    errors += [f"{type(r).__name__}: {r}" for r in runs.result() if isinstance(r, BaseException)]
+    latencies = {step: np.array([x for s in sessions for x in s.latencies[step]]) for step in STEPS}
+    interactions = sum(len(v) for v in latencies.values())
+    return {
+        "sessions": n_sessions,
+        "wall_s": wall,
+        "interactions_per_s": interactions / wall,
+        "iterations_per_s": len(latencies["next"]) / wall,
+        "rss_mb_before": rss_before,
+        "rss_mb_peak": peak,
+        "errors": errors,
+        "latency_ms": {
+            step: {p: float(np.percentile(v, p) * 1000) for p in (50, 90, 99)}
+            for step, v in latencies.items() if len(v)
+        },
+    }
+
+
+def print_level(result):
+    print(f"\n▶ N={result['sessions']:<3} {result['wall_s']:6.1f}s · "
+          f"{result['interactions_per_s']:6.1f} Interaktionen/s · "
+          f"{result['iterations_per_s']:5.2f} Aufgaben/s · "
+          f"RSS {result['rss_mb_before']:.0f} → {result['rss_mb_peak']:.0f} MB · "
+          f"{len(result['errors'])} Fehler")
+    print(f"  {'Schritt':<10} {'p50':>8} {'p90':>8} {'p99':>8}")
+    for step, pct in result["latency_ms"].items():
+        print(f"  {step:<10} {pct[50]:>6.0f}ms {pct[90]:>6.0f}ms {pct[99]:>6.0f}ms")
+    for error in result["errors"][:3]:
+        print(f"  ❌ {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for streamlit_app.py.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--iterations", type=int, default=5, help="Aufgaben pro Session")
+    parser.add_argument("--issue-every", type=int, default=5, help="jede k-te Aufgabe ein Issue melden (0 = nie)")
+    parser.add_argument("--slo-ms", type=float, default=1000.0, help="p90-Grenze für Run & Check")
+    parser.add_argument("--out", type=Path, help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    with open(TASKS_PATH, encoding="utf-8") as f:
+        tasks = {t["id"]: t for t in json.load(f)}
+
+    stub = GistStub()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        server = Server(write_secrets(Path(tmp), stub.url), free_port())
+        try:
+            server.wait_ready()
+            print(f"Lasttest: {args.sessions} Sessions × {args.iterations} Aufgaben "
+                  f"(Server-PID {server.process.pid}, Gist-Stub {stub.url})")
+            for n in args.sessions:
+                result = asyncio.run(run_level(server, n, tasks, args.iterations, args.issue_every))
+                print_level(result)
+                results.append(result)
+            time.sleep(1.0)  # Outbox-Thread die letzten Issues abliefern lassen
+        finally:
+            server.stop()
+    stub.close()
+
+    print(f"\nGist-Stub: {stub.received} Issues empfangen")
+    within = [r["sessions"] for r in results
+              if "run_check" in r["latency_ms"] and r["latency_ms"]["run_check"][90] <= args.slo_ms]
+    if within:
+        print(f"Run & Check p90 ≤ {args.slo_ms:.0f} ms bis N = {max(within)} gleichzeitigen Sessions.")
+    else:
+        print(f"Run & Check p90 überschreitet {args.slo_ms:.0f} ms schon bei N = {results[0]['sessions']}.")
+
+    if args.out:
+        args.out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if any(r["errors"] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
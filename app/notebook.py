@@ -0,0 +1,474 @@
+# ============================================================
+# 📓 Notebook-Modus – lebender Namespace pro (Session, Aufgabe)
+# ============================================================
+#
+# Statt bei jedem Run den ganzen Editor in einem frischen Namespace
+# auszuführen, hält der Notebook-Modus pro (Session, Aufgabe) einen Namespace
+# und teilt den Code in Zellen:
+#
+#   - `# %%`-Zeilen trennen Zellen (wie in VS Code / Jupytext),
+#   - ohne Marker ist jede Top-Level-Anweisung eine eigene Zelle.
+#
+# Pro Zelle werden per AST die gebundenen (defines) und gelesenen (uses) Namen
+# bestimmt. Ausgeführt werden nur Zellen, deren AST sich geändert hat, und
+# alles, was von ihnen abhängt; Zellen, die einen Namen fortschreiben (updates),
+# ziehen ihren Vorgänger mit, damit sie nie auf einem schon veränderten Objekt
+# laufen. Als Fortschreiben zählt im Zweifel alles, was ein Objekt ändern kann:
+#
+#   - `df = df.dropna()`, `x += 1`, `df["x"] = ...`, `inplace=True`
+#   - Methodenaufrufe, außer bekannt lesenden (`df.head()`, `xs.count(1)`, ...)
+#   - jeder Aufruf, der einen Namen bekommt (`add(xs)`, `add(l=xs)`, `f(*xs)`),
+#     außer lesenden Builtins und Modul-Funktionen (`len(xs)`, `pd.concat(...)`)
+#   - Aufrufe eigener Funktionen/Klassen: was deren Körper global verändert
+#   - Zufall (`random`, `np.random`): der Generator-Zustand ist ein eigener Name
+#
+# Zellen mit `st`/`plt`/`sns` laufen immer: Figuren und st.*-Aufrufe lassen sich
+# nicht aus dem Cache abspielen. Ausgaben übersprungener Zellen kommen aus dem
+# Cache – stdout sieht aus wie bei einem vollständigen Lauf.
+#
+# NotebookStore hält die Namespaces prozessweit in einer LRU mit Obergrenzen
+# für Anzahl, geschätzten Speicher und Leerlaufzeit.
+#
+import ast
+import bisect
+import io
+import re
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from code_analysis import analyze
+from executor import (
+    FILENAME, INSTRUCTION_BUDGET, TIME_LIMIT, BudgetExceeded, ExecResult, StreamlitRecorder,
+    build_light_globals, build_user_globals, capture_output, instruction_budget, run_code,
+)
+
+CELL_MARKER_RE = re.compile(r"^\s*#\s*%%")
+
+# Methoden, die ihr Objekt nicht verändern (ohne inplace=True); alle anderen zählen als Änderung
+READ_ONLY_METHODS = {
+    # str / list / dict / set
+    "count", "index", "find", "rfind", "startswith", "endswith", "lower", "upper", "title", "capitalize",
+    "strip", "lstrip", "rstrip", "split", "rsplit", "splitlines", "join", "format", "replace", "zfill",
+    "isdigit", "isalpha", "isalnum", "isupper", "islower", "isspace", "encode", "decode",
+    "get", "keys", "values", "items", "copy", "union", "intersection", "difference",
+    "symmetric_difference", "issubset", "issuperset", "isdisjoint",
+    # pandas / NumPy
+    "head", "tail", "describe", "info", "mean", "median", "mode", "sum", "prod", "min", "max", "std", "var",
+    "nunique", "unique", "value_counts", "groupby", "agg", "aggregate", "apply", "map", "transform",
+    "sort_values", "sort_index", "reset_index", "set_index", "rename", "drop", "dropna", "fillna", "merge",
+    "query", "filter", "astype", "round", "abs", "isna", "isnull", "notna", "notnull", "isin", "between",
+    "corr", "cov", "quantile", "cumsum", "cumprod", "cummax", "cummin", "pivot", "pivot_table", "melt",
+    "to_dict", "to_list", "tolist", "to_numpy", "to_frame", "to_string", "idxmax", "idxmin", "nlargest",
+    "nsmallest", "duplicated", "drop_duplicates", "any", "all", "shift", "diff", "pct_change", "rolling",
+    "expanding", "resample", "clip", "where", "mask", "explode", "stack", "unstack", "reshape", "flatten",
+    "ravel", "argmax", "argmin", "argsort", "dot", "item", "first", "last", "transpose",
+    "select_dtypes", "memory_usage", "equals", "combine", "assign", "reindex", "crosstab", "cut", "qcut",
+}
+# Modul-Funktionen, die ihr Argument verändern (sonst gelten Modul-Funktionen als lesend)
+MUTATING_FUNCTIONS = {"shuffle", "copyto", "put", "place", "putmask", "fill_diagonal"}
+# Builtins, die ihre Argumente nur lesen
+READ_ONLY_CALLS = {
+    "print", "len", "repr", "str", "type", "isinstance", "issubclass", "id", "round", "abs", "format",
+    "int", "float", "bool", "complex", "list", "tuple", "set", "frozenset", "dict", "sorted", "reversed",
+    "sum", "min", "max", "any", "all", "enumerate", "zip", "range", "hash", "hasattr", "getattr", "callable",
+    "divmod", "pow", "chr", "ord", "bin", "hex", "oct", "ascii",
+}
+# Namen/Methoden mit prozessweitem Zustand (Figuren, st.*-Aufrufe) – Zellen damit laufen immer
+DISPLAY_NAMES = {"st", "plt", "sns"}
+DISPLAY_METHODS = {"plot", "hist", "boxplot"}  # df.plot() zeichnet in die aktuelle plt-Figur
+RANDOM_STATE = "<random>"  # Pseudo-Name für den globalen Zufallsgenerator
+
+MAX_SESSIONS = 64
+MAX_BYTES = 512 * 1024 * 1024
+MAX_IDLE_SECONDS = 30 * 60
+SIZE_DEPTH = 3
+
+
+@dataclass
+class NotebookResult(ExecResult):
+    cells_total: int = 0
+    cells_run: int = 0
+
+
+@dataclass
+class Cell:
+    key: str          # ast.dump der Anweisungen – Kommentare/Leerzeilen ändern nichts
+    code: types.CodeType
+    defines: frozenset
+    uses: frozenset
+    updates: frozenset = frozenset()  # fortgeschrieben statt neu gebunden – braucht den Vorgänger
+    display: bool = False             # nutzt st/plt/sns → läuft immer
+
+
+@dataclass
+class CellRecord:
+    key: str
+    defines: frozenset
+    stdout: str
+    stderr: str
+
+
+# ============================
+# ✂️ Zellen & Namensanalyse
+# ============================
+def _base_name(node):
+    """``df`` for ``df``, ``df["a"]``, ``df.a.b`` – None if the chain starts elsewhere (e.g. a call)."""
+    while isinstance(node, (ast.Attribute, ast.Subscript)):
+        node = node.value
+    return node.id if isinstance(node, ast.Name) else None
+
+
+def _inplace(call):
+    return any(kw.arg == "inplace" and not (isinstance(kw.value, ast.Constant) and not kw.value.value)
+               for kw in call.keywords)
+
+
+def _call_mutations(call, modules, effects):
+    """Names a call may change: its object, the names it receives, and what a notebook function touches."""
+    func = call.func
+    changed = set()
+    if isinstance(func, ast.Attribute):
+        owner = _base_name(func.value)
+        if owner in modules:
+            reads_args = func.attr not in MUTATING_FUNCTIONS  # pd.concat(xs) liest, random.shuffle(xs) nicht
+        else:
+            reads_args = func.attr in READ_ONLY_METHODS and not _inplace(call)
+            if owner and not reads_args:
+                changed.add(owner)  # xs.append(...), acc.deposit(...), df.drop(..., inplace=True)
+        changed |= effects.get(func.attr, set())
+    else:
+        name = func.id if isinstance(func, ast.Name) else None
+        reads_args = name in READ_ONLY_CALLS
+        changed |= effects.get(name, set())
+    if not reads_args:
+        for arg in [*call.args, *(kw.value for kw in call.keywords)]:
+            base = _base_name(arg.value if isinstance(arg, ast.Starred) else arg)
+            if base and base not in modules:
+                changed.add(base)
+    return changed
+
+
+def _bound_names(node, out, modules, effects, updates=None, scoped=False):
+    """Names a statement binds or (possibly) mutates in the notebook namespace.
+
+    In-place changes also go to ``updates`` (if given); ``scoped``: inside a comprehension,
+    whose loop variables stay local.
+    """
+    updates = out if updates is None else updates
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        out.add(node.name)
+        for decorator in node.decorator_list:
+            _bound_names(decorator, out, modules, effects, updates)
+        return  # Körper hat einen eigenen Scope
+    if isinstance(node, ast.Lambda):
+        return  # läuft erst beim Aufruf
+    if isinstance(node, (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)):
+        scoped = True  # [xs.append(i) for i in ...] ändert xs, bindet aber kein i
+    if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+        if not scoped:
+            out.add(node.id)
+    elif isinstance(node, (ast.Import, ast.ImportFrom)):
+        for alias in node.names:
+            out.add((alias.asname or alias.name).split(".")[0])
+    elif isinstance(node, (ast.Attribute, ast.Subscript)) and isinstance(node.ctx, (ast.Store, ast.Del)):
+        base = _base_name(node)
+        if base:
+            out.add(base)
+            updates.add(base)
+    elif isinstance(node, ast.AugAssign) and _base_name(node.target):
+        updates.add(_base_name(node.target))  # x += 1
+    elif isinstance(node, ast.Call):
+        changed = _call_mutations(node, modules, effects)
+        out |= changed
+        updates |= changed
+    for child in ast.iter_child_nodes(node):
+        _bound_names(child, out, modules, effects, updates, scoped)
+
+
+def _local_names(function):
+    """Parameters and names a function assigns without ``global`` – they never reach the notebook namespace."""
+    args = function.args
+    local = {a.arg for a in [*args.posonlyargs, *args.args, *args.kwonlyargs, args.vararg, args.kwarg] if a}
+    declared = set()
+    for node in (n for stmt in function.body for n in ast.walk(stmt)):
+        if isinstance(node, (ast.Global, ast.Nonlocal)):
+            declared.update(node.names)
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            local.add(node.id)
+    return local - declared
+
+
+def function_effects(tree, modules):
+    """Notebook names each own function may change when called: {function, method or class name: names}.
+
+    Methods are keyed by their name (``acc.deposit()``), classes by the effects of ``__init__``.
+    """
+    functions = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ClassDef):
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    functions.setdefault(item.name, []).append(item)
+                    if item.name == "__init__":
+                        functions.setdefault(node.name, []).append(item)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            functions.setdefault(node.name, []).append(node)
+
+    effects = {name: set() for name in functions}
+    changed = True
+    while changed:  # Fixpunkt: f ruft g → f ändert auch, was g ändert
+        changed = False
+        for name, defs in functions.items():
+            found = set()
+            for function in defs:
+                touched = set()
+                for stmt in function.body:
+                    _bound_names(stmt, touched, modules, effects)
+                found |= touched - _local_names(function) - {"self", "cls"}
+            if not found <= effects[name]:
+                effects[name] |= found
+                changed = True
+    return effects
+
+
+def _uses_random(node):
+    return ((isinstance(node, ast.Name) and node.id == "random")
+            or (isinstance(node, ast.Attribute) and node.attr in ("random", "sample")))
+
+
+def split_cells(source, tree, modules=frozenset()):
+    """Group the top-level statements of ``tree`` into cells (``# %%`` markers or one per statement)."""
+    markers = [n for n, line in enumerate(source.splitlines(), start=1) if CELL_MARKER_RE.match(line)]
+    if markers:
+        groups = {}
+        for stmt in tree.body:
+            groups.setdefault(bisect.bisect_right(markers, stmt.lineno), []).append(stmt)
+        bodies = [groups[k] for k in sorted(groups)]
+    else:
+        bodies = [[stmt] for stmt in tree.body]
+
+    modules = set(modules)
+    for stmt in tree.body:
+        if isinstance(stmt, (ast.Import, ast.ImportFrom)):
+            modules.update((a.asname or a.name).split(".")[0] for a in stmt.names)
+    defined = {name for stmt in tree.body for name in _assigned(stmt)}
+    modules -= defined  # `stats = ...` überschreibt das vorgeladene Modul
+    effects = function_effects(tree, modules)
+
+    cells = []
+    for body in bodies:
+        defines, updates = set(), set()
+        for stmt in body:
+            _bound_names(stmt, defines, modules, effects, updates)
+        uses = set()
+        for node in (n for stmt in body for n in ast.walk(stmt)):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+                uses.add(node.id)
+            elif isinstance(node, ast.AugAssign) and _base_name(node.target):
+                uses.add(_base_name(node.target))  # x += 1 liest x (im AST nur Store)
+            if _uses_random(node):
+                defines.add(RANDOM_STATE)  # Zufall schreibt den Generator-Zustand fort
+                updates.add(RANDOM_STATE)
+        uses |= updates
+        cells.append(Cell(
+            key="\n".join(ast.dump(stmt) for stmt in body),
+            code=compile(ast.Module(body=body, type_ignores=[]), FILENAME, "exec"),
+            defines=frozenset(defines | updates),
+            uses=frozenset(uses),
+            updates=frozenset(updates | (uses & defines)),  # df = df.dropna() liest den alten Wert
+            display=bool(uses & DISPLAY_NAMES) or any(
+                isinstance(n, ast.Attribute) and n.attr in DISPLAY_METHODS for stmt in body for n in ast.walk(stmt)),
+        ))
+    return cells
+
+
+def _assigned(stmt):
+    """Names a top-level statement rebinds (assignment targets, defs, imports)."""
+    out = set()
+    for node in ast.walk(stmt):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            out.add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            out.add(node.name)
+    return out
+
+
+def plan(cells, records):
+    """Indices of the cells that must run, given the records of the previous run."""
+    run = {i for i, cell in enumerate(cells)
+           if i >= len(records) or records[i].key != cell.key or cell.display}
+    grew = True
+    while grew:
+        grew = False
+        # vorwärts: wer etwas liest/überschreibt, das neu berechnet wird, läuft mit
+        dirty = set()
+        for i, cell in enumerate(cells):
+            if i in run:
+                dirty |= cell.defines | (records[i].defines if i < len(records) else frozenset())
+            elif (cell.uses | cell.defines) & dirty:
+                run.add(i)
+                dirty |= cell.defines
+                grew = True
+        # rückwärts: In-place-Änderungen brauchen den frischen Wert ihres Vorgängers
+        for i in sorted(run):
+            for name in cells[i].updates:
+                upstream = next((j for j in range(i - 1, -1, -1) if name in cells[j].defines), None)
+                if upstream is not None and upstream not in run:
+                    run.add(upstream)
+                    grew = True
+    return run
+
+
+# ============================
+# 📏 Speicher-Schätzung
+# ============================
+def estimate_size(value, seen=None, depth=SIZE_DEPTH):
+    """Rough byte size: deep for pandas/NumPy, shallow-recursive for containers, 0 for modules/code."""
+    seen = set() if seen is None else seen
+    if id(value) in seen or isinstance(value, (types.ModuleType, types.FunctionType, type,
+                                               types.BuiltinFunctionType, types.MethodType)):
+        return 0
+    seen.add(id(value))
+
+    if type(value).__module__.startswith("pandas") and hasattr(value, "memory_usage"):
+        try:
+            usage = value.memory_usage(deep=True)
+            return int(usage.sum() if hasattr(usage, "sum") else usage)
+        except Exception:
+            return sys.getsizeof(value)
+    if hasattr(value, "nbytes") and hasattr(value, "dtype"):
+        return int(value.nbytes)
+
+    size = sys.getsizeof(value)
+    if depth > 0:
+        if isinstance(value, dict):
+            size += sum(estimate_size(k, seen, depth - 1) + estimate_size(v, seen, depth - 1) for k, v in value.items())
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            size += sum(estimate_size(v, seen, depth - 1) for v in value)
+    return size
+
+
+# ============================
+# 📓 Eine Notebook-Session
+# ============================
+class NotebookSession:
+    def __init__(self, route):
+        self.route = route
+        self.namespace = build_light_globals() if route == "light" else build_user_globals()
+        self._base_names = set(self.namespace)
+        self.records = []
+        self.size = 0
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _drop_stale(self, cells, to_run):
+        """Forget names a fresh run would not have: defined only by removed/changed code, or updated in place without a definer."""
+        defined_now = set().union(*(c.defines for c in cells)) if cells else set()
+        defined_before = set().union(*(r.defines for r in self.records)) if self.records else set()
+        stale = defined_before - defined_now
+        for i in to_run:
+            for name in cells[i].updates:
+                if not any(name in cells[j].defines for j in range(i)):
+                    stale.add(name)
+        for name in stale - self._base_names:
+            self.namespace.pop(name, None)
+
+    def run(self, source, profile, instruction_limit=INSTRUCTION_BUDGET):
+        start = time.perf_counter()
+        self.last_used = time.monotonic()
+        cells = split_cells(source, profile.tree, self._base_names)
+        to_run = plan(cells, self.records)
+        self._drop_stale(cells, to_run)
+
+        recorder = self.namespace.get("st")
+        if isinstance(recorder, StreamlitRecorder):
+            recorder.calls = []  # nur die st.*-Aufrufe dieses Laufs
+
+        records, stdout, stderr, error = [], [], [], None
+        for i, cell in enumerate(cells):
+            if i not in to_run:
+                record = self.records[i]
+            else:
+                out, err = io.StringIO(), io.StringIO()
+                budget = instruction_budget(instruction_limit, TIME_LIMIT)
+                try:
+                    with capture_output(out, err), budget:
+                        exec(cell.code, self.namespace)
+                except (Exception, BudgetExceeded) as e:
+                    error = e
+                record = CellRecord(cell.key, cell.defines, out.getvalue(), err.getvalue())
+            stdout.append(record.stdout)
+            stderr.append(record.stderr)
+            if error is not None:
+                break  # fehlerhafte Zelle + Rest laufen beim nächsten Mal sicher neu
+            records.append(record)
+        self.records = records
+
+        return NotebookResult(
+            globals=self.namespace,
+            stdout="".join(stdout),
+            stderr="".join(stderr),
+            error=error,
+            route="notebook",
+            duration=time.perf_counter() - start,
+            st_calls=recorder.calls if isinstance(recorder, StreamlitRecorder) else [],
+            cells_total=len(cells),
+            cells_run=len(to_run & set(range(len(records) + (error is not None)))),
+        )
+
+
+# ============================
+# 🗄️ Prozessweiter Speicher (LRU + Obergrenzen)
+# ============================
+class NotebookStore:
+    """Live namespaces keyed by (session id, task id); least recently used are evicted first."""
+
+    def __init__(self, max_sessions=MAX_SESSIONS, max_bytes=MAX_BYTES, max_idle=MAX_IDLE_SECONDS):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.max_idle = max_idle
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def run(self, key, source, instruction_limit=INSTRUCTION_BUDGET):
+        profile = analyze(source, FILENAME)
+        if profile.syntax_error is not None or profile.violations:
+            return run_code(source, profile)  # gleiche Fehlermeldungen wie im normalen Modus
+
+        with self._lock:
+            session = self._sessions.pop(key, None)
+            if session is None or session.route != profile.route:
+                session = NotebookSession(profile.route)
+            self._sessions[key] = session
+
+        with session.lock:
+            result = session.run(source, profile, instruction_limit)
+            session.size = estimate_size(
+                {k: v for k, v in session.namespace.items() if k not in session._base_names})
+
+        with self._lock:
+            self._evict(keep=key)
+        return result
+
+    def drop(self, key):
+        with self._lock:
+            self._sessions.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return len(self._sessions), sum(s.size for s in self._sessions.values())
+
+    def _evict(self, keep):
+        now = time.monotonic()
+        for key in [k for k, s in self._sessions.items() if k != keep and now - s.last_used > self.max_idle]:
+            del self._sessions[key]
+        total = sum(s.size for s in self._sessions.values())
+        for key in list(self._sessions):
+            if len(self._sessions) <= self.max_sessions and total <= self.max_bytes:
+                break
+            if key != keep:
+                total -= self._sessions.pop(key).size
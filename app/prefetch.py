@@ -0,0 +1,86 @@
+# ============================================================
+# 🔮 Prefetch – Ressourcen der nächsten Aufgabe im Hintergrund laden
+# ============================================================
+#
+# Die App wählt die nächste Aufgabe schon am Ende eines Laufs (gleiche Regeln
+# wie "Nächste Aufgabe") und merkt sie sich mit review_rev + Filter als
+# Schlüssel. Der Prefetcher lädt währenddessen in einem Hintergrund-Thread,
+# was die Aufgabe braucht:
+#
+#   • den Referenz-Abschnitt, den die Seitenleiste für ihre Kategorie zuerst zeigt
+#   • bei Aufgaben für den Sandbox-Pool (pandas & Co.) die Worker-Prozesse: dort
+#     liest der Editor-Code pd.read_csv("data/...") über checker.load_dataset,
+#     also wärmt der Worker genau diesen Cache + die Referenzlösung der Testfälle.
+#     Nur wenn es etwas bringt: ein Datensatz fehlt im Shared-Memory-Segment
+#     oder Testfälle brauchen die Referenzlösung.
+#   • bei leichten Aufgaben (Prüfung im App-Prozess) Referenzlösung + "$csv"-
+#     Argumente direkt hier (checker.prepare_task; run_code fängt Ausgaben pro
+#     Thread ab, stört also keine laufenden Skripte)
+#   • den Inhalt des Lösungsblocks (solution_block)
+#
+# Fehler landen im Log – angezeigt werden sie erst beim eigentlichen Prüfen.
+#
+import logging
+import re
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+
+from checker import has_cases, needs_reference, prepare_task
+from shared_state import dataset_path, has_shared
+
+NO_EXPLANATION = "_Keine Erklärung für diese Aufgabe hinterlegt._"
+
+log = logging.getLogger(__name__)
+
+DATASET_RE = re.compile(r"data/[\w.-]+\.csv")
+
+
+def task_datasets(task):
+    """``data/*.csv`` paths a task mentions that exist (as written, relative to the repository root)."""
+    text = " ".join(str(task.get(key, "")) for key in ("question_raw", "solution_code", "test_cases"))
+    return sorted(path for path in set(DATASET_RE.findall(text)) if dataset_path(path).is_file())
+
+
+def worth_warming(task):
+    """Whether a sandbox worker would have to parse a dataset or run the reference solution for ``task``."""
+    if has_cases(task) and needs_reference(task):
+        return True
+    return any(not has_shared(path) for path in task_datasets(task))
+
+
+class Prefetcher:
+    """One worker thread per process; every task is warmed at most once."""
+
+    def __init__(self, reference, sandbox):
+        self.reference = reference
+        self.sandbox = sandbox
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        self._warmed = set()
+        self._solutions = {}  # task id → (Code, Erklärung) des Lösungsblocks
+
+    def warm(self, task):
+        if task["id"] in self._warmed:
+            return None
+        self._warmed.add(task["id"])
+        return self._pool.submit(self._warm, task)
+
+    def _warm(self, task):
+        try:
+            if not self.sandbox.runs_in_worker(task):
+                prepare_task(task)
+            elif worth_warming(task):
+                self.sandbox.prepare(task)
+            self.solution_block(task)
+            sections = self.reference.for_category(task.get("category", ""))
+            if sections:
+                self.reference.fragment(sections[0]["id"])
+        except Exception:
+            log.exception("prefetch of task %s failed", task["id"])
+
+    def solution_block(self, task):
+        """(code, explanation markdown) for the task's "Lösung & Erklärung" expander, built once per task."""
+        block = self._solutions.get(task["id"])
+        if block is None:
+            code = textwrap.dedent(task.get("solution_code", "")).strip("\n")
+            block = self._solutions[task["id"]] = (code, task.get("explanation") or NO_EXPLANATION)
+        return block
@@ -0,0 +1,193 @@
+# ============================================================
+# 📈 Progress – typisierter, array-basierter Lernstand einer Session
+# ============================================================
+#
+# Ein Eintrag pro Task-ID (Index = Task-ID) statt drei verschachtelter Dicts:
+#   attempts     int32    Anzahl Bewertungen
+#   rating       int8     letzter Rating-Code (scheduling.RATINGS), -1 = keiner
+#   interval     float64  Wiederholungsintervall in Tagen
+#   last_review  float64  Unix-Zeit der letzten Bewertung, 0 = nie
+#   unsynced     int32    Versuche seit dem letzten Sync (Delta für den Store)
+#
+# Serialisiert wird nur der berührte Teil als versioniertes JSON-Dict
+# (PROGRESS_VERSION); das alte Dict-Format (Version 1) wird beim Laden erkannt.
+# Für den Delta-Sync (progress_store.sync) gibt es zusätzlich Task-Zeilen:
+#   {"task_id", "attempts", "rating", "interval_days", "last_review"}
+#
+import time
+
+import numpy as np
+
+from scheduling import RATINGS, RATING_CODES, DEFAULT_INTERVAL, SECONDS_PER_DAY, next_interval, is_due
+
+PROGRESS_VERSION = 2
+NO_RATING = -1
+ARRAYS = ("attempts", "rating", "interval", "last_review", "unsynced")
+
+
+class Progress:
+    """Learning state of one session as NumPy arrays indexed by task id."""
+
+    def __init__(self, size):
+        self.attempts = np.zeros(size, dtype=np.int32)
+        self.rating = np.full(size, NO_RATING, dtype=np.int8)
+        self.interval = np.full(size, DEFAULT_INTERVAL, dtype=np.float64)
+        self.last_review = np.zeros(size, dtype=np.float64)
+        self.unsynced = np.zeros(size, dtype=np.int32)
+        self.timestamp = None
+
+    @classmethod
+    def for_tasks(cls, tasks):
+        return cls(max(t["id"] for t in tasks) + 1)
+
+    def __len__(self):
+        return len(self.attempts)
+
+    def _ensure_size(self, size):
+        if size <= len(self):
+            return
+        grown = Progress(size)
+        for name in ARRAYS:
+            getattr(grown, name)[:len(self)] = getattr(self, name)
+            setattr(self, name, getattr(grown, name))
+
+    def copy(self):
+        other = Progress(len(self))
+        for name in ARRAYS:
+            getattr(other, name)[:] = getattr(self, name)
+        other.timestamp = self.timestamp
+        return other
+
+    # --- Updates ------------------------------------------------
+    def record_rating(self, task_id, rating, now=None):
+        """Count an attempt, store the rating and advance the interval. Returns (before, after)."""
+        now = time.time() if now is None else now
+        self._ensure_size(task_id + 1)
+        code = RATING_CODES[rating]
+
+        before = float(self.interval[task_id])
+        after = float(next_interval(before, code))
+
+        self.attempts[task_id] += 1
+        self.unsynced[task_id] += 1
+        self.rating[task_id] = code
+        self.interval[task_id] = after
+        self.last_review[task_id] = now
+        return before, after
+
+    # --- Delta-Sync -------------------------------------------
+    def rows(self, task_ids):
+        """Task rows with absolute values (what the store keeps per task)."""
+        return [
+            {
+                "task_id": tid,
+                "attempts": int(self.attempts[tid]),
+                "rating": int(self.rating[tid]),
+                "interval_days": float(self.interval[tid]),
+                "last_review": float(self.last_review[tid]),
+            }
+            for tid in np.asarray(task_ids, dtype=np.int64).tolist()
+        ]
+
+    def pending_changes(self):
+        """Rows changed since the last sync; ``attempts`` is the delta, not the total."""
+        changes = self.rows(np.flatnonzero(self.unsynced))
+        for row in changes:
+            row["attempts"] = int(self.unsynced[row["task_id"]])
+        return changes
+
+    def apply_rows(self, rows):
+        """Overwrite tasks with merged rows from the store and clear pending deltas.
+
+        Returns the task ids whose state actually changed (rows echoing the local state do not count).
+        """
+        if rows:
+            self._ensure_size(max(row["task_id"] for row in rows) + 1)
+        changed = []
+        for row in rows:
+            tid = row["task_id"]
+            state = (row["attempts"], row["rating"], row["interval_days"], row["last_review"])
+            if state != (self.attempts[tid], self.rating[tid], self.interval[tid], self.last_review[tid]):
+                changed.append(tid)
+            self.attempts[tid] = row["attempts"]
+            self.rating[tid] = row["rating"]
+            self.interval[tid] = row["interval_days"]
+            self.last_review[tid] = row["last_review"]
+        self.unsynced[:] = 0
+        return changed
+
+    # --- Abfragen (vektorisiert) --------------------------------
+    def touched_ids(self):
+        """Task ids with any recorded state."""
+        return np.flatnonzero((self.attempts > 0) | (self.last_review > 0) | (self.rating != NO_RATING))
+
+    def reviewed_ids(self):
+        return np.flatnonzero(self.last_review > 0)
+
+    def answered_count(self):
+        return int(np.count_nonzero(self.attempts >= 1))
+
+    def due_mask(self, task_ids, now=None):
+        """Bool array: which of ``task_ids`` are due (never-reviewed tasks are always due)."""
+        now = time.time() if now is None else now
+        task_ids = np.asarray(task_ids, dtype=np.int64)
+        in_range = task_ids < len(self)
+        ids = np.where(in_range, task_ids, 0)
+        elapsed_days = (now - self.last_review[ids]) / SECONDS_PER_DAY
+        return ~in_range | is_due(elapsed_days, self.interval[ids])
+
+    def rating_name(self, task_id):
+        code = int(self.rating[task_id]) if task_id < len(self) else NO_RATING
+        return RATINGS[code] if code != NO_RATING else None
+
+    # --- Serialisierung -----------------------------------------
+    def to_dict(self):
+        ids = self.touched_ids()
+        return {
+            "version": PROGRESS_VERSION,
+            "task_ids": ids.tolist(),
+            "attempts": self.attempts[ids].tolist(),
+            "ratings": self.rating[ids].tolist(),
+            "intervals": self.interval[ids].tolist(),
+            "last_review": self.last_review[ids].tolist(),
+            "timestamp": time.time(),
+        }
+
+    @classmethod
+    def from_dict(cls, data, size=0):
+        """Build from a serialized dict (current version or the legacy dict format)."""
+        data = data or {}
+        version = data.get("version", 1)
+        if version == 1:
+            return cls._from_legacy(data, size)
+        if version != PROGRESS_VERSION:
+            raise ValueError(f"Unsupported progress version {version}")
+
+        ids = np.asarray(data.get("task_ids", []), dtype=np.int64)
+        progress = cls(max(size, int(ids.max()) + 1 if len(ids) else 0))
+        progress.attempts[ids] = data.get("attempts", [])
+        progress.rating[ids] = data.get("ratings", [])
+        progress.interval[ids] = data.get("intervals", [])
+        progress.last_review[ids] = data.get("last_review", [])
+        progress.timestamp = data.get("timestamp")
+        return progress
+
+    @classmethod
+    def _from_legacy(cls, data, size):
+        # Version 1: {"ratings": {tid: name}, "attempts": {tid: n}, "review_data": {tid: {...}}}
+        # Keys sind int in einer laufenden Session, str nach dem JSON-Roundtrip.
+        ratings = {int(k): v for k, v in (data.get("ratings") or {}).items()}
+        attempts = {int(k): v for k, v in (data.get("attempts") or {}).items()}
+        review_data = {int(k): v for k, v in (data.get("review_data") or {}).items()}
+
+        max_id = max([*ratings, *attempts, *review_data], default=-1)
+        progress = cls(max(size, max_id + 1))
+        for tid, name in ratings.items():
+            progress.rating[tid] = RATING_CODES.get(name, NO_RATING)
+        for tid, count in attempts.items():
+            progress.attempts[tid] = count
+        for tid, review in review_data.items():
+            progress.interval[tid] = review.get("interval", DEFAULT_INTERVAL)
+            progress.last_review[tid] = review.get("last_review", 0.0)
+        progress.timestamp = data.get("timestamp")
+        return progress
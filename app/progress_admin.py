@@ -0,0 +1,231 @@
+# ============================================================
+# 🛠️ Progress Admin – Bulk Export/Import aller Lernstände
+# ============================================================
+#
+#   python app/progress_admin.py export progress.parquet
+#   python app/progress_admin.py import progress.parquet --batch-size 1000
+#   python app/progress_admin.py export backup.arrow --sqlite local.db
+#
+# Export: Keyset-Pagination über users → eine Zeile pro (User, Task),
+# alte und neue Progress-Formate werden über Progress.from_dict gelesen;
+# jede Seite wird sofort als eigene Row-Group / Record-Batch geschrieben.
+# Import: liest die Datei batchweise und upsertet gesammelte User in Batches.
+# Der Speicherbedarf hängt damit nur von --batch-size ab, nicht von der User-Zahl.
+#
+# Supabase-Zugang: SUPABASE_URL + SUPABASE_SERVICE_KEY (oder SUPABASE_ANON_KEY)
+# aus der Umgebung, sonst aus .streamlit/secrets.toml.
+#
+import argparse
+import os
+import sys
+import time
+import tomllib
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from progress import Progress, PROGRESS_VERSION, NO_RATING
+from progress_store import SupabaseProgressStore, SQLiteProgressStore
+from scheduling import RATINGS, RATING_CODES, DEFAULT_INTERVAL
+
+SCHEMA = pa.schema([
+    ("username", pa.string()),
+    ("task_id", pa.int32()),          # null = User ohne Aufgaben-Fortschritt
+    ("attempts", pa.int32()),
+    ("rating", pa.dictionary(pa.int8(), pa.string())),  # Codes in RATINGS, Dictionary immer dasselbe
+    ("interval", pa.float64()),
+    ("last_review", pa.float64()),
+    ("timestamp", pa.float64()),      # Zeitstempel des gesamten Progress-Blobs
+])
+RATING_DICTIONARY = pa.array(RATINGS, pa.string())
+
+
+# ============================
+# 🔌 Backend
+# ============================
+def open_store(args):
+    if args.sqlite:
+        return SQLiteProgressStore(args.sqlite)
+
+    url = os.environ.get("SUPABASE_URL")
+    key = os.environ.get("SUPABASE_SERVICE_KEY") or os.environ.get("SUPABASE_ANON_KEY")
+    secrets_path = Path(".streamlit") / "secrets.toml"
+    if (not url or not key) and secrets_path.exists():
+        with open(secrets_path, "rb") as f:
+            secrets = tomllib.load(f)
+        url = url or secrets.get("SUPABASE_URL")
+        key = key or secrets.get("SUPABASE_SERVICE_KEY") or secrets.get("SUPABASE_ANON_KEY")
+    if not url or not key:
+        sys.exit("❌ SUPABASE_URL / SUPABASE_SERVICE_KEY fehlen (oder --sqlite angeben).")
+
+    from supabase import create_client
+    return SupabaseProgressStore(create_client(url, key))
+
+
+# ============================
+# 🔄 Progress-Blob ↔ Zeilen
+# ============================
+def progress_to_columns(page):
+    """Flatten a page of (username, progress) into column lists (one row per user × task).
+
+    ``rating`` holds codes into RATINGS (None = unrated), see ``columns_to_table``.
+    """
+    cols = {name: [] for name in SCHEMA.names}
+
+    def add(username, task_id, attempts, rating, interval, last_review, timestamp):
+        cols["username"].append(username)
+        cols["task_id"].append(task_id)
+        cols["attempts"].append(attempts)
+        cols["rating"].append(rating)
+        cols["interval"].append(interval)
+        cols["last_review"].append(last_review)
+        cols["timestamp"].append(timestamp)
+
+    for username, data in page:
+        progress = Progress.from_dict(data)
+        task_ids = progress.touched_ids()
+        if not len(task_ids):
+            add(username, None, None, None, None, None, progress.timestamp)
+        for tid in task_ids.tolist():
+            reviewed = progress.last_review[tid] > 0
+            code = int(progress.rating[tid])
+            add(username, tid, int(progress.attempts[tid]), None if code == NO_RATING else code,
+                float(progress.interval[tid]) if reviewed else None,
+                float(progress.last_review[tid]) if reviewed else None,
+                progress.timestamp)
+    return cols
+
+
+def columns_to_table(cols):
+    """Arrow table in SCHEMA; every page shares RATING_DICTIONARY (IPC files allow no dictionary change)."""
+    arrays = [pa.array(cols[field.name], field.type) for field in SCHEMA if field.name != "rating"]
+    rating = pa.DictionaryArray.from_arrays(pa.array(cols["rating"], pa.int8()), RATING_DICTIONARY)
+    arrays.insert(SCHEMA.get_field_index("rating"), rating)
+    return pa.Table.from_arrays(arrays, schema=SCHEMA)
+
+
+def rows_to_progress(batch, pending):
+    """Fold a record batch into per-user progress dicts (``Progress.to_dict`` format).
+
+    ``pending`` carries the last (possibly incomplete) user over to the next
+    batch. Returns the completed (username, progress) pairs.
+    """
+    cols = batch.to_pydict()
+    done = []
+    for i, username in enumerate(cols["username"]):
+        if pending and pending[0] != username:
+            done.append(pending)
+            pending = None
+        if pending is None:
+            pending = (username, {"version": PROGRESS_VERSION, "task_ids": [], "attempts": [], "ratings": [],
+                                  "intervals": [], "last_review": [], "timestamp": cols["timestamp"][i]})
+
+        tid = cols["task_id"][i]
+        if tid is None:
+            continue
+        progress = pending[1]
+        rating = cols["rating"][i]
+        interval = cols["interval"][i]
+        progress["task_ids"].append(tid)
+        progress["attempts"].append(cols["attempts"][i] or 0)
+        progress["ratings"].append(RATING_CODES.get(rating, NO_RATING))
+        progress["intervals"].append(DEFAULT_INTERVAL if interval is None else interval)
+        progress["last_review"].append(cols["last_review"][i] or 0.0)
+    return done, pending
+
+
+# ============================
+# 📤 Export / 📥 Import
+# ============================
+class Throughput:
+    def __init__(self, label):
+        self.label = label
+        self.start = time.perf_counter()
+        self.users = 0
+        self.rows = 0
+
+    def report(self, users, rows):
+        self.users += users
+        self.rows += rows
+        elapsed = time.perf_counter() - self.start
+        print(f"{self.label}: {self.users:>8} User · {self.rows:>10} Zeilen · "
+              f"{self.rows / max(elapsed, 1e-9):>10.0f} Zeilen/s · {elapsed:6.1f}s", flush=True)
+
+
+def export_progress(store, path, batch_size=500):
+    path = Path(path)
+    stats = Throughput("Export")
+    if path.suffix == ".parquet":
+        writer = pq.ParquetWriter(path, SCHEMA, compression="zstd")
+        write = writer.write_table
+    else:
+        writer = ipc.new_file(path, SCHEMA)
+        write = writer.write_table
+
+    try:
+        for page in store.iter_pages(batch_size):
+            table = columns_to_table(progress_to_columns(page))
+            write(table)
+            stats.report(len(page), table.num_rows)
+    finally:
+        writer.close()
+    return stats
+
+
+def iter_batches(path, batch_size):
+    path = Path(path)
+    if path.suffix == ".parquet":
+        yield from pq.ParquetFile(path).iter_batches(batch_size=batch_size)
+    else:
+        reader = ipc.open_file(path)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+
+
+def _row_count(progress):
+    return max(len(progress["task_ids"]), 1)
+
+
+def import_progress(store, path, batch_size=500):
+    """Upsert every user from ``path``; rows must be grouped by username (as exported)."""
+    stats = Throughput("Import")
+    pending, buffer = None, []
+
+    def upsert(chunk):
+        store.upsert_many(chunk)
+        stats.report(len(chunk), sum(_row_count(progress) for _, progress in chunk))
+
+    for batch in iter_batches(path, batch_size * 20):
+        done, pending = rows_to_progress(batch, pending)
+        buffer.extend(done)
+        while len(buffer) >= batch_size:
+            upsert(buffer[:batch_size])
+            buffer = buffer[batch_size:]
+
+    if pending:
+        buffer.append(pending)
+    if buffer:
+        upsert(buffer)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk export/import of all learners' progress.")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", help="*.parquet oder *.arrow (Arrow IPC)")
+    parser.add_argument("--batch-size", type=int, default=500, help="User pro Seite / Upsert")
+    parser.add_argument("--sqlite", help="lokale SQLite-Datei statt Supabase")
+    args = parser.parse_args()
+
+    store = open_store(args)
+    if args.command == "export":
+        stats = export_progress(store, args.path, args.batch_size)
+    else:
+        stats = import_progress(store, args.path, args.batch_size)
+    print(f"✅ {args.command} fertig: {stats.users} User, {stats.rows} Zeilen")
+
+
+if __name__ == "__main__":
+    main()
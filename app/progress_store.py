@@ -0,0 +1,216 @@
+# ============================================================
+# 🗄️ Progress Store – Supabase (Produktion) oder SQLite (lokal / Tests)
+# ============================================================
+#
+# Beide Backends haben dieselbe Schnittstelle, damit App, Admin-CLI und
+# Lasttests ohne Änderungen zwischen Cloud und lokaler Datei wechseln können.
+#
+# Fortschritt liegt pro (User, Task) in progress_tasks. Die App synchronisiert
+# per sync(): sie schickt nur die seit ihrem Token geänderten Tasks, der Store
+# merged atomar (Versuche addieren, neuere Bewertung gewinnt) und antwortet mit
+# allen Tasks, die seit dem Token geändert wurden, und dem neuen Token.
+# Das Postgres-Gegenstück liegt in sql/progress_sync.sql. Alte Blobs aus
+# users_progress werden gelesen und beim ersten Sync übernommen.
+#
+import json
+import sqlite3
+import threading
+import time
+
+from progress import Progress
+
+
+def _blob_rows(blob):
+    progress = Progress.from_dict(blob)
+    return progress.rows(progress.touched_ids())
+
+
+class SupabaseProgressStore:
+    """Tables ``users`` and ``progress_tasks`` in Supabase, accessed through the RPCs in sql/progress_sync.sql."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def user_exists(self, username):
+        res = self.client.table("users").select("username").eq("username", username).execute()
+        return len(res.data) > 0
+
+    def create_user(self, username, progress=None):
+        self.client.table("users").insert({"username": username}).execute()
+        if progress:
+            self.upsert(username, progress)
+
+    def get(self, username):
+        return self.client.rpc("progress_json", {"p_username": username}).execute().data
+
+    def upsert(self, username, progress):
+        self.upsert_many([(username, progress)])
+
+    def upsert_many(self, rows):
+        """Overwrite the tasks contained in each (username, progress dict)."""
+        if rows:
+            self.client.rpc("replace_progress", {
+                "p_users": [{"username": username, "rows": _blob_rows(progress)} for username, progress in rows]
+            }).execute()
+
+    def sync(self, username, since, changes):
+        """Apply ``changes`` atomically; return (token, rows changed since ``since``)."""
+        res = self.client.rpc("sync_progress", {
+            "p_username": username, "p_since": since, "p_changes": changes,
+        }).execute().data
+        return res["token"], res["rows"]
+
+    def iter_pages(self, batch_size=500):
+        """Yield lists of (username, progress), keyset-paginated by username."""
+        last = None
+        while True:
+            page = self.client.rpc("progress_page", {"p_after": last, "p_limit": batch_size}).execute().data
+            if not page:
+                return
+            yield [(row["username"], row["progress"]) for row in page]
+            if len(page) < batch_size:
+                return
+            last = page[-1]["username"]
+
+
+class SQLiteProgressStore:
+    """Same interface backed by a local SQLite file (``:memory:`` works too)."""
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS users (username TEXT PRIMARY KEY)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS users_progress (username TEXT PRIMARY KEY, progress TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS progress_tasks ("
+                "username TEXT NOT NULL, task_id INTEGER NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+                "rating INTEGER NOT NULL DEFAULT -1, interval_days REAL NOT NULL DEFAULT 0.5, "
+                "last_review REAL NOT NULL DEFAULT 0, version INTEGER NOT NULL, "
+                "PRIMARY KEY (username, task_id))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS progress_tasks_version ON progress_tasks (username, version)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS progress_sync ("
+                "username TEXT PRIMARY KEY, token INTEGER NOT NULL DEFAULT 0, updated_at REAL)"
+            )
+
+    def user_exists(self, username):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM users WHERE username = ?", (username,)).fetchone()
+        return row is not None
+
+    def create_user(self, username, progress=None):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO users (username) VALUES (?)", (username,))
+        if progress:
+            self.upsert(username, progress)
+
+    def _progress_json(self, username):
+        rows = self._conn.execute(
+            "SELECT task_id, attempts, rating, interval_days, last_review FROM progress_tasks "
+            "WHERE username = ? ORDER BY task_id", (username,)
+        ).fetchall()
+        if not rows:
+            row = self._conn.execute("SELECT progress FROM users_progress WHERE username = ?", (username,)).fetchone()
+            return json.loads(row[0]) if row else None
+
+        task_ids, attempts, ratings, intervals, last_review = (list(col) for col in zip(*rows))
+        updated_at = self._conn.execute(
+            "SELECT updated_at FROM progress_sync WHERE username = ?", (username,)
+        ).fetchone()
+        return {"version": 2, "task_ids": task_ids, "attempts": attempts, "ratings": ratings,
+                "intervals": intervals, "last_review": last_review, "timestamp": updated_at[0] if updated_at else None}
+
+    def get(self, username):
+        with self._lock:
+            return self._progress_json(username)
+
+    def _lock_token(self, username):
+        """Counterpart of lock_progress_token: current token, legacy blob migrated on first use."""
+        self._conn.execute("INSERT INTO progress_sync (username) VALUES (?) ON CONFLICT(username) DO NOTHING",
+                           (username,))
+        token = self._conn.execute("SELECT token FROM progress_sync WHERE username = ?", (username,)).fetchone()[0]
+        if token == 0:
+            token = 1
+            blob = self._conn.execute("SELECT progress FROM users_progress WHERE username = ?", (username,)).fetchone()
+            if blob:
+                self._conn.executemany(
+                    "INSERT INTO progress_tasks (username, task_id, attempts, rating, interval_days, last_review, "
+                    "version) VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(username, task_id) DO NOTHING",
+                    [(username, r["task_id"], r["attempts"], r["rating"], r["interval_days"], r["last_review"], token)
+                     for r in _blob_rows(json.loads(blob[0]))],
+                )
+            self._conn.execute("UPDATE progress_sync SET token = ? WHERE username = ?", (token, username))
+        return token
+
+    def upsert(self, username, progress):
+        self.upsert_many([(username, progress)])
+
+    def upsert_many(self, rows):
+        """Overwrite the tasks contained in each (username, progress dict)."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO users (username) VALUES (?) ON CONFLICT(username) DO NOTHING",
+                [(username,) for username, _ in rows],
+            )
+            for username, progress in rows:
+                token = self._lock_token(username) + 1
+                self._conn.executemany(
+                    "INSERT INTO progress_tasks (username, task_id, attempts, rating, interval_days, last_review, "
+                    "version) VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(username, task_id) DO UPDATE SET "
+                    "attempts = excluded.attempts, rating = excluded.rating, "
+                    "interval_days = excluded.interval_days, last_review = excluded.last_review, "
+                    "version = excluded.version",
+                    [(username, r["task_id"], r["attempts"], r["rating"], r["interval_days"], r["last_review"], token)
+                     for r in _blob_rows(progress)],
+                )
+                self._conn.execute("UPDATE progress_sync SET token = ?, updated_at = ? WHERE username = ?",
+                                   (token, time.time(), username))
+
+    def sync(self, username, since, changes):
+        """Apply ``changes`` atomically; return (token, rows changed since ``since``)."""
+        with self._lock, self._conn:
+            token = self._lock_token(username)
+            if changes:
+                token += 1
+                self._conn.executemany(
+                    "INSERT INTO progress_tasks (username, task_id, attempts, rating, interval_days, last_review, "
+                    "version) VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(username, task_id) DO UPDATE SET "
+                    "attempts = attempts + excluded.attempts, "
+                    "rating = CASE WHEN excluded.last_review > last_review THEN excluded.rating ELSE rating END, "
+                    "interval_days = CASE WHEN excluded.last_review > last_review "
+                    "THEN excluded.interval_days ELSE interval_days END, "
+                    "last_review = MAX(last_review, excluded.last_review), "
+                    "version = excluded.version",
+                    [(username, c["task_id"], c["attempts"], c["rating"], c["interval_days"], c["last_review"], token)
+                     for c in changes],
+                )
+                self._conn.execute("UPDATE progress_sync SET token = ?, updated_at = ? WHERE username = ?",
+                                   (token, time.time(), username))
+
+            rows = self._conn.execute(
+                "SELECT task_id, attempts, rating, interval_days, last_review FROM progress_tasks "
+                "WHERE username = ? AND version > ?", (username, since)
+            ).fetchall()
+        return token, [
+            {"task_id": tid, "attempts": attempts, "rating": rating, "interval_days": interval, "last_review": last}
+            for tid, attempts, rating, interval, last in rows
+        ]
+
+    def iter_pages(self, batch_size=500):
+        last = ""
+        while True:
+            with self._lock:
+                names = [row[0] for row in self._conn.execute(
+                    "SELECT username FROM users WHERE username > ? ORDER BY username LIMIT ?", (last, batch_size)
+                )]
+                page = [(username, self._progress_json(username)) for username in names]
+            if not page:
+                return
+            yield page
+            last = page[-1][0]
@@ -0,0 +1,74 @@
+# ============================================================
+# 📚 Referenz – Suche über die vorab zerlegten Quarto-Dokumente
+# ============================================================
+#
+# reference/index.json (erzeugt von build_reference.py) enthält nur Titel,
+# Keyword-Index und Kategorie-Zuordnung; der Inhalt jedes Abschnitts liegt
+# als kleines Markdown-Fragment daneben und wird erst beim Anzeigen gelesen.
+#
+import bisect
+import functools
+import json
+import re
+from pathlib import Path
+
+REFERENCE_DIR = Path(__file__).parent / "reference"
+
+TOKEN_RE = re.compile(r"[a-z][a-z0-9_]+")
+STOPWORDS = {
+    "the", "and", "for", "with", "from", "into", "are", "is", "of", "to", "in", "on", "by", "as", "or",
+    "an", "be", "it", "if", "at", "questions", "question", "basics", "optional", "value", "values",
+}
+
+
+def tokenize(text):
+    """Lower-case word tokens (identifiers like ``value_counts`` stay intact)."""
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class Reference:
+    """Keyword search over section titles/content; fragments are loaded lazily."""
+
+    def __init__(self, directory=REFERENCE_DIR):
+        self.directory = Path(directory)
+        with open(self.directory / "index.json", encoding="utf-8") as f:
+            data = json.load(f)
+        self.sections = data["sections"]
+        self.index = data["index"]
+        self.categories = data["categories"]
+        self._vocabulary = sorted(self.index)
+
+    def _postings(self, token):
+        """Exact matches, otherwise every indexed token with this prefix (``grou`` → ``groupby``)."""
+        if token in self.index:
+            return self.index[token]
+        postings = []
+        for word in self._vocabulary[bisect.bisect_left(self._vocabulary, token):]:
+            if not word.startswith(token):
+                break
+            postings.extend((pos, weight * 0.5) for pos, weight in self.index[word])
+        return postings
+
+    def search(self, query, limit=8):
+        """Sections ranked by summed token weight; every query token must match."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        scores = None
+        for token in tokens:
+            hits = {}
+            for pos, weight in self._postings(token):
+                hits[pos] = hits.get(pos, 0.0) + weight
+            scores = hits if scores is None else {p: s + hits[p] for p, s in scores.items() if p in hits}
+            if not scores:
+                return []
+        ranked = sorted(scores, key=lambda p: (-scores[p], p))
+        return [self.sections[p] for p in ranked[:limit]]
+
+    def for_category(self, category):
+        return [self.sections[p] for p in self.categories.get(category, [])]
+
+    @functools.lru_cache(maxsize=64)
+    def fragment(self, section_id):
+        section = next(s for s in self.sections if s["id"] == section_id)
+        return (self.directory / section["path"]).read_text(encoding="utf-8")
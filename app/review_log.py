@@ -0,0 +1,526 @@
+# ============================================================
+# 📜 Review Event Log – append-only, spaltenbasiert, segmentiert auf Disk
+# ============================================================
+#
+# Jede Bewertung wird als Event gespeichert (user, task_id, rating, outcome,
+# ts, interval_before, interval_after). Im Speicher liegen die Events in
+# wachsenden NumPy-Spalten, auf Disk in unveränderlichen Segmentdateien:
+#
+#   seg-<writer>-<seq>-<seq>.bin = Header (24 Byte) + jede Spalte als zusammenhängender Block
+#
+# Mehrere Server-Prozesse dürfen dasselbe Verzeichnis nutzen: jede ReviewLog-
+# Instanz holt sich aus meta.sqlite3 eine eigene, nie wiederverwendete
+# Writer-Nummer und schreibt nur Segmente mit diesem Präfix. Ältere Versionen
+# schrieben beim Kompaktieren Bereiche (<lo>-<hi>); ein breiteres Segment eines
+# Writers verdeckt die engeren. Lesen scannt das Verzeichnis, sieht also alle
+# Writer.
+#
+# Kompaktieren: kleine Segmente werden zu einem neuen Segment des eigenen
+# Writers zusammengefasst – die eigenen und die von Writern, deren Lebenszeichen
+# (writers.heartbeat) älter als WRITER_TIMEOUT ist (beendete Prozesse, Neustarts).
+# Jedes übernommene Segment wird vorher in meta.sqlite3 (merged) auf das
+# Zielsegment eingetragen; Leser blenden es aus, sobald das Ziel existiert.
+# Alte Dateien werden erst danach gelöscht – nach einem Absturz an beliebiger
+# Stelle zählt jede Zeile genau einmal.
+#
+# Schreiben auf Disk (Segment + fsync, Lebenszeichen, Kompaktieren) erledigt
+# ein Hintergrund-Thread (start/close); append füllt nur den Puffer. Ohne
+# start() (Skripte) schreibt append selbst, sobald der Puffer fällig ist.
+#
+# Nutzer-IDs vergibt ebenfalls meta.sqlite3 (UNIQUE name) – alle Prozesse
+# bekommen für denselben Nutzer dieselbe ID. Ältere Logs (seg-<lo>-<hi>.bin,
+# users.txt) werden als Writer 0 gelesen bzw. beim ersten Öffnen übernommen.
+#
+import os
+import sqlite3
+import struct
+import logging
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from scheduling import RATING_CODES, SECONDS_PER_DAY
+
+MAGIC = b"ARLOG\x00"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<6sHQII")  # magic, version, n_rows, seq_lo, seq_hi
+
+COLUMNS = (
+    ("user", np.dtype("<u4")),
+    ("task_id", np.dtype("<u2")),
+    ("rating", np.dtype("i1")),
+    ("outcome", np.dtype("i1")),      # -1 = nicht geprüft, 0 = Check fehlgeschlagen, 1 = bestanden
+    ("ts", np.dtype("<f8")),
+    ("interval_before", np.dtype("<f4")),
+    ("interval_after", np.dtype("<f4")),
+)
+
+OUTCOME_CODES = {None: -1, False: 0, True: 1}
+UNRESOLVED_USER = np.iinfo(np.uint32).max  # Name steht noch nicht in meta.sqlite3 (wird beim Flush vergeben)
+
+WRITER_HEARTBEAT = 10.0  # Sekunden zwischen Lebenszeichen (und Flush-/Kompaktier-Prüfungen)
+WRITER_TIMEOUT = 120.0   # ohne Lebenszeichen gilt ein Writer als beendet, seine Segmente als verwaist
+
+META_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE)",
+    "CREATE TABLE IF NOT EXISTS writers (id INTEGER PRIMARY KEY AUTOINCREMENT, pid INTEGER, started_at REAL, "
+    "heartbeat REAL)",
+    # Segment → Zielsegment, in das es kompaktiert wird (Eintrag vor dem Schreiben des Ziels)
+    "CREATE TABLE IF NOT EXISTS merged (segment TEXT PRIMARY KEY, into_segment TEXT NOT NULL)",
+)
+
+log = logging.getLogger(__name__)
+
+
+def _parse_name(name):
+    """(writer, lo, hi) from a segment file name, None for anything else."""
+    if not (name.startswith("seg-") and name.endswith(".bin")):
+        return None
+    try:
+        numbers = [int(part) for part in name[:-4].split("-")[1:]]
+    except ValueError:
+        return None
+    if len(numbers) == 2:
+        numbers.insert(0, 0)  # altes Format ohne Writer
+    return tuple(numbers) if len(numbers) == 3 else None
+
+
+def _contains(outer, inner):
+    """Whether segment ``outer`` (writer, lo, hi, ...) covers ``inner``'s range of the same writer."""
+    return outer[0] == inner[0] and outer[1] <= inner[1] and inner[2] <= outer[2]
+
+
+class ReviewLog:
+    """Append-only review event log with vectorized analytics scans."""
+
+    def __init__(self, directory, segment_rows=65536, flush_interval=30.0, compact_after=16,
+                 heartbeat=WRITER_HEARTBEAT, writer_timeout=WRITER_TIMEOUT):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_rows = segment_rows
+        self.flush_interval = flush_interval
+        self.compact_after = compact_after
+        self.heartbeat = heartbeat
+        self.writer_timeout = writer_timeout
+
+        self._lock = threading.RLock()        # Puffer – nur kurz gehalten, append wartet nie auf Disk
+        self._disk_lock = threading.Lock()    # flush/compact: Segmente schreiben und übernehmen
+        self._meta_path = self.directory / "meta.sqlite3"
+        self._user_ids = {}
+        with self._meta() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for statement in META_SCHEMA:
+                conn.execute(statement)
+            if "heartbeat" not in {row[1] for row in conn.execute("PRAGMA table_info(writers)")}:
+                conn.execute("ALTER TABLE writers ADD COLUMN heartbeat REAL")
+            self._import_legacy_users(conn)
+            now = time.time()
+            self.writer = conn.execute(
+                "INSERT INTO writers (pid, started_at, heartbeat) VALUES (?, ?, ?)", (os.getpid(), now, now)
+            ).lastrowid
+
+        self._segments = []  # eigene Segmente als (seq, path), älteste zuerst
+        self._next_seq = 1
+        self._in_flight = None  # Spalten, die flush gerade schreibt
+        self._unresolved = {}  # Nutzername → Pufferzeilen mit UNRESOLVED_USER
+        self._reset_buffer(capacity=1024)
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- Metadaten (Writer, Nutzer-IDs) ---------------------------
+    def _meta(self):
+        return sqlite3.connect(self._meta_path, timeout=30)
+
+    def _import_legacy_users(self, conn):
+        """Adopt ``users.txt`` of older logs once, keeping its line numbers as ids."""
+        legacy = self.directory / "users.txt"
+        if not legacy.exists() or conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]:
+            return
+        names = legacy.read_text(encoding="utf-8").splitlines()
+        conn.executemany("INSERT INTO users (id, name) VALUES (?, ?)",
+                         [(uid + 1, name) for uid, name in enumerate(names)])
+
+    def _beat(self):
+        with self._meta() as conn:
+            conn.execute("UPDATE writers SET heartbeat = ? WHERE id = ?", (time.time(), self.writer))
+
+    def _alive_writers(self, conn, now):
+        """Ids of writers with a recent heartbeat (rows from before heartbeats count by their start time)."""
+        return {writer for writer, beat in conn.execute("SELECT id, COALESCE(heartbeat, started_at) FROM writers")
+                if beat is not None and beat >= now - self.writer_timeout}
+
+    # --- Segmente -----------------------------------------------
+    def _list_segments(self):
+        found = []
+        for path in self.directory.glob("seg-*.bin"):
+            numbers = _parse_name(path.name)
+            if numbers is not None:
+                found.append((*numbers, path))
+        return found
+
+    @staticmethod
+    def _live(found, merged):
+        """Drop segments covered by a wider one of the same writer or merged into a segment that exists."""
+        def absorbed(seg):
+            into = merged.get(seg[3].name)
+            target = into and _parse_name(into)
+            return bool(target) and any(_contains(other, target) for other in found)
+
+        return sorted(
+            seg for seg in found
+            if not any(_contains(other, seg) and other[1:3] != seg[1:3] for other in found) and not absorbed(seg)
+        )
+
+    def _scan_segments(self):
+        """All live segments of all writers as (writer, lo, hi, path)."""
+        found = self._list_segments()  # erst das Verzeichnis, dann merged: ein Ziel ist nie ohne seinen Eintrag zu sehen
+        with self._meta() as conn:
+            merged = dict(conn.execute("SELECT segment, into_segment FROM merged"))
+        return self._live(found, merged)
+
+    def _open_segment(self, path):
+        with open(path, "rb") as f:
+            magic, version, n_rows, _, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a review log segment (v{FORMAT_VERSION})")
+
+        columns, offset = {}, HEADER.size
+        for name, dtype in COLUMNS:
+            if n_rows:
+                columns[name] = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(n_rows,))
+            else:
+                columns[name] = np.empty(0, dtype=dtype)
+            offset += n_rows * dtype.itemsize
+        return columns
+
+    def _segment_path(self, seq):
+        return self.directory / f"seg-{self.writer:06d}-{seq:08d}-{seq:08d}.bin"
+
+    def _write_segment(self, seq, chunks, n_rows):
+        """Write + fsync a segment under a temporary name; returns (tmp, path) – ``os.replace`` publishes it."""
+        path = self._segment_path(seq)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, n_rows, seq, seq))
+            for name, dtype in COLUMNS:
+                for chunk in chunks:
+                    f.write(np.ascontiguousarray(chunk[name], dtype=dtype).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        return tmp, path
+
+    # --- Puffer -------------------------------------------------
+    def _reset_buffer(self, capacity):
+        self._buffer = {name: np.empty(capacity, dtype=dtype) for name, dtype in COLUMNS}
+        self._size = 0
+        self._buffer_started = time.time()
+
+    def _grow_buffer(self):
+        capacity = len(self._buffer["ts"]) * 2
+        for name, dtype in COLUMNS:
+            grown = np.empty(capacity, dtype=dtype)
+            grown[:self._size] = self._buffer[name][:self._size]
+            self._buffer[name] = grown
+
+    def _user_id(self, user):
+        uid = self._user_ids.get(user)
+        if uid is None:
+            with self._meta() as conn:
+                conn.execute("BEGIN IMMEDIATE")  # Nachschlagen + Vergeben als eine Einheit über Prozesse hinweg
+                row = conn.execute("SELECT id FROM users WHERE name = ?", (user,)).fetchone()
+                uid = (row[0] if row else conn.execute("INSERT INTO users (name) VALUES (?)", (user,)).lastrowid) - 1
+            self._user_ids[user] = uid
+        return uid
+
+    # --- Schreiben ----------------------------------------------
+    def append(self, user, task_id, rating, interval_before, interval_after, outcome=None, ts=None):
+        """Record one rating event. ``outcome`` is the last Run & Check result (True/False/None).
+
+        Only fills the in-memory buffer; after ``start`` the background thread writes it to disk.
+        """
+        with self._lock:
+            if self._size == len(self._buffer["ts"]):
+                self._grow_buffer()
+            i = self._size
+            uid = self._user_ids.get(user)
+            if uid is None:
+                self._unresolved.setdefault(user, []).append(i)
+                uid = UNRESOLVED_USER
+            self._buffer["user"][i] = uid
+            self._buffer["task_id"][i] = task_id
+            self._buffer["rating"][i] = RATING_CODES[rating]
+            self._buffer["outcome"][i] = OUTCOME_CODES[outcome]
+            self._buffer["ts"][i] = time.time() if ts is None else ts
+            self._buffer["interval_before"][i] = interval_before
+            self._buffer["interval_after"][i] = interval_after
+            self._size += 1
+            due = self._flush_due()
+
+        if not due:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            self._wake.set()
+        else:  # ohne Hintergrund-Thread (Skripte) schreibt der Aufrufer
+            self.flush()
+            self.compact()
+
+    def _flush_due(self):
+        return self._size >= self.segment_rows or (
+            self._size > 0 and time.time() - self._buffer_started >= self.flush_interval)
+
+    def flush(self):
+        """Persist buffered events as a new segment; ``append`` only waits for the buffer swap, not the disk."""
+        with self._disk_lock:
+            while True:
+                with self._lock:
+                    names = list(self._unresolved)
+                    if not names:
+                        if not self._size:
+                            return
+                        chunk = {name: col[:self._size] for name, col in self._buffer.items()}
+                        self._in_flight = chunk  # bleibt für iter_chunks sichtbar, bis das Segment veröffentlicht ist
+                        self._reset_buffer(capacity=1024)
+                        break
+                ids = {name: self._user_id(name) for name in names}  # meta.sqlite3 ohne Puffer-Lock
+                with self._lock:
+                    for name, uid in ids.items():
+                        self._buffer["user"][self._unresolved.pop(name)] = uid
+
+            seq = self._next_seq
+            tmp, path = self._write_segment(seq, [chunk], len(chunk["ts"]))
+            with self._lock:
+                os.replace(tmp, path)
+                self._in_flight = None
+            self._segments.append((seq, path))
+            self._next_seq += 1
+
+    def _segment_rows(self, path):
+        with open(path, "rb") as f:
+            return HEADER.unpack(f.read(HEADER.size))[2]
+
+    def compact(self, full=False):
+        """Merge small segments into one new segment of this writer; returns the number of merged segments.
+
+        Takes this writer's trailing run of small segments once more than ``compact_after`` piled up (all of
+        them with ``full``) and every small segment of writers without a heartbeat for ``writer_timeout``;
+        when the latter exist, the trailing run comes along.
+        """
+        with self._disk_lock:
+            self._remove_merged()  # Reste eines abgebrochenen Kompaktierens zuerst aufräumen
+            self._segments = [seg for seg in self._segments if seg[1].exists()]  # ggf. von anderen übernommen
+            start = len(self._segments)
+            while start > 0 and (full or self._segment_rows(self._segments[start - 1][1]) < self.segment_rows):
+                start -= 1
+            seq = self._next_seq
+            target = self._segment_path(seq)
+            required = full or len(self._segments) - start > self.compact_after
+
+            merge = self._claim(self._segments[start:], required, target.name)
+            if not merge:
+                return 0
+            chunks = [self._open_segment(path) for *_, path in merge]
+            tmp, path = self._write_segment(seq, chunks, sum(len(chunk["ts"]) for chunk in chunks))
+            del chunks
+            self._next_seq += 1
+            if not self._publish(tmp, path, merge):
+                return 0
+            merged = {path for *_, path in merge}
+            self._segments = [seg for seg in self._segments if seg[1] not in merged] + [(seq, target)]
+            self._remove_merged()
+            return len(merge)
+
+    def _claim(self, own, required, target_name):
+        """Record the segments to merge into ``target_name`` in meta.sqlite3; [] if fewer than two qualify.
+
+        Foreign segments qualify if their writer is dead, they are small and nobody else is merging them (a claim
+        whose target is missing and whose writer is dead is stale and taken over). Own segments come along if
+        ``required`` or foreign ones qualify.
+        """
+        now = time.time()
+        with self._meta() as conn:
+            conn.execute("BEGIN IMMEDIATE")  # eine Übernahme zur Zeit – sonst könnten zwei Prozesse dasselbe mergen
+            conn.execute("UPDATE writers SET heartbeat = ? WHERE id = ?", (now, self.writer))
+            found = self._list_segments()
+            merged = dict(conn.execute("SELECT segment, into_segment FROM merged"))
+            alive = self._alive_writers(conn, now) | {self.writer}
+            live = self._live(found, merged)
+            live_paths = {seg[3] for seg in live}
+
+            targets = set(merged.values())
+
+            def taken(path):
+                into = merged.get(path.name)
+                if into is not None and _parse_name(into)[0] in alive - {self.writer}:
+                    return True  # ein anderer lebender Writer kompaktiert es gerade
+                return path.name in targets  # Ziel, dessen Quellen noch nicht gelöscht sind – erst aufräumen
+
+            foreign = [seg for seg in live
+                       if seg[0] not in alive and not taken(seg[3]) and self._segment_rows(seg[3]) < self.segment_rows]
+            pieces = [(self.writer, seq, seq, path) for seq, path in own
+                      if path in live_paths and not taken(path)] if required or foreign else []
+            pieces += foreign
+            if len(pieces) < 2:
+                return []
+            conn.executemany("INSERT OR REPLACE INTO merged (segment, into_segment) VALUES (?, ?)",
+                             [(path.name, target_name) for *_, path in pieces])
+        return pieces
+
+    def _publish(self, tmp, path, merge):
+        """Rename the merged segment into place if all claims still point at it; otherwise drop it.
+
+        A writer that stalled longer than ``writer_timeout`` may have lost its claims to another one – publishing
+        anyway would show the same rows twice.
+        """
+        with self._meta() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            claimed = {row[0] for row in conn.execute("SELECT segment FROM merged WHERE into_segment = ?",
+                                                      (path.name,))}
+            if claimed >= {p.name for *_, p in merge}:
+                os.replace(tmp, path)
+                return True
+        os.remove(tmp)
+        log.warning("review log: claims for %s were taken over, merge discarded", path.name)
+        return False
+
+    def _remove_merged(self):
+        """Delete segment files whose merge target exists, then their merged rows."""
+        found = self._list_segments()
+        by_name = {seg[3].name: seg for seg in found}
+        with self._meta() as conn:
+            merged = dict(conn.execute("SELECT segment, into_segment FROM merged"))
+        done = []
+        for name, into in merged.items():
+            target = _parse_name(into)
+            if target is None or not any(_contains(other, target) for other in found):
+                continue  # Ziel fehlt (noch) – das Segment bleibt gültig
+            if name in by_name:
+                try:
+                    by_name[name][3].unlink()
+                except OSError:
+                    continue  # noch gemappt (Windows) – Leser blenden es aus, nächster Versuch später
+            done.append((name,))
+        if done:
+            with self._meta() as conn:
+                conn.executemany("DELETE FROM merged WHERE segment = ?", done)
+
+    # --- Hintergrund-Thread -------------------------------------
+    def maintain(self):
+        """One round of background work: heartbeat, flush a due buffer, compact."""
+        self._beat()
+        with self._lock:
+            due = self._flush_due()
+        if due:
+            self.flush()
+        self.compact()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.maintain()
+            except Exception:
+                log.exception("review log maintenance failed")
+            self._wake.wait(timeout=min(self.heartbeat, self.flush_interval))
+            self._wake.clear()
+
+    def start(self):
+        """Run flushing, heartbeats and compaction on a daemon thread; returns self."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="review-log", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self, timeout=5):
+        """Stop the thread, write what is buffered and retire this writer (its segments become adoptable)."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self.flush()
+        with self._meta() as conn:
+            conn.execute("UPDATE writers SET heartbeat = 0 WHERE id = ?", (self.writer,))
+
+    # --- Lesen / Analytics --------------------------------------
+    def iter_chunks(self):
+        """Yield column dicts per segment of every writer (memory-mapped) plus this log's unwritten events."""
+        with self._lock:  # Puffer, Segment im Flush und Verzeichnis als ein Stand
+            buffered = {name: col[:self._size].copy() for name, col in self._buffer.items()}
+            unresolved = {user: list(rows) for user, rows in self._unresolved.items()}
+            in_flight = self._in_flight
+            for attempt in range(3):
+                try:
+                    chunks = [self._open_segment(path) for *_, path in self._scan_segments()]
+                    break
+                except FileNotFoundError:
+                    if attempt == 2:  # ein anderer Prozess kompaktiert gerade → neu scannen
+                        raise
+        for user, rows in unresolved.items():
+            buffered["user"][rows] = self._user_id(user)
+        yield from chunks
+        if in_flight is not None:
+            yield in_flight
+        if len(buffered["ts"]):
+            yield buffered
+
+    def __len__(self):
+        return sum(len(chunk["ts"]) for chunk in self.iter_chunks())
+
+    def user_id(self, user):
+        uid = self._user_ids.get(user)
+        if uid is None:
+            with self._meta() as conn:
+                row = conn.execute("SELECT id FROM users WHERE name = ?", (user,)).fetchone()
+            if row is not None:
+                uid = self._user_ids[user] = row[0] - 1
+        return uid
+
+    def reviews_per_day(self, user=None):
+        """Return (day numbers since epoch, review counts) for all users or one user."""
+        uid = None if user is None else self.user_id(user)
+        if user is not None and uid is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        counts = np.zeros(0, dtype=np.int64)
+        first_day = None
+        for chunk in self.iter_chunks():
+            days = (chunk["ts"] // SECONDS_PER_DAY).astype(np.int64)
+            if uid is not None:
+                days = days[chunk["user"] == uid]
+            if not len(days):
+                continue
+            lo = int(days.min())
+            if first_day is None:
+                first_day = lo
+            if lo < first_day:
+                counts = np.concatenate([np.zeros(first_day - lo, dtype=np.int64), counts])
+                first_day = lo
+            binned = np.bincount(days - first_day)
+            if len(binned) > len(counts):
+                counts = np.concatenate([counts, np.zeros(len(binned) - len(counts), dtype=np.int64)])
+            counts[:len(binned)] += binned
+
+        if first_day is None:
+            return np.empty(0, dtype=np.int64), counts
+        return np.arange(first_day, first_day + len(counts)), counts
+
+    def failure_rate_by_category(self, task_category, n_categories):
+        """Share of "hard" ratings or failed checks per category.
+
+        ``task_category`` maps task_id → category index (array indexed by task id).
+        Returns (failures, totals, rates) arrays of length ``n_categories``.
+        """
+        task_category = np.asarray(task_category)
+        failures = np.zeros(n_categories, dtype=np.int64)
+        totals = np.zeros(n_categories, dtype=np.int64)
+        for chunk in self.iter_chunks():
+            cats = task_category[chunk["task_id"]]
+            failed = (chunk["rating"] == RATING_CODES["hard"]) | (chunk["outcome"] == 0)
+            totals += np.bincount(cats, minlength=n_categories)
+            failures += np.bincount(cats, weights=failed, minlength=n_categories).astype(np.int64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rates = np.where(totals > 0, failures / np.maximum(totals, 1), np.nan)
+        return failures, totals, rates
@@ -0,0 +1,190 @@
+# ============================================================
+# 🎯 Gewichtete Auswahl – "Schwachstellen fokussieren"
+# ============================================================
+#
+# Gewicht einer Aufgabe (alles aus den Progress-Arrays, vektorisiert):
+#
+#   letzte Bewertung   hard 4 · medium 2 · easy 1 · noch nie bewertet 2
+#   × Verlauf          1 / √(interval / MIN_INTERVAL)  – mehrfach "easy" → langes
+#                      Intervall → seltener; mehrfach "hard" hält es am Minimum
+#   × Versuche         1 + ½·ln(1 + attempts), nur solange die letzte Bewertung hard ist
+#   × Überfälligkeit   vergangene Tage / Intervall, begrenzt auf [0.1, 4]
+#
+# Gezogen wird mit einer Alias-Tabelle (Walker, Aufbau nach Vose): O(n) Aufbau,
+# danach O(1) pro Ziehung. WeightedPicker hält die Gewichte einer Filter-Ansicht
+# in einer zweistufigen Tabelle (BlockAliasTable): Alias-Tabellen über Blöcke
+# von ~√n Aufgaben plus eine über die Blocksummen. Nach einer Bewertung wird nur
+# das Gewicht dieser Aufgabe neu berechnet, nur ihr Block und die obere Tabelle
+# neu aufgebaut – O(√n) statt O(n) (460 Aufgaben: 2 × ~22 statt 460 Schritte);
+# eine Ziehung kostet dafür zwei statt einer Alias-Ziehung. Alle Gewichte werden
+# nur nach Sync/Laden oder nach REFRESH_SECONDS (Überfälligkeit wandert mit der
+# Zeit) neu berechnet – dann auch die ganze Tabelle.
+#
+# Verteilung prüfen: python app/check_sampling.py
+#
+import math
+import random
+import time
+
+import numpy as np
+
+from progress import NO_RATING
+from scheduling import MIN_INTERVAL, RATING_CODES, SECONDS_PER_DAY
+
+# Index = Rating-Code (hard, medium, easy), letzter Eintrag = noch nie bewertet
+RATING_WEIGHTS = np.array([4.0, 2.0, 1.0, 2.0])
+ATTEMPT_BONUS = 0.5
+OVERDUE_RANGE = (0.1, 4.0)
+REFRESH_SECONDS = 600
+
+
+def task_weights(progress, task_ids, now=None):
+    """Sampling weight per task id (all > 0)."""
+    now = time.time() if now is None else now
+    ids = np.asarray(task_ids, dtype=np.int64)
+    in_range = ids < len(progress)
+    safe = np.where(in_range, ids, 0)
+
+    rating = np.where(in_range, progress.rating[safe], NO_RATING).astype(np.int64)
+    weights = RATING_WEIGHTS[rating]  # NO_RATING (-1) trifft den letzten Eintrag
+
+    interval = np.where(in_range, progress.interval[safe], MIN_INTERVAL)
+    weights = weights / np.sqrt(np.maximum(interval / MIN_INTERVAL, 1.0))
+
+    attempts = np.where(in_range, progress.attempts[safe], 0)
+    weights = weights * np.where(rating == RATING_CODES["hard"], 1.0 + ATTEMPT_BONUS * np.log1p(attempts), 1.0)
+
+    last_review = np.where(in_range, progress.last_review[safe], 0.0)
+    overdue = (now - last_review) / SECONDS_PER_DAY / interval
+    return weights * np.where(last_review > 0, np.clip(overdue, *OVERDUE_RANGE), 1.0)
+
+
+class AliasTable:
+    """Walker's alias method: pick index i with probability weights[i] / sum(weights) in O(1)."""
+
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        n = len(weights)
+        total = weights.sum()
+        if n == 0 or not np.isfinite(total) or total <= 0 or (weights < 0).any():
+            raise ValueError("weights must be non-negative with a positive, finite sum")
+
+        scaled = weights * (n / total)
+        self.prob = np.ones(n, dtype=np.float64)
+        self.alias = np.arange(n, dtype=np.int64)
+
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Reste (Rundung) behalten prob = 1 und zeigen auf sich selbst
+
+        self._prob = self.prob.tolist()  # Python-Listen: schneller für Einzelzugriffe
+        self._alias = self.alias.tolist()
+
+    def __len__(self):
+        return len(self._prob)
+
+    def sample(self, rng=random):
+        i = rng.randrange(len(self._prob))
+        return i if rng.random() < self._prob[i] else self._alias[i]
+
+    def probabilities(self):
+        """Exact distribution the table encodes (for checks)."""
+        n = len(self.prob)
+        p = self.prob / n
+        np.add.at(p, self.alias, (1.0 - self.prob) / n)
+        return p
+
+
+class BlockAliasTable:
+    """Two-level alias sampling: one table per block of ~√n weights, one over the block sums.
+
+    ``update`` changes a single weight and rebuilds only its block and the top table, O(√n).
+    """
+
+    def __init__(self, weights, block_size=None):
+        self.weights = np.array(weights, dtype=np.float64)
+        n = len(self.weights)
+        total = self.weights.sum()
+        if n == 0 or not np.isfinite(total) or total <= 0 or (self.weights < 0).any():
+            raise ValueError("weights must be non-negative with a positive, finite sum")
+        self.block_size = block_size or max(1, math.isqrt(n - 1) + 1)  # ⌈√n⌉
+        n_blocks = -(-n // self.block_size)
+        self._sums = np.zeros(n_blocks, dtype=np.float64)
+        self._blocks = [None] * n_blocks
+        for b in range(n_blocks):
+            self._rebuild_block(b)
+        self._top = AliasTable(self._sums)
+
+    def _rebuild_block(self, b):
+        chunk = self.weights[b * self.block_size:(b + 1) * self.block_size]
+        self._sums[b] = chunk.sum()
+        self._blocks[b] = AliasTable(chunk) if self._sums[b] > 0 else None  # Summe 0 → oben nie gezogen
+
+    def __len__(self):
+        return len(self.weights)
+
+    def update(self, i, weight):
+        if not (np.isfinite(weight) and weight >= 0):
+            raise ValueError("weight must be non-negative and finite")
+        self.weights[i] = weight
+        self._rebuild_block(i // self.block_size)
+        self._top = AliasTable(self._sums)
+
+    def sample(self, rng=random):
+        b = self._top.sample(rng)
+        return b * self.block_size + self._blocks[b].sample(rng)
+
+    def probabilities(self):
+        """Exact distribution the tables encode (for checks)."""
+        top = self._top.probabilities()
+        p = np.zeros(len(self.weights))
+        for b, block in enumerate(self._blocks):
+            if block is not None:
+                start = b * self.block_size
+                p[start:start + len(block)] = top[b] * block.probabilities()
+        return p
+
+
+class WeightedPicker:
+    """Alias-table sampling over one filter view, kept in step with ``review_rev``."""
+
+    def __init__(self, task_ids):
+        self.ids = np.asarray(task_ids, dtype=np.int64)
+        self._pos = {tid: i for i, tid in enumerate(self.ids.tolist())}
+        self.weights = None
+        self.rev = None
+        self.built_at = -math.inf
+        self._table = None
+
+    def refresh(self, progress, rev, now=None):
+        now = time.time() if now is None else now
+        self.weights = task_weights(progress, self.ids, now)
+        self.rev = rev
+        self.built_at = now
+        self._table = None
+
+    def update(self, progress, task_id, rev, now=None):
+        """Re-weight one task after a rating (O(√n)); falls back to a full refresh if revisions were skipped."""
+        if self.rev != rev - 1:
+            self.rev = None
+            return
+        self.rev = rev
+        pos = self._pos.get(task_id)
+        if pos is not None:
+            self.weights[pos] = task_weights(progress, self.ids[pos:pos + 1], now)[0]
+            if self._table is not None:
+                self._table.update(pos, self.weights[pos])
+
+    def pick(self, progress, rev, rng=random, now=None):
+        now = time.time() if now is None else now
+        if self.rev != rev or now - self.built_at > REFRESH_SECONDS:
+            self.refresh(progress, rev, now)
+        if self._table is None:
+            self._table = BlockAliasTable(self.weights)
+        return int(self.ids[self._table.sample(rng)])
@@ -0,0 +1,527 @@
+# ============================================================
+# 🧱 Sandbox-Pool – schwerer Editor-Code in eigenen Worker-Prozessen
+# ============================================================
+#
+# Code, den code_analysis als "heavy" einstuft (pandas, numpy, matplotlib,
+# open, ...), läuft nicht im Streamlit-Prozess, sondern in einem von
+# POOL_SIZE Worker-Prozessen. Die Worker laden den wissenschaftlichen Stack
+# einmal beim Start; leichter Code bleibt im App-Prozess (executor.py).
+#
+# Worker sind multiprocessing-Prozesse (spawn, läuft unter POSIX und Windows)
+# und starten erst mit dem ersten schweren Lauf. Streamlit setzt das App-Skript
+# als __main__ ein; damit spawn es im Worker nicht noch einmal ausführt, sieht
+# Process.start() kurz ein leeres __main__ (_spawn).
+#
+#   Budget    gleiches Schritt-/Zeitbudget wie der leichte Pfad. Hängt ein
+#             Worker trotzdem (lange C-Aufrufe), wird er nach HARD_TIMEOUT
+#             beendet und beim nächsten Auftrag neu gestartet.
+#   Rückweg   nur Daten: der Worker pickelt pandas-Objekte als Arrow-IPC und
+#             alles, was keine reinen Daten sind (Funktionen, Klassen, Module,
+#             Figuren, ...), als Opaque(repr). Die App entpickelt mit einer
+#             Allowlist (WIRE_GLOBALS) – auch ein manipulierter Worker kann im
+#             App-Prozess keinen Code ausführen.
+#   st.*      Editor-Code bekommt executor.StreamlitRecorder; replay_streamlit
+#             spielt die Aufrufe in der App ab.
+#   Prüfen    Funktions-Aufgaben werden im Worker geprüft (check_task) – die
+#             Funktionen der Lernenden verlassen den Prozess nicht.
+#   Notebook  schwere Sessions leben im Worker (per Schlüssel fest zugeordnet),
+#             leichte im NotebookStore des App-Prozesses.
+#   Daten     jeder Worker läuft in einem eigenen Temp-Verzeichnis – Dateien, die
+#             Editor-Code schreibt (savefig, to_csv), landen dort und werden mit
+#             dem Worker gelöscht. Lesende Zugriffe auf "data/..." (pd.read_csv,
+#             open) gehen an ROOT_DIR/data; pd.read_csv("data/x.csv") ohne
+#             Optionen liefert checker.load_dataset – aus dem Shared-Memory-Segment
+#             oder dem pro Worker gecachten Parse, den prepare() vorab füllt
+#             (siehe prefetch.py).
+#
+import builtins
+import collections
+import datetime
+import decimal
+import fractions
+import functools
+import io
+import itertools
+import atexit
+import multiprocessing
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import types
+from functools import lru_cache
+from pathlib import Path
+
+from checker import CaseResult, check_task, has_cases, load_dataset, prepare_task, warm_dataset
+from code_analysis import analyze
+from executor import (FILENAME, SANDBOX_BUILTINS, TIME_LIMIT, BudgetExceeded, CodeRejected, ExecResult, Png,
+                      StreamlitRecorder, run_code)
+from feedback import bounded_repr
+from notebook import NotebookResult, NotebookStore
+from prefetch import task_datasets
+from shared_state import dataset_key, dataset_path
+
+POOL_SIZE = int(os.environ.get("PLAYGROUND_SANDBOX_WORKERS", 2))
+HARD_TIMEOUT = 3 * TIME_LIMIT  # Schritt-/Zeitbudget greift vorher; das hier fängt hängende C-Aufrufe
+BOOT_TIMEOUT = 120
+WORKER_NICENESS = 10  # Boot + Vorarbeit der Worker sollen die Skriptläufe der App nicht ausbremsen (nur POSIX)
+_SPAWN = multiprocessing.get_context("spawn")
+_MAIN_LOCK = threading.Lock()
+
+
+class Opaque:
+    """Stand-in for a value that cannot leave the sandbox (function, class, module, figure, ...)."""
+
+    def __init__(self, text, type_name):
+        self.text = text
+        self.type_name = type_name
+
+    def __repr__(self):
+        return self.text
+
+
+class SandboxError(Exception):
+    """An exception whose class only exists in the sandbox (user or library code), carried by name."""
+
+    def __init__(self, type_name, message):
+        super().__init__(message)
+        self.type_name = type_name
+
+    def __reduce__(self):
+        return SandboxError, (self.type_name, str(self))
+
+
+def _frame_from_arrow(kind, data, name):
+    import pyarrow as pa
+
+    frame = pa.ipc.open_stream(data).read_all().to_pandas()
+    if kind == "series":
+        series = frame.iloc[:, 0]
+        series.name = name
+        return series
+    return frame
+
+
+# ============================
+# 📦 Draht-Format (nur Daten)
+# ============================
+WIRE_GLOBALS = {
+    *(("builtins", name) for name in ("complex", "range", "slice", "set", "frozenset", "bytearray")),
+    *(("datetime", name) for name in ("date", "datetime", "time", "timedelta", "timezone")),
+    *(("collections", name) for name in ("OrderedDict", "Counter", "defaultdict", "deque")),
+    ("decimal", "Decimal"), ("fractions", "Fraction"),
+    ("numpy", "dtype"), ("numpy", "ndarray"),
+    *((module, name) for module in ("numpy._core.multiarray", "numpy.core.multiarray")
+      for name in ("_reconstruct", "scalar")),
+    ("numpy._core.numeric", "_frombuffer"), ("numpy.core.numeric", "_frombuffer"),
+    ("sandbox", "Opaque"), ("sandbox", "SandboxError"), ("sandbox", "_frame_from_arrow"),
+    ("executor", "Png"), ("executor", "BudgetExceeded"), ("executor", "CodeRejected"),
+}
+
+
+def _is_builtin_exception(obj):
+    return (isinstance(obj, type) and issubclass(obj, BaseException)
+            and getattr(builtins, obj.__name__, None) is obj)
+
+
+def _opaque(obj):
+    try:
+        text = bounded_repr(obj)
+    except Exception:
+        text = f"<{type(obj).__name__}>"
+    return Opaque, (text, type(obj).__name__)
+
+
+class _WirePickler(pickle.Pickler):
+    """Worker side: reduce everything that is not plain data to something the app will accept."""
+
+    def reducer_override(self, obj):
+        cls = type(obj)
+        if isinstance(obj, (type, types.FunctionType, types.BuiltinFunctionType)):
+            key = (getattr(obj, "__module__", None), getattr(obj, "__qualname__", None))
+            return NotImplemented if key in WIRE_GLOBALS or _is_builtin_exception(obj) else _opaque(obj)
+        if isinstance(obj, BaseException):
+            if _is_builtin_exception(cls) or (cls.__module__, cls.__qualname__) in WIRE_GLOBALS:
+                return NotImplemented
+            return SandboxError, (cls.__name__, str(obj))
+        if isinstance(obj, collections.defaultdict):
+            return collections.defaultdict, (None,), None, None, iter(obj.items())  # Factory bleibt im Worker
+        if cls.__module__.startswith("pandas"):
+            return self._reduce_pandas(obj)
+        if (cls.__module__, cls.__qualname__) in WIRE_GLOBALS:
+            return NotImplemented
+        if cls.__module__ == "numpy" or cls.__module__.startswith("numpy.dtypes"):
+            return NotImplemented if cls.__name__ != "ndarray" or cls is _ndarray() else _opaque(obj)
+        return _opaque(obj)
+
+    @staticmethod
+    def _reduce_pandas(obj):
+        import pandas as pd
+        import pyarrow as pa
+
+        if isinstance(obj, pd.Timestamp) and obj is not pd.NaT:
+            return obj.to_pydatetime(warn=False).__reduce_ex__(pickle.HIGHEST_PROTOCOL)
+        if isinstance(obj, pd.Timedelta) and obj is not pd.NaT:
+            return obj.to_pytimedelta().__reduce_ex__(pickle.HIGHEST_PROTOCOL)
+        if not isinstance(obj, (pd.DataFrame, pd.Series)):
+            return _opaque(obj)
+        try:
+            frame = obj.to_frame(name="value") if isinstance(obj, pd.Series) else obj
+            table = pa.Table.from_pandas(frame, preserve_index=True)
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+        except Exception:
+            return _opaque(obj)
+        kind = "series" if isinstance(obj, pd.Series) else "frame"
+        return _frame_from_arrow, (kind, sink.getvalue().to_pybytes(), getattr(obj, "name", None))
+
+
+@lru_cache(maxsize=1)
+def _ndarray():
+    import numpy as np
+
+    return np.ndarray
+
+
+class _WireUnpickler(pickle.Unpickler):
+    """App side: only the globals in WIRE_GLOBALS (and builtin exceptions) can be referenced."""
+
+    def find_class(self, module, name):
+        if (module, name) in WIRE_GLOBALS or (module == "builtins" and _is_builtin_exception(getattr(builtins, name, None))):
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"{module}.{name} darf die Sandbox nicht verlassen")
+
+
+def dumps(value):
+    buffer = io.BytesIO()
+    _WirePickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(value)
+    return buffer.getvalue()
+
+
+def loads(data):
+    return _WireUnpickler(io.BytesIO(data)).load()
+
+
+# ============================
+# 🏭 Worker-Prozess
+# ============================
+def _pack(result, names, base):
+    """ExecResult → dict of wire-safe fields; ``names`` limits the globals sent back (None = all user names)."""
+    if names is None:
+        user_globals = {k: v for k, v in result.globals.items()
+                        if not k.startswith("__") and base.get(k, k) is not v  # `stats = ...` überschreibt das Modul
+                        and not isinstance(v, StreamlitRecorder)}
+    else:
+        user_globals = {k: result.globals[k] for k in names if k in result.globals}
+    reply = {
+        "globals": user_globals, "stdout": result.stdout, "stderr": result.stderr, "error": result.error,
+        "route": result.route, "duration": result.duration, "st_calls": result.st_calls,
+        "cases": None if result.cases is None else [vars(case) for case in result.cases],
+    }
+    if isinstance(result, NotebookResult):
+        reply.update(cells_total=result.cells_total, cells_run=result.cells_run)
+    return reply
+
+
+def _data_file(path):
+    """A relative ``data/...`` reference (as written in tasks and editor code) under ROOT_DIR, else None."""
+    if isinstance(path, (str, os.PathLike)) and not os.path.isabs(path):
+        parts = Path(path).parts
+        if parts and parts[0] == "data":
+            return dataset_path(path)
+    return None
+
+
+def _serve_datasets():
+    """Point reads of ``data/...`` at the repository (this process only – the working directory is a temp dir).
+
+    ``pd.read_csv(<data/*.csv>)`` without options goes to ``checker.load_dataset``; other reads of an
+    existing data file (``open``, ``read_csv`` with options) get its absolute path. Missing files and
+    writes keep the path as written, so errors read as before and output stays in the temp dir.
+    """
+    import pandas as pd
+
+    read_csv, builtin_open = pd.read_csv, builtins.open
+
+    @functools.wraps(read_csv)
+    def serve(filepath_or_buffer, *args, **kwargs):
+        path = _data_file(filepath_or_buffer)
+        if path is None or not path.is_file():
+            return read_csv(filepath_or_buffer, *args, **kwargs)
+        if not args and not kwargs and dataset_key(path) is not None:
+            return load_dataset(path)
+        return read_csv(path, *args, **kwargs)
+
+    @functools.wraps(builtin_open)
+    def open_data(file, mode="r", *args, **kwargs):
+        path = _data_file(file)
+        if path is not None and path.is_file() and not set(mode) & set("wax+"):
+            file = path
+        return builtin_open(file, mode, *args, **kwargs)
+
+    pd.read_csv = serve
+    SANDBOX_BUILTINS["open"] = open_data
+
+
+def _worker_entry(conn, cwd):
+    """Process target of a worker: lower priority, own working directory, then serve jobs."""
+    if hasattr(os, "nice"):  # Windows hat kein nice – dort läuft der Worker mit normaler Priorität
+        os.nice(WORKER_NICENESS)
+    os.chdir(cwd)
+    _worker_main(conn)
+
+
+def _worker_main(conn):
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    from executor import build_user_globals
+
+    base = build_user_globals()  # importiert den Stack einmal beim Start
+    _serve_datasets()
+    notebooks = NotebookStore()
+    conn.send_bytes(dumps({"ready": os.getpid()}))
+
+    while True:
+        try:
+            kind, payload = conn.recv()
+        except EOFError:
+            return
+        try:
+            if kind == "run":
+                key = payload["notebook_key"]
+                result = run_code(payload["source"]) if key is None else notebooks.run(key, payload["source"])
+                task = payload["task"]
+                if task is not None and has_cases(task) and result.error is None:
+                    result.cases = check_task(task, result.globals)
+                reply = _pack(result, payload["names"], base)
+            elif kind == "prepare":
+                for path in task_datasets(payload):
+                    warm_dataset(path)
+                try:
+                    prepare_task(payload)
+                except Exception:
+                    pass  # Fehler in der Referenzlösung zeigt check_task beim eigentlichen Prüfen
+                reply = {}
+            elif kind == "drop":
+                notebooks.drop(payload)
+                reply = {}
+            else:
+                raise ValueError(f"unknown sandbox job {kind!r}")
+            data = dumps(reply)
+        except BaseException as e:  # Fehler im Worker selbst, nicht im Editor-Code
+            data = dumps({"failure": SandboxError(type(e).__name__, str(e))})
+        conn.send_bytes(data)
+
+
+def _spawn(conn, cwd):
+    """Start a worker process without re-running the app script in it.
+
+    spawn re-executes the parent's ``__main__`` in the child; under Streamlit that is the app.
+    ``start()`` pickles what the child needs right away, so a bare ``__main__`` is only swapped in for that call.
+    """
+    process = _SPAWN.Process(target=_worker_entry, args=(conn, cwd), name="playground-sandbox", daemon=True)
+    with _MAIN_LOCK:
+        main = sys.modules["__main__"]
+        stand_in = sys.modules["__main__"] = types.ModuleType("__main__")
+        try:
+            process.start()
+        finally:
+            if sys.modules.get("__main__") is stand_in:  # ein Skriptlauf kann __main__ inzwischen neu gesetzt haben
+                sys.modules["__main__"] = main
+    return process
+
+
+class _Worker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.process = None
+        self.conn = None
+        self.cwd = None
+        self.ready = False
+
+    @property
+    def started(self):
+        return self.process is not None and self.process.is_alive()
+
+    def ensure_started(self):
+        if self.started:
+            return
+        if self.process is not None:
+            self.kill()
+        parent, child = _SPAWN.Pipe()
+        self.cwd = tempfile.mkdtemp(prefix="playground-sandbox-")
+        self.process = _spawn(child, self.cwd)
+        child.close()
+        self.conn, self.ready = parent, False
+
+    def kill(self):
+        if self.process is not None:
+            self.process.kill()
+            self.process.join(timeout=5)
+            self.conn.close()
+        if self.cwd is not None:
+            shutil.rmtree(self.cwd, ignore_errors=True)  # was Editor-Code geschrieben hat
+        self.process = self.conn = self.cwd = None
+
+    def call(self, job, timeout):
+        """Send one job and wait for its reply; a worker that hangs or dies is killed (TimeoutError/EOFError)."""
+        self.ensure_started()
+        try:
+            if not self.ready:
+                if not self.conn.poll(BOOT_TIMEOUT):
+                    raise TimeoutError("sandbox worker did not start")
+                loads(self.conn.recv_bytes())
+                self.ready = True
+            self.conn.send(job)
+            if not self.conn.poll(timeout):
+                raise TimeoutError
+            reply = loads(self.conn.recv_bytes())
+        except (TimeoutError, EOFError, OSError, pickle.UnpicklingError):
+            self.kill()
+            raise
+        if "failure" in reply:
+            raise reply["failure"]
+        return reply
+
+
+def _unpack(reply):
+    cases = reply.pop("cases")
+    result = (NotebookResult if "cells_total" in reply else ExecResult)(**reply)
+    result.cases = None if cases is None else [CaseResult(**case) for case in cases]
+    return result
+
+
+# ============================
+# 🎛️ Pool (App-Prozess)
+# ============================
+class SandboxPool:
+    """Routes editor code: light → this process, heavy → a worker process."""
+
+    def __init__(self, size=POOL_SIZE, hard_timeout=HARD_TIMEOUT):
+        self.hard_timeout = hard_timeout
+        self.notebooks = NotebookStore()  # leichte Notebook-Sessions
+        self._workers = [_Worker() for _ in range(max(1, size))]
+        self._round_robin = itertools.count()
+        self._heavy_notebooks = set()
+        self._keys_lock = threading.Lock()
+        self._booted = False
+        atexit.register(self.close)
+
+    def _boot(self):
+        """Start every worker on the first heavy run – they boot in parallel while the first job waits."""
+        if self._booted:
+            return
+        for worker in self._workers:
+            with worker.lock:
+                worker.ensure_started()
+        self._booted = True
+
+    def _acquire(self, notebook_key=None):
+        if notebook_key is not None:
+            worker = self._workers[hash(notebook_key) % len(self._workers)]
+            worker.lock.acquire()
+            return worker
+        for worker in self._workers:
+            if worker.lock.acquire(blocking=False):
+                return worker
+        worker = self._workers[next(self._round_robin) % len(self._workers)]
+        worker.lock.acquire()
+        return worker
+
+    def _call(self, job, notebook_key=None):
+        worker = self._acquire(notebook_key)
+        try:
+            return worker.call(job, self.hard_timeout)
+        finally:
+            worker.lock.release()
+
+    def execute(self, source, task=None, names=None, notebook_key=None):
+        """Run ``source``; with ``task``, function tasks are checked right away (``result.cases``).
+
+        ``names`` limits which globals come back from a worker (None = all user-defined names).
+        """
+        profile = analyze(source, FILENAME)
+        if profile.syntax_error is not None or profile.violations or profile.is_trivial:
+            if notebook_key is None:
+                result = run_code(source, profile)
+            else:
+                self._drop_heavy_notebook(notebook_key)
+                result = self.notebooks.run(notebook_key, source)
+            if task is not None and has_cases(task) and result.error is None:
+                result.cases = check_task(task, result.globals)
+            return result
+
+        if notebook_key is not None:
+            self.notebooks.drop(notebook_key)
+            with self._keys_lock:
+                self._heavy_notebooks.add(notebook_key)
+        job = ("run", {"source": source, "task": task, "names": names, "notebook_key": notebook_key})
+        self._boot()
+        try:
+            return _unpack(self._call(job, notebook_key))
+        except TimeoutError:
+            error = BudgetExceeded(f"Ausführung abgebrochen: länger als {self.hard_timeout:g} s "
+                                   "(Sandbox-Prozess neu gestartet)")
+        except (EOFError, OSError, pickle.UnpicklingError) as e:
+            error = SandboxError(type(e).__name__, "Sandbox-Prozess abgestürzt – bitte erneut ausführen.")
+        return ExecResult({}, "", "", error, profile.route)
+
+    def _drop_heavy_notebook(self, key):
+        with self._keys_lock:
+            if key not in self._heavy_notebooks:
+                return
+            self._heavy_notebooks.discard(key)
+        try:
+            self._call(("drop", key), key)
+        except (TimeoutError, EOFError, OSError):
+            pass  # Worker neu gestartet → Session ist ohnehin weg
+
+    def drop_notebook(self, key):
+        self.notebooks.drop(key)
+        self._drop_heavy_notebook(key)
+
+    def prepare(self, task):
+        """Warm every running worker for ``task``: the datasets its code reads and the reference solution.
+
+        Workers that have not started yet are skipped – warming must not boot the pool before any heavy run.
+        """
+        for worker in self._workers:
+            with worker.lock:
+                if not worker.started:
+                    continue
+                try:
+                    worker.call(("prepare", task), self.hard_timeout)
+                except (TimeoutError, EOFError, OSError, SandboxError):
+                    pass  # nur Vorarbeit – der eigentliche Lauf meldet Fehler selbst
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _route(source):
+        return analyze(source, FILENAME).route
+
+    def runs_in_worker(self, task):
+        """Whether the task's own solution takes the heavy path (proxy for the learner's code)."""
+        return self._route(task.get("solution_code") or "") == "heavy"
+
+    def close(self):
+        for worker in self._workers:
+            with worker.lock:
+                worker.kill()
+
+
+def replay_streamlit(calls):
+    """Render the ``st.*`` calls recorded in the sandbox with the real Streamlit API."""
+    import streamlit as st
+
+    for name, args, kwargs in calls:
+        if name == "image" and args and isinstance(args[0], Png):
+            st.image(args[0].data, width="stretch")
+            continue
+        images = [a for a in args if isinstance(a, Png)]
+        if images:
+            for image in images:
+                st.image(image.data, width="stretch")
+            continue
+        getattr(st, name)(*args, **kwargs)
@@ -0,0 +1,29 @@
+# ============================================================
+# 🔁 Spaced-Repetition Regeln (geteilt von App + Simulator)
+# ============================================================
+import numpy as np
+
+RATINGS = ("hard", "medium", "easy")
+RATING_CODES = {name: code for code, name in enumerate(RATINGS)}
+
+# Intervall-Multiplikatoren in der Reihenfolge von RATINGS
+DEFAULT_MULTIPLIERS = (0.5, 1.5, 2.5)
+
+DEFAULT_INTERVAL = 0.5  # Tage, Intervall einer noch nie bewerteten Aufgabe
+MIN_INTERVAL = 0.5      # Tage, Untergrenze nach jeder Bewertung
+SECONDS_PER_DAY = 86400
+
+
+def next_interval(interval, rating_code, multipliers=DEFAULT_MULTIPLIERS, min_interval=MIN_INTERVAL):
+    """New review interval (days) after a rating.
+
+    Works element-wise, so the app calls it with scalars and the simulator
+    with whole (learners × tasks) arrays.
+    """
+    factor = np.asarray(multipliers, dtype=np.float64)[rating_code]
+    return np.maximum(interval * factor, min_interval)
+
+
+def is_due(elapsed_days, interval):
+    """True where at least ``interval`` days have passed since the last review."""
+    return elapsed_days >= interval
@@ -0,0 +1,330 @@
+# ============================================================
+# 🧊 Shared State – Aufgabenbank + Datensätze einmal für alle Server-Prozesse
+# ============================================================
+#
+# Laufen mehrere Streamlit-Prozesse auf einer Maschine, liest und parst sonst
+# jeder tasks.json und jede data/*.csv mit pandas selbst. Der Preloader legt
+# alles einmal vorverarbeitet in ein read-only Shared-Memory-Segment:
+#
+#   python app/shared_state.py build      # Segment (neu) anlegen
+#   python app/shared_state.py info       # Inhalt + Aktualität anzeigen
+#   python app/shared_state.py drop       # Segment entfernen
+#
+# Layout: MAGIC | Manifest-Länge | Manifest (JSON) | Blobs (64-Byte-ausgerichtet)
+#
+#   tasks.json      Rohbytes der Datei (Python-Dicts lassen sich nicht teilen –
+#                   jeder Prozess parst sie einmal, aber ohne Dateizugriff)
+#   task_ids        int64-Array in Reihenfolge von tasks.json
+#   task_category   int64-Array task_id → Kategorie-Index (beide ohne
+#                   build_category_index; wenige KiB, werden kopiert)
+#   data/*.csv      Arrow-IPC der mit pandas geparsten Tabelle. Schlüssel ist
+#                   "data/<datei>.csv" – so wie Aufgaben und Editor-Code den
+#                   Pfad schreiben, relativ zum Repo-Wurzelverzeichnis (ROOT_DIR),
+#                   unabhängig vom Arbeitsverzeichnis des Prozesses.
+#
+# Gespart wird Parse-Zeit, nicht Speicher: jeder Prozess (und jeder Aufruf)
+# bekommt eigene Kopien – json.loads der Aufgaben, je DataFrame die IPC-Bytes –,
+# aber Arrow → pandas kostet nur einen Bruchteil von read_csv (avocado: ~15 ms
+# statt ~110 ms). Keine Python-Objekte zeigen dauerhaft in die Abbildung –
+# detach() gibt sie frei (beim Prozessende automatisch), das Segment selbst
+# bleibt für andere Prozesse.
+#
+# App-Prozesse hängen sich beim Start an (Name über PLAYGROUND_SHM_NAME). Fehlt
+# das Segment, passt MAGIC nicht oder haben sich tasks.json / eine CSV seit dem
+# Build geändert (mtime + Größe), fällt der jeweilige Teil auf die Datei zurück.
+#
+import argparse
+import atexit
+import json
+import os
+import sys
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+import numpy as np
+
+from forecast import build_category_index
+
+MAGIC = b"PLAYSHM1"
+HEADER_SIZE = 16  # MAGIC + Manifest-Länge (uint64)
+ALIGN = 64
+SEGMENT_NAME = os.environ.get("PLAYGROUND_SHM_NAME", "playground_bank")
+TASKS_PATH = Path(__file__).parent / "tasks.json"
+ROOT_DIR = Path(__file__).resolve().parent.parent  # Basis für "data/..."-Pfade in Aufgaben + Editor-Code
+DATA_DIR = ROOT_DIR / "data"
+
+
+@dataclass
+class TaskBank:
+    tasks: list
+    categories: list
+    task_category: np.ndarray
+    task_ids: np.ndarray
+    tasks_by_id: dict
+    source: str  # "shared" | "file"
+
+
+def fingerprint(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def dataset_path(path):
+    """Absolute path of a ``data/...`` reference as written in tasks and editor code (relative to ROOT_DIR)."""
+    return (ROOT_DIR / path).resolve()
+
+
+def dataset_key(path):
+    """Segment key ``data/<file>.csv`` for a path inside DATA_DIR, else None."""
+    path = dataset_path(path)
+    return f"data/{path.name}" if path.parent == DATA_DIR and path.suffix == ".csv" else None
+
+
+def _untrack(shm):
+    """Keep the segment alive after this process exits (Python < 3.13 has no ``track=False``)."""
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+
+# ============================
+# 🏗️ Preloader
+# ============================
+def _arrow_blob(path):
+    """Arrow IPC bytes of ``pd.read_csv(path)`` – None if the round trip would not be exact."""
+    import pandas as pd
+    import pyarrow as pa
+
+    df = pd.read_csv(path)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    back = table.to_pandas()
+    if not (back.equals(df) and back.dtypes.equals(df.dtypes)):
+        return None
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def collect_blobs(tasks_path=TASKS_PATH, data_dir=DATA_DIR):
+    """(blobs, manifest entries without offsets, extra manifest fields, skipped datasets) for a new segment."""
+    raw = Path(tasks_path).read_bytes()
+    tasks = json.loads(raw)
+    categories, task_category = build_category_index(tasks)
+    task_ids = np.fromiter((t["id"] for t in tasks), dtype=np.int64, count=len(tasks))
+
+    blobs = {"tasks.json": raw, "task_ids": task_ids.tobytes(), "task_category": task_category.tobytes()}
+    entries = {"tasks.json": {"fingerprint": fingerprint(tasks_path)}, "task_ids": {}, "task_category": {}}
+    skipped = []
+    try:
+        import pyarrow  # noqa: F401  (optional: ohne pyarrow nur die Aufgabenbank)
+        csv_paths = sorted(Path(data_dir).glob("*.csv"))
+    except ImportError:
+        csv_paths, skipped = [], ["pyarrow fehlt – keine Datensätze"]
+    for path in csv_paths:
+        try:
+            blob = _arrow_blob(path)
+        except Exception as e:
+            blob, reason = None, str(e)
+        else:
+            reason = "Arrow-Round-Trip nicht exakt"
+        if blob is None:
+            skipped.append(f"{path.as_posix()}: {reason}")
+            continue
+        key = f"data/{path.name}"  # gelesen wird immer aus DATA_DIR – anderes --data-dir gilt dort als veraltet
+        blobs[key] = blob
+        entries[key] = {"fingerprint": fingerprint(path), "kind": "arrow"}
+    return blobs, entries, {"categories": categories}, skipped
+
+
+def build(name=SEGMENT_NAME, tasks_path=TASKS_PATH, data_dir=DATA_DIR):
+    """Create (or replace) the segment; processes attached to an old one keep their mapping."""
+    blobs, entries, extra, skipped = collect_blobs(tasks_path, data_dir)
+    offset = 0
+    for key, blob in blobs.items():
+        entries[key].update(offset=offset, size=len(blob))
+        offset += -(-len(blob) // ALIGN) * ALIGN
+    manifest = json.dumps({"blobs": entries, **extra}, ensure_ascii=False).encode("utf-8")
+    data_start = -(-(HEADER_SIZE + len(manifest)) // ALIGN) * ALIGN
+
+    drop(name)
+    shm = shared_memory.SharedMemory(name=name, create=True, size=data_start + max(offset, 1))
+    _untrack(shm)
+    shm.buf[:8] = MAGIC
+    shm.buf[8:16] = len(manifest).to_bytes(8, "little")
+    shm.buf[HEADER_SIZE:HEADER_SIZE + len(manifest)] = manifest
+    for key, blob in blobs.items():
+        start = data_start + entries[key]["offset"]
+        shm.buf[start:start + len(blob)] = blob
+    shm.close()
+    return data_start + offset, skipped
+
+
+def drop(name=SEGMENT_NAME):
+    """Unlink the segment; returns False if there was none."""
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return False
+    _untrack(shm)
+    shm.close()
+    shm.unlink()
+    return True
+
+
+# ============================
+# 📎 Anhängen (App-Prozesse)
+# ============================
+class SharedSegment:
+    """Read-only handle on a segment built by ``build``; everything it returns is a copy, so ``close`` always works."""
+
+    def __init__(self, shm):
+        self._shm = shm
+        buf = shm.buf
+        if bytes(buf[:8]) != MAGIC:
+            raise ValueError("unknown segment layout")
+        length = int.from_bytes(buf[8:16], "little")
+        manifest = json.loads(bytes(buf[HEADER_SIZE:HEADER_SIZE + length]))
+        self.blobs = manifest["blobs"]
+        self.categories = manifest["categories"]
+        self._data_start = -(-(HEADER_SIZE + length) // ALIGN) * ALIGN
+        self.size = shm.size
+
+    def blob(self, key):
+        """Memoryview into the mapping – release it (``with``) before the segment is closed."""
+        entry = self.blobs[key]
+        start = self._data_start + entry["offset"]
+        return self._shm.buf[start:start + entry["size"]].toreadonly()
+
+    def close(self):
+        """Unmap the segment in this process; it stays in shared memory for the others."""
+        self._shm.close()
+
+    def is_fresh(self, key, path):
+        try:
+            return key in self.blobs and self.blobs[key]["fingerprint"] == fingerprint(path)
+        except OSError:
+            return False
+
+    def raw(self, key):
+        with self.blob(key) as view:
+            return bytes(view)
+
+    def array(self, key):
+        array = np.frombuffer(self.raw(key), dtype=np.int64)
+        array.flags.writeable = False
+        return array
+
+    def frame(self, key):
+        """New DataFrame of a dataset blob, built on a private copy of the IPC bytes (never on the mapping)."""
+        import pyarrow as pa
+
+        # to_pandas() übernimmt Arrow-Puffer teils ohne Kopie – auf der Abbildung würden sie close() blockieren
+        table = pa.ipc.open_file(pa.BufferReader(pa.py_buffer(self.raw(key)))).read_all()
+        return table.to_pandas()
+
+
+_attached = {}  # Name → SharedSegment (oder None) dieses Prozesses
+
+
+def attach(name=SEGMENT_NAME):
+    """The process's segment handle, or None if there is no (valid) segment."""
+    if name not in _attached:
+        _attached[name] = _map(name)
+    return _attached[name]
+
+
+def _map(name):
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except (FileNotFoundError, ValueError, OSError):
+        return None
+    _untrack(shm)  # sonst räumt der resource_tracker das Segment beim Prozessende ab
+    try:
+        segment = SharedSegment(shm)
+    except (ValueError, KeyError):
+        shm.close()
+        return None
+    atexit.register(detach, name)
+    return segment
+
+
+def detach(name=SEGMENT_NAME):
+    """Unmap this process's segment; the next ``attach`` maps it again (e.g. after a rebuild)."""
+    segment = _attached.pop(name, None)
+    if segment is not None:
+        segment.close()
+
+
+def load_task_bank(tasks_path=TASKS_PATH, name=SEGMENT_NAME):
+    """Task bank from the segment if it matches ``tasks_path``, else parsed from the file."""
+    segment = attach(name)
+    if segment is not None and segment.is_fresh("tasks.json", tasks_path):
+        tasks = json.loads(segment.raw("tasks.json"))  # spart Dateizugriff + build_category_index, nicht json.loads
+        categories = segment.categories
+        task_category, task_ids = segment.array("task_category"), segment.array("task_ids")
+        source = "shared"
+    else:
+        with open(tasks_path, "r", encoding="utf-8") as f:
+            tasks = json.load(f)
+        categories, task_category = build_category_index(tasks)
+        task_ids = np.fromiter((t["id"] for t in tasks), dtype=np.int64, count=len(tasks))
+        task_category.flags.writeable = False
+        task_ids.flags.writeable = False
+        source = "file"
+    return TaskBank(tasks, categories, task_category, task_ids, {t["id"]: t for t in tasks}, source)
+
+
+def _fresh_key(path, name):
+    segment = attach(name)
+    key = dataset_key(path)
+    if segment is None or key is None or not segment.is_fresh(key, dataset_path(path)):
+        return None, None
+    return segment, key
+
+
+def has_shared(path, name=SEGMENT_NAME):
+    """Whether the segment holds an up-to-date copy of a ``data/*.csv`` path."""
+    return _fresh_key(path, name)[0] is not None
+
+
+def shared_frame(path, name=SEGMENT_NAME):
+    """New DataFrame for a ``data/*.csv`` path from the segment – None if absent or the file changed since."""
+    segment, key = _fresh_key(path, name)
+    return None if segment is None else segment.frame(key)
+
+
+# ============================
+# 🖥️ CLI
+# ============================
+def main():
+    parser = argparse.ArgumentParser(description="Build/inspect the shared-memory task bank.")
+    parser.add_argument("command", choices=["build", "info", "drop"])
+    parser.add_argument("--name", default=SEGMENT_NAME)
+    parser.add_argument("--tasks", type=Path, default=TASKS_PATH)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        size, skipped = build(args.name, args.tasks, args.data_dir)
+        print(f"✅ Segment '{args.name}' angelegt: {size / 1024:.0f} KiB")
+        for reason in skipped:
+            print(f"   ⚠️ übersprungen: {reason}")
+    elif args.command == "drop":
+        print(f"🗑️ '{args.name}' entfernt" if drop(args.name) else f"ℹ️ kein Segment '{args.name}'")
+    else:
+        segment = attach(args.name)
+        if segment is None:
+            print(f"ℹ️ kein Segment '{args.name}' – Apps lesen die Dateien")
+            sys.exit(1)
+        print(f"Segment '{args.name}': {segment.size / 1024:.0f} KiB, {len(segment.categories)} Kategorien")
+        for key, entry in segment.blobs.items():
+            path = args.tasks if key == "tasks.json" else dataset_path(key)
+            state = "" if "fingerprint" not in entry else ("aktuell" if segment.is_fresh(key, path) else "VERALTET")
+            print(f"  {key:<45} {entry['size'] / 1024:>8.1f} KiB  {state}")
+
+
+if __name__ == "__main__":
+    main()
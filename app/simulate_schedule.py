@@ -0,0 +1,223 @@
+# ============================================================
+# 🧪 Spaced-Repetition Simulator – Multiplikatoren über ein Semester testen
+# ============================================================
+#
+# Beispiel:
+#   python app/simulate_schedule.py --learners 1000 --days 120 \
+#       --hard 0.3 0.5 0.8 --medium 1.2 1.5 2.0 --easy 2.0 2.5 3.0
+#
+# Standard ist capacity 0 = unbegrenzt: zeigt den echten Bedarf, ein 3×3×3-Grid
+# braucht so rund eine halbe Minute. Jede weitere --capacity verdoppelt die
+# Laufzeit; mit knapper Kapazität (z. B. 30) ist jede Konfiguration am Limit
+# (reviews_per_day == capacity) – dann unterscheiden sich die Schedules nur im
+# Rückstand (mean_backlog / final_backlog).
+#
+import argparse
+import itertools
+import json
+import time
+from dataclasses import dataclass, asdict
+
+import numpy as np
+
+from scheduling import RATING_CODES, DEFAULT_MULTIPLIERS, DEFAULT_INTERVAL, next_interval, is_due
+
+N_TASKS = 460
+HARD, MEDIUM, EASY = RATING_CODES["hard"], RATING_CODES["medium"], RATING_CODES["easy"]
+
+
+@dataclass
+class RecallModel:
+    """Exponential forgetting curve: p(recall) = exp(-elapsed / stability).
+
+    Stability (days) starts per learner × task from a log-normal spread,
+    grows by ``growth`` after a successful recall and shrinks by ``lapse``
+    after a failure. Failed recalls are rated hard, confident ones
+    (p >= ``easy_threshold``) easy, everything else medium.
+    """
+    initial_stability: float = 4.0
+    stability_sigma: float = 0.5
+    first_recall: float = 0.5
+    growth: float = 2.0
+    lapse: float = 0.7
+    min_stability: float = 0.2
+    easy_threshold: float = 0.85
+
+    def init_stability(self, rng, n_learners, n_tasks):
+        learner = rng.lognormal(0.0, self.stability_sigma, size=(n_learners, 1))
+        task = rng.lognormal(0.0, self.stability_sigma, size=(1, n_tasks))
+        return (self.initial_stability * learner * task).astype(np.float32)
+
+    def review(self, rng, stability, elapsed, seen):
+        """Return (rating codes, new stability) for the given learner × task cells."""
+        with np.errstate(over="ignore", invalid="ignore"):
+            p = np.where(seen, np.exp(-elapsed / stability), self.first_recall)
+        recalled = rng.random(p.shape, dtype=np.float32) < p
+
+        codes = np.where(recalled, np.where(p >= self.easy_threshold, EASY, MEDIUM), HARD)
+        new_stability = np.where(recalled, stability * self.growth,
+                                 np.maximum(stability * self.lapse, self.min_stability))
+        return codes, new_stability.astype(np.float32)
+
+
+@dataclass
+class SimResult:
+    multipliers: tuple
+    capacity: int                 # 0 = unbegrenzt
+    reviews_per_day: np.ndarray   # Ø Wiederholungen pro Lerner und Tag
+    backlog_per_day: np.ndarray   # Ø fällige, aber nicht geschaffte Aufgaben
+    recall_rate: np.ndarray       # Anteil nicht-"hard" Bewertungen pro Tag
+    due_histogram: np.ndarray     # Verteilung "fällig in k Tagen" am Ende (letzter Bin = später)
+
+    def summary(self):
+        return {
+            "hard": self.multipliers[HARD],
+            "medium": self.multipliers[MEDIUM],
+            "easy": self.multipliers[EASY],
+            "capacity": self.capacity or "∞",
+            "reviews_per_day": round(float(self.reviews_per_day.mean()), 2),
+            "days_at_capacity": round(float(self.at_capacity().mean()), 3),
+            "mean_backlog": round(float(self.backlog_per_day.mean()), 2),
+            "final_backlog": round(float(self.backlog_per_day[-1]), 2),
+            "recall_rate": round(float(np.nanmean(self.recall_rate)), 3),
+            "due_within_7d": round(float(self.due_histogram[:7].sum()), 3),
+        }
+
+    def at_capacity(self):
+        """Per day: did the average learner use (almost) the whole capacity?"""
+        if not self.capacity:
+            return np.zeros(len(self.reviews_per_day), dtype=bool)
+        return self.reviews_per_day >= 0.99 * self.capacity
+
+
+def simulate(multipliers=DEFAULT_MULTIPLIERS, n_learners=1000, n_tasks=N_TASKS, n_days=120,
+             daily_capacity=30, model=None, seed=0, histogram_days=30):
+    """Run the schedule for ``n_learners`` synthetic learners, one vectorized step per day.
+
+    Like the app, never-reviewed tasks are always due; each learner works
+    through at most ``daily_capacity`` randomly chosen due tasks per day
+    (0 or None = no limit).
+    """
+    model = model or RecallModel()
+    rng = np.random.default_rng(seed)
+    shape = (n_learners, n_tasks)
+
+    interval = np.full(shape, DEFAULT_INTERVAL, dtype=np.float32)
+    last_review = np.full(shape, -np.inf, dtype=np.float32)
+    seen = np.zeros(shape, dtype=bool)
+    stability = model.init_stability(rng, n_learners, n_tasks)
+
+    reviews = np.zeros(n_days)
+    backlog = np.zeros(n_days)
+    recall = np.full(n_days, np.nan)
+
+    for day in range(n_days):
+        elapsed = day - last_review
+        due = is_due(elapsed, interval)
+
+        # zufällige Auswahl von max. daily_capacity fälligen Aufgaben pro Lerner
+        if daily_capacity and daily_capacity < n_tasks:
+            keys = rng.random(shape, dtype=np.float32)
+            keys[~due] = 2.0
+            cutoff = np.partition(keys, daily_capacity - 1, axis=1)[:, daily_capacity - 1:daily_capacity]
+            selected = due & (keys <= cutoff)
+        else:
+            selected = due
+
+        # nur die ausgewählten Zellen bewerten (flache Indizes, keine Python-Schleife)
+        idx = np.flatnonzero(selected)
+        flat_interval, flat_stability = interval.reshape(-1), stability.reshape(-1)
+        codes, flat_stability[idx] = model.review(
+            rng, flat_stability[idx], elapsed.reshape(-1)[idx], seen.reshape(-1)[idx]
+        )
+        flat_interval[idx] = next_interval(flat_interval[idx], codes, multipliers)
+        last_review.reshape(-1)[idx] = day
+        seen.reshape(-1)[idx] = True
+
+        reviews[day] = idx.size / n_learners
+        backlog[day] = (due.sum() - idx.size) / n_learners
+        if idx.size:
+            recall[day] = (codes != HARD).mean()
+
+    days_until_due = np.clip(np.ceil(last_review + interval - n_days), 0, histogram_days)
+    due_histogram = np.bincount(days_until_due.astype(np.int64).ravel(), minlength=histogram_days + 1)
+
+    return SimResult(
+        multipliers=tuple(float(m) for m in multipliers),
+        capacity=daily_capacity or 0,
+        reviews_per_day=reviews,
+        backlog_per_day=backlog,
+        recall_rate=recall,
+        due_histogram=due_histogram / due_histogram.sum(),
+    )
+
+
+def sweep(hard_values, medium_values, easy_values, capacities=(30,), **kwargs):
+    """Simulate every capacity × multiplier combination of the grid (same seed for comparability)."""
+    results = []
+    for capacity, hard, medium, easy in itertools.product(capacities, hard_values, medium_values, easy_values):
+        multipliers = [0.0, 0.0, 0.0]
+        multipliers[HARD], multipliers[MEDIUM], multipliers[EASY] = hard, medium, easy
+        results.append(simulate(tuple(multipliers), daily_capacity=capacity, **kwargs))
+    return results
+
+
+def main():
+    defaults = dict(zip(("hard", "medium", "easy"), DEFAULT_MULTIPLIERS))
+    parser = argparse.ArgumentParser(description="Sweep spaced-repetition multipliers over synthetic learners.")
+    parser.add_argument("--hard", type=float, nargs="+", default=[defaults["hard"]])
+    parser.add_argument("--medium", type=float, nargs="+", default=[defaults["medium"]])
+    parser.add_argument("--easy", type=float, nargs="+", default=[defaults["easy"]])
+    parser.add_argument("--learners", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=N_TASKS)
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--capacity", type=int, nargs="+", default=[0],
+                        help="max. Wiederholungen pro Lerner und Tag (0 = unbegrenzt)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stability", type=float, default=RecallModel.initial_stability)
+    parser.add_argument("--growth", type=float, default=RecallModel.growth)
+    parser.add_argument("--first-recall", type=float, default=RecallModel.first_recall)
+    parser.add_argument("--out", help="optional: JSON mit allen Tageskurven")
+    args = parser.parse_args()
+
+    model = RecallModel(initial_stability=args.stability, growth=args.growth, first_recall=args.first_recall)
+
+    start = time.perf_counter()
+    results = sweep(
+        args.hard, args.medium, args.easy,
+        n_learners=args.learners, n_tasks=args.tasks, n_days=args.days,
+        capacities=args.capacity, model=model, seed=args.seed,
+    )
+    elapsed = time.perf_counter() - start
+
+    header = ["capacity", "hard", "medium", "easy", "reviews_per_day", "days_at_capacity",
+              "mean_backlog", "final_backlog", "recall_rate", "due_within_7d"]
+    print(" | ".join(f"{h:>16}" for h in header))
+    for res in results:
+        row = res.summary()
+        print(" | ".join(f"{row[h]:>16}" for h in header))
+    print(f"\n{len(results)} Parameter-Sets in {elapsed:.1f}s")
+    for capacity in args.capacity:
+        group = [res for res in results if res.capacity == capacity]
+        if capacity and all(res.at_capacity().all() for res in group):
+            print(f"⚠️ capacity {capacity}: jede Konfiguration ist an jedem Tag am Limit – "
+                  "reviews_per_day ist hier nicht aussagekräftig, vergleiche mean_backlog.")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({
+                "model": asdict(model),
+                "results": [
+                    {
+                        **res.summary(),
+                        "reviews_per_day_series": res.reviews_per_day.round(3).tolist(),
+                        "backlog_per_day_series": res.backlog_per_day.round(3).tolist(),
+                        "due_histogram": res.due_histogram.round(4).tolist(),
+                    }
+                    for res in results
+                ],
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+-- ============================================================
+-- 🔄 Progress Delta-Sync – Tabellen & RPCs für Supabase (Postgres)
+-- ============================================================
+--
+-- Einmal im Supabase SQL-Editor ausführen. Der Client schickt nur die seit
+-- seinem letzten Sync-Token geänderten Tasks; sync_progress wendet sie in
+-- einer Transaktion an und liefert alle Tasks zurück, die sich seit diesem
+-- Token geändert haben (auch durch andere Tabs/Geräte) plus den neuen Token.
+--
+-- Merge-Regeln pro (username, task_id):
+--   attempts                          addieren (Client sendet das Delta)
+--   rating, interval_days, last_review  neuere last_review gewinnt
+--
+-- users_progress (ein JSON-Blob pro User) bleibt als Altbestand lesbar und
+-- wird beim ersten Sync eines Users in progress_tasks übernommen.
+
+create table if not exists progress_tasks (
+    username      text             not null,
+    task_id       integer          not null,
+    attempts      integer          not null default 0,
+    rating        smallint         not null default -1,
+    interval_days double precision not null default 0.5,
+    last_review   double precision not null default 0,
+    version       bigint           not null,
+    primary key (username, task_id)
+);
+
+create index if not exists progress_tasks_version on progress_tasks (username, version);
+
+create table if not exists progress_sync (
+    username   text        primary key,
+    token      bigint      not null default 0,
+    updated_at timestamptz not null default now()
+);
+
+
+-- Altes Blob-Format (Version 1: Dicts, Version 2: parallele Arrays) → Task-Zeilen
+create or replace function legacy_progress_rows(p jsonb)
+returns table (task_id integer, attempts integer, rating smallint, interval_days double precision,
+               last_review double precision)
+language sql immutable as $$
+    select (p->'task_ids'->>i)::integer,
+           (p->'attempts'->>i)::integer,
+           (p->'ratings'->>i)::smallint,
+           (p->'intervals'->>i)::double precision,
+           (p->'last_review'->>i)::double precision
+    from generate_series(0, coalesce(jsonb_array_length(p->'task_ids'), 0) - 1) as i
+    where (p->>'version')::integer = 2
+    union all
+    select k::integer,
+           coalesce((p->'attempts'->>k)::integer, 0),
+           case p->'ratings'->>k when 'hard' then 0 when 'medium' then 1 when 'easy' then 2 else -1 end::smallint,
+           coalesce((p->'review_data'->k->>'interval')::double precision, 0.5),
+           coalesce((p->'review_data'->k->>'last_review')::double precision, 0)
+    from (
+        select jsonb_object_keys(coalesce(p->'ratings', '{}')) as k
+        union select jsonb_object_keys(coalesce(p->'attempts', '{}'))
+        union select jsonb_object_keys(coalesce(p->'review_data', '{}'))
+    ) as keys
+    where p->>'version' is null;
+$$;
+
+
+-- Progress eines Users im Format von Progress.to_dict (Version 2)
+create or replace function progress_json(p_username text)
+returns jsonb
+language sql stable as $$
+    select coalesce(
+        (select jsonb_build_object(
+                    'version', 2,
+                    'task_ids', jsonb_agg(t.task_id order by t.task_id),
+                    'attempts', jsonb_agg(t.attempts order by t.task_id),
+                    'ratings', jsonb_agg(t.rating order by t.task_id),
+                    'intervals', jsonb_agg(t.interval_days order by t.task_id),
+                    'last_review', jsonb_agg(t.last_review order by t.task_id),
+                    'timestamp', (select extract(epoch from s.updated_at) from progress_sync s
+                                  where s.username = p_username))
+         from progress_tasks t
+         where t.username = p_username
+         having count(*) > 0),
+        (select up.progress from users_progress up where up.username = p_username)
+    );
+$$;
+
+
+-- Sperrt den Sync-Zähler des Users; übernimmt beim ersten Mal den Altbestand
+create or replace function lock_progress_token(p_username text)
+returns bigint
+language plpgsql as $$
+declare
+    v_token bigint;
+begin
+    insert into progress_sync (username) values (p_username) on conflict (username) do nothing;
+    select token into v_token from progress_sync where username = p_username for update;
+
+    if v_token = 0 then
+        v_token := 1;
+        insert into progress_tasks (username, task_id, attempts, rating, interval_days, last_review, version)
+        select p_username, l.task_id, l.attempts, l.rating, l.interval_days, l.last_review, v_token
+        from users_progress up, legacy_progress_rows(up.progress) l
+        where up.username = p_username
+        on conflict (username, task_id) do nothing;
+        update progress_sync set token = v_token where username = p_username;
+    end if;
+    return v_token;
+end;
+$$;
+
+
+-- Delta anwenden, Änderungen seit p_since zurückgeben: {"token": n, "rows": [...]}
+create or replace function sync_progress(p_username text, p_since bigint, p_changes jsonb)
+returns jsonb
+language plpgsql as $$
+declare
+    v_token bigint := lock_progress_token(p_username);
+begin
+    if jsonb_array_length(coalesce(p_changes, '[]')) > 0 then
+        v_token := v_token + 1;
+        insert into progress_tasks as t (username, task_id, attempts, rating, interval_days, last_review, version)
+        select p_username, c.task_id, c.attempts, c.rating, c.interval_days, c.last_review, v_token
+        from jsonb_to_recordset(p_changes)
+             as c(task_id integer, attempts integer, rating smallint, interval_days double precision,
+                  last_review double precision)
+        on conflict (username, task_id) do update set
+            attempts      = t.attempts + excluded.attempts,
+            rating        = case when excluded.last_review > t.last_review then excluded.rating else t.rating end,
+            interval_days = case when excluded.last_review > t.last_review
+                                 then excluded.interval_days else t.interval_days end,
+            last_review   = greatest(t.last_review, excluded.last_review),
+            version       = excluded.version;
+        update progress_sync set token = v_token, updated_at = now() where username = p_username;
+    end if;
+
+    return jsonb_build_object(
+        'token', v_token,
+        'rows', coalesce((
+            select jsonb_agg(jsonb_build_object(
+                'task_id', t.task_id, 'attempts', t.attempts, 'rating', t.rating,
+                'interval_days', t.interval_days, 'last_review', t.last_review))
+            from progress_tasks t
+            where t.username = p_username and t.version > p_since
+        ), '[]'::jsonb)
+    );
+end;
+$$;
+
+
+-- Admin-Import: [{"username": ..., "rows": [...]}] mit absoluten Werten überschreiben
+create or replace function replace_progress(p_users jsonb)
+returns void
+language plpgsql as $$
+declare
+    u       jsonb;
+    v_token bigint;
+begin
+    for u in select * from jsonb_array_elements(p_users) loop
+        insert into users (username) values (u->>'username') on conflict (username) do nothing;
+        v_token := lock_progress_token(u->>'username') + 1;
+
+        insert into progress_tasks as t (username, task_id, attempts, rating, interval_days, last_review, version)
+        select u->>'username', c.task_id, c.attempts, c.rating, c.interval_days, c.last_review, v_token
+        from jsonb_to_recordset(u->'rows')
+             as c(task_id integer, attempts integer, rating smallint, interval_days double precision,
+                  last_review double precision)
+        on conflict (username, task_id) do update set
+            attempts      = excluded.attempts,
+            rating        = excluded.rating,
+            interval_days = excluded.interval_days,
+            last_review   = excluded.last_review,
+            version       = excluded.version;
+        update progress_sync set token = v_token, updated_at = now() where username = u->>'username';
+    end loop;
+end;
+$$;
+
+
+-- Keyset-Seite für den Export: (username, progress_json) nach username sortiert
+create or replace function progress_page(p_after text, p_limit integer)
+returns table (username text, progress jsonb)
+language sql stable as $$
+    select u.username, progress_json(u.username)
+    from users u
+    where p_after is null or u.username > p_after
+    order by u.username
+    limit p_limit;
+$$;
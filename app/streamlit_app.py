@@ -1,19 +1,30 @@
 # ============================================================
 # 🧠 Mini Python Playground – Spaced Repetition + Difficulty + Counter
 # ============================================================
-import pandas as pd
+# Schwere Pakete (pandas, altair, supabase, requests, streamlit_ace) werden erst
+# bei der ersten Verwendung importiert → schneller Kaltstart bis zum ersten Paint.
+# Budget (erster Paint) prüfen: python app/check_import_time.py
 import streamlit as st
-import io
-import contextlib
-import json
 import random
 import time
+import atexit
+import uuid
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from streamlit_ace import st_ace
-import requests
-import json
-from supabase import create_client
-import json
+import numpy as np
+from forecast import forecast_reviews
+from checker import has_cases, format_grid, describe_failure
+from executor import BudgetExceeded
+from feedback import bounded_repr, clip_text, diff_values, first_output_difference, output_diff
+from issue_outbox import IssueOutbox, GIST_API_URL
+from prefetch import Prefetcher
+from progress import Progress
+from progress_store import SupabaseProgressStore, SQLiteProgressStore
+from reference import Reference
+from sandbox import SandboxPool, replay_streamlit
+from sampling import WeightedPicker
+from scheduling import SECONDS_PER_DAY
+from shared_state import load_task_bank
 
 # --- Page setup ---
 st.set_page_config(page_title="Mini Python Playground!", page_icon="💻", layout="centered")
@@ -22,20 +33,98 @@ st.set_page_config(page_title="Mini Python Playground!", page_icon="💻", layou
 # --- #Load tasks from JSON ---
 TASKS_PATH = Path(__file__).parent / "tasks.json"
 
-try:
-    with open(TASKS_PATH, "r", encoding="utf-8") as f:
-        tasks = json.load(f)
 
+@st.cache_resource
+def get_task_bank():
+    """Tasks + category index once per process – from the shared segment (shared_state.py) if built, else tasks.json."""
+    return load_task_bank(TASKS_PATH)
+
+
+try:
+    bank = get_task_bank()
 except Exception as e:
     st.error(f"❌ Could not load tasks.json: {e}")
     st.stop()
 
-supabase = create_client(
-    st.secrets["SUPABASE_URL"],
-    st.secrets["SUPABASE_ANON_KEY"]
-)
+tasks = bank.tasks
+CATEGORIES, TASK_CATEGORY, TASK_IDS = bank.categories, bank.task_category, bank.task_ids
+TASKS_BY_ID = bank.tasks_by_id
+FILTER_MODES = ["Alle Aufgaben", "Nach Kategorie", "Direkte Task-ID"]
+
+
+# --- Schöne kompakte Kategorie-Labels ---
+def format_category_label(cat):
+    main = cat.split("(")[0].strip()
+    parts = main.split(" - ")
+
+    if len(parts) == 2:
+        return f"{parts[0]} – {parts[1]}"
+    else:
+        return main
+
+
+@st.cache_resource
+def get_supabase():
+    """Supabase client, created lazily once per server process."""
+    from supabase import create_client
+
+    return create_client(
+        st.secrets["SUPABASE_URL"],
+        st.secrets["SUPABASE_ANON_KEY"]
+    )
+
+@st.cache_resource
+def get_progress_store():
+    """Supabase in production; the PROGRESS_SQLITE_PATH secret switches to a local SQLite file."""
+    sqlite_path = st.secrets.get("PROGRESS_SQLITE_PATH")
+    if sqlite_path:
+        return SQLiteProgressStore(sqlite_path)
+    return SupabaseProgressStore(get_supabase())
+
+
+OUTBOX_PATH = Path(__file__).parent / "issue_outbox.sqlite3"
+
+
+@st.cache_resource
+def get_issue_outbox():
+    """One outbox + sender thread per server process."""
+    outbox = IssueOutbox(
+        st.secrets.get("ISSUE_OUTBOX_PATH", OUTBOX_PATH),
+        token=st.secrets["GITHUB_TOKEN"],
+        api_url=st.secrets.get("GIST_API_URL", GIST_API_URL),
+    )
+    return outbox.start()
+
+
+REVIEW_LOG_DIR = Path(__file__).parent / "review_events"
+
 
-st.write("Supabase connected:", supabase is not None)
+@st.cache_resource
+def get_review_log():
+    """Shared append-only event log of all ratings in this server process."""
+    from review_log import ReviewLog
+
+    log = ReviewLog(st.secrets.get("REVIEW_LOG_DIR", REVIEW_LOG_DIR)).start()  # Flush/fsync im Hintergrund
+    atexit.register(log.close)
+    return log
+
+
+@st.cache_resource
+def get_reference():
+    """Section index of the quarto reference (built by build_reference.py)."""
+    return Reference()
+
+
+@st.cache_resource
+def get_sandbox():
+    """Worker processes for heavy editor code + light notebook namespaces (one per process)."""
+    return SandboxPool()
+
+
+@st.cache_resource
+def get_prefetcher():
+    """Background warm-up of the next task's datasets/reference section (one per process)."""
+    return Prefetcher(get_reference(), get_sandbox())
 
 
 # --- Tabs ----------------------------------------------------
@@ -52,22 +141,17 @@ with tabs[0]:
         # 🎲 beim allerersten Laden: zufälligen Task auswählen
         st.session_state["task_index"] = random.choice([t["id"] for t in tasks]) - 1
 
-    if "ratings" not in st.session_state:
-        st.session_state["ratings"] = {}
-    if "attempts" not in st.session_state:
-        st.session_state["attempts"] = {}
-    if "review_data" not in st.session_state:
-        st.session_state["review_data"] = {}
+    if "progress" not in st.session_state:
+        # Versuche, Ratings und Intervalle als Arrays (Index = Task-ID)
+        st.session_state["progress"] = Progress.for_tasks(tasks)
+    if "review_rev" not in st.session_state:
+        # wird bei jeder Änderung des Fortschritts erhöht (Cache-Invalidierung)
+        st.session_state["review_rev"] = 0
+    if "check_results" not in st.session_state:
+        st.session_state["check_results"] = {}
+    if "session_id" not in st.session_state:
+        st.session_state["session_id"] = uuid.uuid4().hex
 
-    # Track filter changes
-    if "filter_changed" not in st.session_state:
-        st.session_state["filter_changed"] = False
-    if "prev_filter_mode" not in st.session_state:
-        st.session_state["prev_filter_mode"] = None
-    if "prev_cat" not in st.session_state:
-        st.session_state["prev_cat"] = None
-    if "prev_id" not in st.session_state:
-        st.session_state["prev_id"] = None
 
 
     # --- Helper functions ---
@@ -76,8 +160,7 @@ with tabs[0]:
 
 
     def username_exists(username):
-        res = supabase.table("users").select("username").eq("username", username).execute()
-        return len(res.data) > 0
+        return get_progress_store().user_exists(username)
 
 
     def create_username(username):
@@ -92,138 +175,156 @@ with tabs[0]:
             st.error("❌ Username already exists. Choose another one.")
             return False
 
-        # create user
-        supabase.table("users").insert({"username": username}).execute()
-
-        # create empty progress record
-        supabase.table("users_progress").upsert({
-            "username": username,
-            "progress": {
-                "ratings": {},
-                "attempts": {},
-                "review_data": {},
-                "timestamp": time.time(),
-            }
-        }).execute()
+        # create user; progress rows entstehen beim ersten Sync
+        get_progress_store().create_user(username)
 
         st.success(f"🎉 Username '{username}' created!")
         return True
 
 
-    def save_progress(username):
-        # 🔹 bestehenden Progress aus DB laden (falls vorhanden)
-        res = supabase.table("users_progress") \
-            .select("progress") \
-            .eq("username", username) \
-            .limit(1) \
-            .execute()
-
-        db_progress = res.data[0]["progress"] if res.data else {}
-
-        # 🔹 lokaler Export (wie vorher)
-        export_data = {
-            "ratings": st.session_state.get("ratings", {}),
-            "attempts": st.session_state.get("attempts", {}),
-            "review_data": st.session_state.get("review_data", {}),
-            "timestamp": time.time(),
-        }
+    def sync_progress(username, since):
+        """One round-trip: push local deltas, pull everything changed remotely since ``since``."""
+        progress = st.session_state["progress"]
+        token, rows = get_progress_store().sync(username, since, progress.pending_changes())
+        st.session_state["sync_state"] = (username, token)
+        # nur echte Änderungen von anderswo zählen – das Echo der eigenen Bewertung hat update_review
+        # schon gezählt (ein zweiter Sprung ließe WeightedPicker alles neu berechnen)
+        if progress.apply_rows(rows):
+            st.session_state["review_rev"] += 1
 
-        # 🔹 MINIMALER Merge (DB + lokal)
-        merged_progress = {
-            "ratings": {**db_progress.get("ratings", {}), **export_data["ratings"]},
-            "attempts": {**db_progress.get("attempts", {}), **export_data["attempts"]},
-            "review_data": {**db_progress.get("review_data", {}), **export_data["review_data"]},
-            "timestamp": export_data["timestamp"],
-        }
 
-        # 🔹 speichern wie vorher
-        supabase.table("users_progress").upsert({
-            "username": username,
-            "progress": merged_progress
-        }).execute()
+    def push_progress(username):
+        # 🔹 Token gilt nur für den User, mit dem zuletzt synchronisiert wurde
+        synced_user, token = st.session_state.get("sync_state", (None, 0))
+        sync_progress(username, token if synced_user == username else 0)
+
 
-        # 🔹 UX bleibt identisch
+    def save_progress(username):
+        push_progress(username)
         st.success("✔ Fortschritt gespeichert!")
 
 
     def load_progress(username):
-        res = supabase.table("users_progress") \
-            .select("progress") \
-            .eq("username", username) \
-            .limit(1) \
-            .execute()
-
-        if res.data:
-            progress = res.data[0]["progress"]
+        if not username_exists(username):
+            st.warning("⚠ Kein Fortschritt für diesen Username gefunden.")
+            return
 
-            # 1) Session-State HARD RESET (aber core keys intakt lassen)
-            st.session_state["ratings"] = progress.get("ratings", {})
-            st.session_state["attempts"] = progress.get("attempts", {})
-            st.session_state["review_data"] = progress.get("review_data", {})
+        # 1) Session-State HARD RESET, dann kompletten Stand (Token 0) holen
+        st.session_state["progress"] = Progress(len(st.session_state["progress"]))
+        st.session_state["review_rev"] += 1
+        sync_progress(username, 0)
 
-            st.success("✔ Fortschritt geladen! (Lokale Daten vollständig ersetzt)")
-        else:
-            st.warning("⚠ Kein Fortschritt für diesen Username gefunden.")
+        st.success("✔ Fortschritt geladen! (Lokale Daten vollständig ersetzt)")
 
 
     def update_review(task_id, difficulty):
-        data = st.session_state["review_data"].get(task_id, {"interval": 0.5, "last_review": time.time()})
-        interval = data["interval"]
-
-        if difficulty == "hard":
-            interval = max(interval * 0.5, 0.5)
-        elif difficulty == "medium":
-            interval = interval * 1.5
-        elif difficulty == "easy":
-            interval = interval * 2.5
-
-        st.session_state["review_data"][task_id] = {
-            "interval": interval,
-            "last_review": time.time(),
-        }
+        """Count the attempt, store the rating, advance the interval. Returns (before, after)."""
+        interval_before, interval_after = st.session_state["progress"].record_rating(task_id, difficulty)
+        st.session_state["review_rev"] += 1
+        # 🎯 Gewichtete Auswahl: nur das Gewicht dieser Aufgabe neu berechnen
+        for picker in st.session_state.get("weak_pickers", {}).values():
+            picker.update(st.session_state["progress"], task_id, st.session_state["review_rev"])
+        return interval_before, interval_after
 
 
-    def upload_issue_to_gist(task_id, data):
-        """Upload a single issue as a secret GitHub Gist."""
-        token = st.secrets["GITHUB_TOKEN"]
+    def mismatch_line(var, user_val, expected):
+        """❌ line with bounded values and, where it can be located, the first difference."""
+        line = f"❌ `{var}` = {bounded_repr(user_val)} (expected {bounded_repr(expected)})"
+        detail = diff_values(user_val, expected)
+        return f"{line} – {detail}" if detail else line
 
-        url = "https://api.github.com/gists"
-        headers = {"Authorization": f"token {token}"}
 
-        payload = {
-            "files": {
-                f"issue_task_{task_id}.json": {
-                    "content": json.dumps(data, indent=2, ensure_ascii=False)
-                }
-            },
-            "public": False  # secret gist
-        }
-
-        resp = requests.post(url, headers=headers, json=payload)
+    def submit_issue(task_id, data):
+        """Queue a single issue; the outbox uploads it as a secret GitHub Gist in the background."""
+        return get_issue_outbox().submit(task_id, data)
 
-        if resp.status_code == 201:
-            return resp.json()["html_url"]
+    def pick_next_task(tasks):
+        if st.session_state.get("focus_weak"):
+            # 🎯 Alias-Tabelle pro Filter-Ansicht, Gewicht nach Bewertung/Versuchen/Überfälligkeit
+            pickers = st.session_state.setdefault("weak_pickers", {})
+            view = next_pick_key()[1:3]
+            if view not in pickers:
+                pickers[view] = WeightedPicker([t["id"] for t in tasks])
+            return TASKS_BY_ID[pickers[view].pick(st.session_state["progress"], st.session_state["review_rev"])]
+
+        ids = np.fromiter((t["id"] for t in tasks), dtype=np.int64, count=len(tasks))
+        due = st.session_state["progress"].due_mask(ids)
+
+        # nichts fällig → aus allen Aufgaben der Ansicht wählen
+        candidates = ids[due] if due.any() else ids
+        return TASKS_BY_ID[int(random.choice(candidates))]
+
+
+    # --- Callbacks: ändern den State VOR dem (einzigen) Rerun ---
+    def flash(level, message):
+        """Queue a message for the next run (callbacks cannot place elements themselves)."""
+        st.session_state.setdefault("flash", []).append((level, message))
+
+
+    def current_filtered_tasks():
+        mode = st.session_state.get("filter_mode", FILTER_MODES[0])
+        if mode == "Nach Kategorie":
+            category = st.session_state.get("filter_cat", CATEGORIES[0])
+            return [t for t in tasks if t["category"] == category]
+        if mode == "Direkte Task-ID":
+            selected_id = st.session_state.get("filter_id", min(TASKS_BY_ID))
+            return [t for t in tasks if t["id"] == selected_id]
+        return tasks
+
+
+    def next_pick_key():
+        """Vorab gewählte Aufgabe gilt nur, solange sich Fortschritt und Filter nicht geändert haben."""
+        mode = st.session_state.get("filter_mode", FILTER_MODES[0])
+        if mode == "Nach Kategorie":
+            detail = st.session_state.get("filter_cat", CATEGORIES[0])
+        elif mode == "Direkte Task-ID":
+            detail = st.session_state.get("filter_id", min(TASKS_BY_ID))
         else:
-            st.error(f"❌ Fehler beim Gist-Upload: {resp.text}")
-            return None
+            detail = None
+        return (st.session_state["review_rev"], mode, detail,
+                st.session_state.get("focus_weak", False))
 
-    def pick_next_task(tasks):
-        now = time.time()
-        due_tasks = []
 
-        for task in tasks:
-            tid = task["id"]
-            data = st.session_state["review_data"].get(tid, {"interval": 0.5, "last_review": 0})
-            last_seen = data["last_review"]
-            interval_seconds = data["interval"] * 86400
+    def go_to_next_task():
+        key, task_id = st.session_state.pop("next_pick", (None, None))
+        next_t = TASKS_BY_ID[task_id] if key == next_pick_key() else pick_next_task(current_filtered_tasks())
+        st.session_state["task_index"] = next_t["id"] - 1
+        return next_t
+
+
+    def on_next_click():
+        next_t = go_to_next_task()
+        flash("success", f"🕒 Nächste Aufgabe: #{next_t['id']}")
+
 
-            if now - last_seen >= interval_seconds:
-                due_tasks.append(task)
+    def on_rating_click(rating, rid):
+        # 1-3) Attempt Counter, Rating und Spaced Repetition Interval aktualisieren
+        interval_before, interval_after = update_review(rid, rating)
+        rid_attempts = int(st.session_state["progress"].attempts[rid])
+        username = st.session_state.get("login_username")
+
+        # 3b) Event ins Review-Log schreiben (append-only)
+        get_review_log().append(
+            username or f"anon:{st.session_state['session_id']}",
+            rid,
+            rating,
+            interval_before,
+            interval_after,
+            outcome=st.session_state["check_results"].pop(rid, None),  # gilt nur für diese eine Bewertung
+        )
 
-        if not due_tasks:
-            due_tasks = sorted(tasks, key=lambda t: st.session_state["review_data"].get(t["id"], {}).get("last_review", 0))
+        # 4) Feedback für den nächsten Lauf vormerken
+        if rating == "hard":
+            flash("warning", f"🔴 Successfully counted as HARD — attempts now: {rid_attempts}")
+        elif rating == "medium":
+            flash("info", f"🟡 Successfully counted as MEDIUM — attempts now: {rid_attempts}")
+        elif rating == "easy":
+            flash("success", f"🟢 Successfully counted as EASY — attempts now: {rid_attempts}")
 
-        return random.choice(due_tasks)
+        # 5) Automatisch speichern, wenn ein Username eingegeben ist
+        if username:
+            push_progress(username)
+            flash("toast", "💾 Fortschritt automatisch gespeichert!")
 
 
     st.sidebar.header("🔐 Login / Cloud-Speicher")
@@ -257,11 +358,22 @@ with tabs[0]:
     task = get_task()
     tid = task["id"]
 
+    # --- Referenz (Index einmal pro Prozess, Inhalt nur für den gewählten Abschnitt) ---
+    with st.sidebar.expander("📚 Referenz"):
+        reference = get_reference()
+        query = st.text_input("Suchen", key="reference_query", placeholder="z. B. groupby, compound interest")
+        sections = reference.search(query) if query.strip() else reference.for_category(task["category"])
+
+        if sections:
+            titles = {s["id"]: s["title"] for s in sections}
+            section_id = st.selectbox("Abschnitt", list(titles), format_func=titles.get, key="reference_section")
+            st.markdown(reference.fragment(section_id))
+        else:
+            st.caption("Keine Treffer." if query.strip() else "Keine Referenz für diese Kategorie.")
+
     # --- Display Header ---F
     st.title(f"🧠 Task {task['id']}/{len(tasks)}")
 
-    from datetime import date
-
     exam_date = date(2026, 2, 12)
     days_left = (exam_date - date.today()).days
 
@@ -285,52 +397,24 @@ with tabs[0]:
     # 🔽 FILTER: Task-ID oder Kategorie
     # ----------------------------------------
 
+    # Wechsel von Modus/Kategorie/ID wählt per Callback sofort die nächste Aufgabe
     filter_mode = st.radio(
         "Filtermodus wählen:",
-        ["Alle Aufgaben", "Nach Kategorie", "Direkte Task-ID"],
-        horizontal=True
+        FILTER_MODES,
+        horizontal=True,
+        key="filter_mode",
+        on_change=go_to_next_task,
     )
 
-    # detect filter mode change
-    if st.session_state["prev_filter_mode"] != filter_mode:
-        st.session_state["filter_changed"] = True
-    st.session_state["prev_filter_mode"] = filter_mode
-
-    filtered_tasks = tasks
-
     if filter_mode == "Nach Kategorie":
-        all_categories = sorted({t["category"] for t in tasks})
-        selected_cat = st.selectbox("Kategorie wählen:", all_categories)
-
-        # detect category change
-        if st.session_state["prev_cat"] != selected_cat:
-            st.session_state["filter_changed"] = True
-        st.session_state["prev_cat"] = selected_cat
-
-        filtered_tasks = [t for t in tasks if t["category"] == selected_cat]
+        st.selectbox("Kategorie wählen:", CATEGORIES, key="filter_cat", on_change=go_to_next_task)
 
     elif filter_mode == "Direkte Task-ID":
-        all_ids = [t["id"] for t in tasks]
-        selected_id = st.number_input("Task-ID wählen:", min_value=min(all_ids), max_value=max(all_ids), step=1)
-
-        # detect ID change
-        if st.session_state["prev_id"] != selected_id:
-            st.session_state["filter_changed"] = True
-        st.session_state["prev_id"] = selected_id
-
-        filtered_tasks = [t for t in tasks if t["id"] == selected_id]
-
-    # AUTO-NEXT if filter changed
-    if st.session_state.get("filter_changed", False):
-        # Reset toggle BEFORE rerun (wichtig!)
-        st.session_state["filter_changed"] = False
+        st.number_input("Task-ID wählen:", min_value=min(TASKS_BY_ID), max_value=max(TASKS_BY_ID), step=1,
+                        key="filter_id", on_change=go_to_next_task)
 
-        # Pick next task
-        next_t = pick_next_task(filtered_tasks)
-        st.session_state["task_index"] = next_t["id"] - 1
-
-        # Use new safe rerun method
-        st.rerun()
+    st.toggle("🎯 Schwachstellen fokussieren", key="focus_weak",
+              help="Schwer bewertete und überfällige Aufgaben kommen häufiger dran (gewichtete Zufallsauswahl).")
 
     with st.popover("ℹ️ Filter-Hilfe"):
         st.markdown(
@@ -346,6 +430,11 @@ with tabs[0]:
             **Direkte Task-ID**  
             → Ermöglicht **chronologisches Vorgehen** oder das gezielte Aufrufen
             einer bestimmten Aufgabe (z. B. nach Empfehlung oder zum Wiederholen).
+
+            **🎯 Schwachstellen fokussieren**  
+            → Statt gleichverteilt unter den fälligen Aufgaben wird gewichtet gezogen:
+            „Schwer“ zählt 4×, „Mittel“ 2×, „Einfach“ 1×; lange Intervalle senken,
+            Überfälligkeit erhöht das Gewicht.
             """
         )
 
@@ -384,6 +473,8 @@ with tabs[0]:
     """, unsafe_allow_html=True)
 
     # --- Code editor ---
+    from streamlit_ace import st_ace
+
     content = st_ace(
         value="# Write your code below:\n\n",
         language="python",
@@ -393,87 +484,29 @@ with tabs[0]:
     )
 
 
-    # ============================
-    # 🧠 Shared sandbox setup
-    # ============================
-    def build_user_globals():
-        import numpy as np
-        import pandas as pd
-        import matplotlib.pyplot as plt
-        import seaborn as sns
-        import scipy
-        import scipy.stats as stats
-        import streamlit as st
-        import sys
-        import re
-
-        SAFE_BUILTINS = {
-            "__build_class__": __build_class__,
-            "__import__": __import__,
-            "super": super,
-            "StopIteration": StopIteration,
-
-            # core
-            "print": print,
-            "open": open,
-            "range": range,
-            "len": len,
-            "sum": sum,
-            "min": min,
-            "max": max,
-            "abs": abs,
-            "round": round,
-            "sorted": sorted,
-            "enumerate": enumerate,
-            "zip": zip,
-
-            # logic / typing
-            "any": any,
-            "all": all,
-            "bool": bool,
-            "type": type,
-            "isinstance": isinstance,
-
-            # data types
-            "int": int,
-            "float": float,
-            "str": str,
-            "list": list,
-            "dict": dict,
-            "set": set,
-            "tuple": tuple,
-
-            # decorators
-            "classmethod": classmethod,
-            "staticmethod": staticmethod,
-            "property": property,
-
-            # exceptions
-            "AssertionError": AssertionError,
-            "ValueError": ValueError,
-            "TypeError": TypeError,
-            "ZeroDivisionError": ZeroDivisionError,
-            "Exception": Exception,
-            "FileNotFoundError": FileNotFoundError,
-        }
+    # 📓 Notebook-Modus: Namespace bleibt erhalten, nur geänderte Zellen laufen neu
+    notebook_key = (st.session_state["session_id"], tid)
+    nb_col1, nb_col2 = st.columns([3, 1])
+    with nb_col1:
+        notebook_mode = st.toggle(
+            "📓 Notebook-Modus", key="notebook_mode",
+            help="Zellen mit `# %%` trennen (sonst ist jede Anweisung eine Zelle). "
+                 "Nur geänderte Zellen und was von ihnen abhängt laufen neu.",
+        )
+    with nb_col2:
+        if notebook_mode and st.button("🔄 Neu starten", help="Namespace dieser Aufgabe verwerfen"):
+            get_sandbox().drop_notebook(notebook_key)
 
-        return {
-            "__builtins__": SAFE_BUILTINS,
-            "__name__": "__main__",
-
-            # scientific stack
-            "np": np,
-            "pd": pd,
-            "plt": plt,
-            "sns": sns,
-            "scipy": scipy,
-            "stats": stats,
-
-            # infra
-            "st": st,
-            "sys": sys,
-            "re": re,
-        }
+
+    def execute(source, names=(), check=False):
+        """Run in the sandbox (``names``: globals needed back; ``check``: run the task's test cases too)."""
+        result = get_sandbox().execute(source, task=task if check else None, names=names,
+                                       notebook_key=notebook_key if notebook_mode else None)
+        replay_streamlit(result.st_calls)
+        if getattr(result, "cells_total", 0):
+            st.caption(f"📓 {result.cells_run} von {result.cells_total} Zellen ausgeführt, "
+                       f"Rest aus dem Namespace ({result.duration * 1000:.0f} ms)")
+        return result
 
 
     # ============================
@@ -484,26 +517,24 @@ with tabs[0]:
     if do_run:
         st.subheader("🖥️ Execution Result")
 
-        stdout_buffer = io.StringIO()
-        stderr_buffer = io.StringIO()
-
         try:
-            with contextlib.redirect_stdout(stdout_buffer), contextlib.redirect_stderr(stderr_buffer):
-                user_globals = build_user_globals()
-                exec(content, user_globals)
+            # AST einmal parsen → trivialer Code im leichten Evaluator, Rest in einem Sandbox-Prozess
+            result = execute(content)
+            if result.error is not None:
+                raise result.error
 
-            output = stdout_buffer.getvalue().strip()
-            errors = stderr_buffer.getvalue().strip()
+            output = result.stdout.strip()
+            errors = result.stderr.strip()
 
             if output:
-                st.text_area("📤 Output", output, height=150)
+                st.text_area("📤 Output", clip_text(output), height=150)
             if errors:
-                st.error(errors)
+                st.error(clip_text(errors))
             if not output and not errors:
                 st.info("ℹ️ No output shown — `print()` is required.")
 
-        except Exception as e:
-            st.error(f"❌ Exception during execution:\n{e}")
+        except (Exception, BudgetExceeded) as e:
+            st.error(f"❌ Exception during execution:\n{clip_text(str(e), 2000)}")
 
     # ============================
     # ▶️ Run & Check
@@ -511,107 +542,126 @@ with tabs[0]:
     if st.button("▶️ Run & Check"):
         st.subheader("🖥️ Execution Result")
 
-        stdout_buffer = io.StringIO()
-        stderr_buffer = io.StringIO()
-
         try:
-            with contextlib.redirect_stdout(stdout_buffer), contextlib.redirect_stderr(stderr_buffer):
-                user_globals = build_user_globals()
-                exec(content, user_globals)
+            check_vars = task.get("check_variable", [])
+            result = execute(content, names=check_vars if isinstance(check_vars, list) else [check_vars],
+                             check=True)
+            if result.error is not None:
+                raise result.error
 
-            output = stdout_buffer.getvalue()
-            errors = stderr_buffer.getvalue()
+            user_globals = result.globals
+            output = result.stdout
+            errors = result.stderr
 
             if output.strip():
-                st.text_area("🖨️ Output", output, height=120)
+                st.text_area("🖨️ Output", clip_text(output), height=120)
             if errors.strip():
-                st.error(errors)
+                st.error(clip_text(errors))
 
             # ============================
-            # Checking logic (UNCHANGED)
+            # Funktions-Aufgaben: Testfälle (ein Lauf, viele Aufrufe)
             # ============================
+            if has_cases(task):
+                case_results = result.cases
+                passed = sum(r.passed for r in case_results)
+                st.session_state["check_results"][tid] = passed == len(case_results)
+
+                st.markdown(format_grid(case_results))
+                failed = next((r for r in case_results if r.status not in ("pass", "skipped")), None)
+                if failed is None:
+                    st.success(f"✅ Alle {passed} Testfälle bestanden.")
+                else:
+                    st.warning(f"❌ Testfall {failed.index + 1}: {describe_failure(failed)}")
+            else:
+                # ============================
+                # Checking logic (UNCHANGED)
+                # ============================
+
+                check_vars = task.get("check_variable", [])
+                expected_vals = task.get("expected_value", [])
+                expected_output = task.get("expected_output", None)
+                results = []
+
+                if isinstance(check_vars, list):
+                    for var, exp in zip(check_vars, expected_vals):
+                        user_val = user_globals.get(var, None)
+
+                        # --- tolerance-based check (JSON configurable) ---
+                        check_type = task.get("check_type", "exact")
+                        if check_type == "float_tolerance":
+                            tol = task.get("tolerance", 0.001)
+                            try:
+                                if isinstance(user_val, (int, float)) and abs(user_val - exp) <= tol:
+                                    results.append(f"✅ `{var}` ≈ {bounded_repr(user_val)} (within ±{tol})")
+                                    continue
+                            except:
+                                pass
+                        # --------------------------------------------------
+
+                        ALLOWED_TYPES = (list, set, dict, tuple)
+
+                        if isinstance(user_val, ALLOWED_TYPES) and isinstance(exp, ALLOWED_TYPES):
+                            if isinstance(user_val, set):
+                                user_norm = sorted(user_val)
+                            elif isinstance(user_val, dict):
+                                user_norm = sorted(user_val.items())
+                            else:
+                                user_norm = user_val
 
-            check_vars = task.get("check_variable", [])
-            expected_vals = task.get("expected_value", [])
-            expected_output = task.get("expected_output", None)
-            results = []
-
-            if isinstance(check_vars, list):
-                for var, exp in zip(check_vars, expected_vals):
-                    user_val = user_globals.get(var, None)
-
-                    # --- tolerance-based check (JSON configurable) ---
-                    check_type = task.get("check_type", "exact")
-                    if check_type == "float_tolerance":
-                        tol = task.get("tolerance", 0.001)
-                        try:
-                            if isinstance(user_val, (int, float)) and abs(user_val - exp) <= tol:
-                                results.append(f"✅ `{var}` ≈ {user_val} (within ±{tol})")
-                                continue
-                        except:
-                            pass
-                    # --------------------------------------------------
-
-                    ALLOWED_TYPES = (list, set, dict, tuple)
-
-                    if isinstance(user_val, ALLOWED_TYPES) and isinstance(exp, ALLOWED_TYPES):
-                        if isinstance(user_val, set):
-                            user_norm = sorted(user_val)
-                        elif isinstance(user_val, dict):
-                            user_norm = sorted(user_val.items())
-                        else:
-                            user_norm = user_val
-
-                        if isinstance(exp, set):
-                            exp_norm = sorted(exp)
-                        elif isinstance(exp, dict):
-                            exp_norm = sorted(exp.items())
-                        else:
-                            exp_norm = exp
+                            if isinstance(exp, set):
+                                exp_norm = sorted(exp)
+                            elif isinstance(exp, dict):
+                                exp_norm = sorted(exp.items())
+                            else:
+                                exp_norm = exp
 
-                        if user_norm == exp_norm:
-                            results.append(f"✅ `{var}` = {user_val}")
+                            if user_norm == exp_norm:
+                                results.append(f"✅ `{var}` = {bounded_repr(user_val)}")
+                            else:
+                                results.append(mismatch_line(var, user_val, exp))
                         else:
-                            results.append(f"❌ `{var}` = {user_val} (expected {exp})")
+                            if user_val == exp:
+                                results.append(f"✅ `{var}` = {bounded_repr(exp)}")
+                            else:
+                                if user_val is None:
+                                    results.append(f"❌ `{var}` not found.")
+                                else:
+                                    results.append(mismatch_line(var, user_val, exp))
+
+                elif isinstance(check_vars, str):
+                    user_val = user_globals.get(check_vars, None)
+                    if user_val == expected_vals:
+                        results.append(f"✅ `{check_vars}` = {bounded_repr(expected_vals)}")
                     else:
-                        if user_val == exp:
-                            results.append(f"✅ `{var}` = {exp}")
+                        if user_val is None:
+                            results.append(f"❌ `{check_vars}` not found.")
                         else:
-                            if user_val is None:
-                                results.append(f"❌ `{var}` not found.")
-                            else:
-                                results.append(f"❌ `{var}` = {user_val} (expected {exp})")
+                            results.append(mismatch_line(check_vars, user_val, expected_vals))
 
-            elif isinstance(check_vars, str):
-                user_val = user_globals.get(check_vars, None)
-                if user_val == expected_vals:
-                    results.append(f"✅ `{check_vars}` = {expected_vals}")
-                else:
-                    if user_val is None:
-                        results.append(f"❌ `{check_vars}` not found.")
+                if expected_output is not None:
+                    if output == expected_output:
+                        results.append("✅ Printed output is correct.")
                     else:
-                        results.append(f"❌ `{check_vars}` = {user_val} (expected {expected_vals})")
-
-            if expected_output is not None:
-                if output == expected_output:
-                    results.append("✅ Printed output is correct.")
+                        results.append(
+                            f"❌ Printed output weicht ab – {first_output_difference(output, expected_output)}\n\n"
+                            f"```diff\n{output_diff(output, expected_output)}\n```"
+                        )
+
+                # ohne Checks kein Ergebnis (None) – sonst zählt die Aufgabe als fehlgeschlagen
+                st.session_state["check_results"][tid] = all("✅" in line for line in results) if results else None
+
+                if results:
+                    for line in results:
+                        if "✅" in line:
+                            st.success(line)
+                        else:
+                            st.warning(line)
                 else:
-                    results.append(
-                        f"❌ Printed output was `{output.strip()}` "
-                        f"(expected `{expected_output.strip()}`)"
-                    )
+                    st.info("ℹ️ No checks defined for this task.")
 
-            if results:
-                for line in results:
-                    if "✅" in line:
-                        st.success(line)
-                    else:
-                        st.warning(line)
-            else:
-                st.info("ℹ️ No checks defined for this task.")
-
-        except Exception as e:
-            st.error(f"❌ Exception: {e}")
+        except (Exception, BudgetExceeded) as e:
+            st.session_state["check_results"][tid] = False
+            st.error(f"❌ Exception: {clip_text(str(e), 2000)}")
 
     st.markdown("---")
 
@@ -619,68 +669,30 @@ with tabs[0]:
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        pressed_hard = st.button("😤 Schwer", key=f"hard_btn_{tid}")
+        st.button("😤 Schwer", key=f"hard_btn_{tid}", on_click=on_rating_click, args=("hard", tid))
 
     with col2:
-        pressed_medium = st.button("🙂 Mittel", key=f"medium_btn_{tid}")
+        st.button("🙂 Mittel", key=f"medium_btn_{tid}", on_click=on_rating_click, args=("medium", tid))
 
     with col3:
-        pressed_easy = st.button("😎 Einfach", key=f"easy_btn_{tid}")
+        st.button("😎 Einfach", key=f"easy_btn_{tid}", on_click=on_rating_click, args=("easy", tid))
 
     with col4:
-        next_task = st.button("➡️ Nächste Aufgabe")
-
-    # -------------------------------------------------------
-    # 🔥 PERSISTENTES CLICK-EVENT FÜR RATINGS
-    # -------------------------------------------------------
-
-    # Button-Clicks speichern (nur 1 Frame)
-    if pressed_hard:
-        st.session_state["last_rating"] = ("hard", tid)
-
-    if pressed_medium:
-        st.session_state["last_rating"] = ("medium", tid)
-
-    if pressed_easy:
-        st.session_state["last_rating"] = ("easy", tid)
+        st.button("➡️ Nächste Aufgabe", on_click=on_next_click)
 
     # -------------------------------------------------------
-    # 📌 WENN EIN RATING GESPEICHERT WURDE → VERARBEITEN
+    # 📌 Meldungen aus den Callbacks (Rating, Next) anzeigen
     # -------------------------------------------------------
-    if "last_rating" in st.session_state:
-        rating, rid = st.session_state["last_rating"]
-
-        # 1) Attempt Counter aktualisieren
-        st.session_state["attempts"][rid] = st.session_state["attempts"].get(rid, 0) + 1
-
-        # 2) Rating speichern
-        st.session_state["ratings"][rid] = rating
-
-        # 3) Spaced Repetition Interval aktualisieren
-        update_review(rid, rating)
-
-        # 4) Feedback anzeigen
-        if rating == "hard":
-            st.warning(f"🔴 Successfully counted as HARD — attempts now: {st.session_state['attempts'][rid]}")
-        elif rating == "medium":
-            st.info(f"🟡 Successfully counted as MEDIUM — attempts now: {st.session_state['attempts'][rid]}")
-        elif rating == "easy":
-            st.success(f"🟢 Successfully counted as EASY — attempts now: {st.session_state['attempts'][rid]}")
-
-        # 🆕 5) 🔥 Automatisch Supabase speichern (existierende Funktion!)
-        if username:
-            save_progress(username)
-            st.toast("💾 Fortschritt automatisch gespeichert!")
-
-        # 6) Event löschen, damit es nicht doppelt abgefeuert wird
-        del st.session_state["last_rating"]
+    for level, message in st.session_state.pop("flash", []):
+        getattr(st, level)(message)
 
     # -------------------------------------------------------
     # 💡 Lösung & Erklärung (immer sichtbar, aber eingeklappt)
     # -------------------------------------------------------
     with st.expander("💡 Lösung & Erklärung", expanded=False):
-        st.code(task["solution_code"], language="python")
-        st.markdown(task.get("explanation", "_Keine Erklärung für diese Aufgabe hinterlegt._"))
+        solution_code, explanation = get_prefetcher().solution_block(task)  # meist schon vom Prefetcher gebaut
+        st.code(solution_code, language="python")
+        st.markdown(explanation)
 
     with st.popover("ℹ️"):
         st.write(
@@ -694,15 +706,6 @@ with tabs[0]:
             """
         )
 
-    # -------------------------------------------------------
-    # NEXT TASK
-    # -------------------------------------------------------
-    if next_task:
-        next_t = pick_next_task(filtered_tasks)
-        st.session_state["task_index"] = next_t["id"] - 1
-        st.success(f"🕒 Nächste Aufgabe: #{next_t['id']}")
-        st.rerun()
-
     # --- Fortschritt ---
     progress = (st.session_state["task_index"] + 1) / len(tasks)
     st.progress(progress)
@@ -713,17 +716,10 @@ with tabs[0]:
     # =======================================================
     st.header("📊 Progress Dashboard")
 
-    # --- Attempts sicher normalisieren ---
-    attempts_raw = st.session_state.get("attempts", {})
-
-    # attempts kann None, list, str, usw. sein → IMMER in dict casten!
-    if isinstance(attempts_raw, dict):
-        attempts = {int(k): v for k, v in attempts_raw.items()}
-    else:
-        attempts = {}
+    progress = st.session_state["progress"]
 
     total_tasks = len(tasks)
-    answered_once = sum(1 for c in attempts.values() if c >= 1)
+    answered_once = progress.answered_count()
 
     # --- Overview ---
     st.subheader("🧮 Overview")
@@ -737,99 +733,90 @@ with tabs[0]:
     # 📊 Progress per Category (% completed)
     # ============================================================
 
-    import pandas as pd
-    import altair as alt
-
-    # -----------------------------
-    # 1️⃣ Attempts normalisieren
-    # -----------------------------
-    attempts_raw = st.session_state.get("attempts", {})
-    attempts = {int(k): v for k, v in attempts_raw.items()} if isinstance(attempts_raw, dict) else {}
-
-    # -----------------------------
-    # 2️⃣ Tasks → DataFrame
-    # -----------------------------
-    df = pd.DataFrame(tasks)[["id", "category"]].copy()
-
-    df["answered"] = df["id"].apply(lambda tid: 1 if attempts.get(tid, 0) >= 1 else 0)
-
-    # -----------------------------
-    # 3️⃣ Aggregation pro Kategorie
-    # -----------------------------
-    cat_df = (
-        df.groupby("category")
-        .agg(
-            answered=("answered", "sum"),
-            total=("answered", "count")
+    # Chart nur neu bauen, wenn sich der Fortschritt geändert hat (altair/pandas erst hier laden)
+    category_key = st.session_state["review_rev"]
+    cached = st.session_state.get("category_chart_cache")
+    if cached is None or cached[0] != category_key:
+        import pandas as pd
+        import altair as alt
+
+        # -----------------------------
+        # 1️⃣+2️⃣ Tasks → DataFrame, beantwortet direkt aus dem Attempts-Array
+        # -----------------------------
+        df = pd.DataFrame({"id": TASK_IDS, "category": np.asarray(CATEGORIES, dtype=object)[TASK_CATEGORY[TASK_IDS]]})
+
+        df["answered"] = (progress.attempts[df["id"].to_numpy()] >= 1).astype(int)
+
+        # -----------------------------
+        # 3️⃣ Aggregation pro Kategorie
+        # -----------------------------
+        cat_df = (
+            df.groupby("category")
+            .agg(
+                answered=("answered", "sum"),
+                total=("answered", "count")
+            )
+            .reset_index()
         )
-        .reset_index()
-    )
-
-    cat_df["pct"] = (cat_df["answered"] / cat_df["total"] * 100).round(1)
 
+        cat_df["pct"] = (cat_df["answered"] / cat_df["total"] * 100).round(1)
 
-    # -----------------------------
-    # 4️⃣ Schöne kompakte Labels
-    # -----------------------------
-    def format_category_label(cat):
-        main = cat.split("(")[0].strip()
-        parts = main.split(" - ")
 
-        if len(parts) == 2:
-            return f"{parts[0]} – {parts[1]}"
-        else:
-            return main
+        # -----------------------------
+        # 4️⃣ Schöne kompakte Labels
+        # -----------------------------
+        cat_df["category_label"] = cat_df["category"].apply(format_category_label)
 
+        # -----------------------------
+        # 5️⃣ Sortierung: höchster Fortschritt zuerst
+        # -----------------------------
+        cat_df = cat_df.sort_values(
+            by=["pct", "answered", "total"],
+            ascending=[False, False, False]
+        )
 
-    cat_df["category_label"] = cat_df["category"].apply(format_category_label)
+        # -----------------------------
+        # 6️⃣ Horizontaler Prozent-Balken
+        # -----------------------------
+        chart = (
+            alt.Chart(cat_df)
+            .mark_bar(color="#27ae60")
+            .encode(
+                y=alt.Y(
+                    "category_label:N",
+                    sort=cat_df["category_label"].tolist(),
+                    title="Kategorie",
+                    axis=alt.Axis(
+                        labelLimit=0,  # nichts abschneiden
+                        labelAlign="right",  # Text zeigt nach links
+                        labelPadding=6,
+                        offset=5  # 🔥 DAS verschiebt die Balken nach rechts
+                    )
+                ),
+                x=alt.X(
+                    "pct:Q",
+                    scale=alt.Scale(domain=[0, 100]),
+                    title="Abgeschlossene Aufgaben (%)"
+                ),
+                tooltip=[
+                    alt.Tooltip("category:N", title="Kategorie"),
+                    alt.Tooltip("total:Q", title="Gesamtfragen"),
+                    alt.Tooltip("answered:Q", title="Beantwortet"),
+                    alt.Tooltip("pct:Q", title="Fortschritt (%)")
+                ]
+            )
+            .properties(
+                height=36 * len(cat_df)
+            )
+        )
 
-    # -----------------------------
-    # 5️⃣ Sortierung: höchster Fortschritt zuerst
-    # -----------------------------
-    cat_df = cat_df.sort_values(
-        by=["pct", "answered", "total"],
-        ascending=[False, False, False]
-    )
+        cached = (category_key, chart)
+        st.session_state["category_chart_cache"] = cached
 
-    # -----------------------------
-    # 6️⃣ Horizontaler Prozent-Balken
-    # -----------------------------
     st.subheader("📊 Fortschritt pro Kategorie (%)")
     st.caption("Mindestens Einmal Beantwortet")
 
-    chart = (
-        alt.Chart(cat_df)
-        .mark_bar(color="#27ae60")
-        .encode(
-            y=alt.Y(
-                "category_label:N",
-                sort=cat_df["category_label"].tolist(),
-                title="Kategorie",
-                axis=alt.Axis(
-                    labelLimit=0,  # nichts abschneiden
-                    labelAlign="right",  # Text zeigt nach links
-                    labelPadding=6,
-                    offset=5  # 🔥 DAS verschiebt die Balken nach rechts
-                )
-            ),
-            x=alt.X(
-                "pct:Q",
-                scale=alt.Scale(domain=[0, 100]),
-                title="Abgeschlossene Aufgaben (%)"
-            ),
-            tooltip=[
-                alt.Tooltip("category:N", title="Kategorie"),
-                alt.Tooltip("total:Q", title="Gesamtfragen"),
-                alt.Tooltip("answered:Q", title="Beantwortet"),
-                alt.Tooltip("pct:Q", title="Fortschritt (%)")
-            ]
-        )
-        .properties(
-            height=36 * len(cat_df)
-        )
-    )
-
-    st.altair_chart(chart, width="stretch")
+    st.altair_chart(cached[1], width="stretch")
 
 # ============================================================
 # ❗ TAB 2: Issue melden
@@ -875,15 +862,22 @@ with tabs[1]:
             "description": description.strip()
         }
 
-        # Upload durchführen (existierende Funktion)
+        # In die lokale Outbox schreiben – Upload läuft im Hintergrund
         try:
-            url = upload_issue_to_gist(task_id_input, payload)
-            if url:
-                st.success(f"🎉 Issue gespeichert!")
-                #st.markdown(f"[🔗 Gist ansehen]({url})")
+            if submit_issue(task_id_input, payload):
+                st.success("🎉 Issue gespeichert! Es wird im Hintergrund an GitHub übertragen.")
+            else:
+                st.info("ℹ️ Dieses Issue wurde bereits gemeldet.")
         except Exception as e:
             st.error(f"❌ Fehler beim Speichern: {e}")
 
+    try:
+        pending = get_issue_outbox().pending_count()
+        if pending:
+            st.caption(f"📮 {pending} Issue(s) warten noch auf den Upload.")
+    except Exception:
+        pass
+
 
 # ============================================================
 # 📊 TAB 3: Progress Dashboard
@@ -891,18 +885,10 @@ with tabs[1]:
 with tabs[2]:
     st.header("📊 Progress Dashboard")
 
-    # --- Attempts sicher normalisieren ---
-    attempts_raw = st.session_state.get("attempts", {})
-
-    # attempts kann None, list, str, usw. sein → IMMER in dict casten!
-    if isinstance(attempts_raw, dict):
-        # Keys in int konvertieren
-        attempts = {int(k): v for k, v in attempts_raw.items()}
-    else:
-        attempts = {}
+    progress = st.session_state["progress"]
 
     total_tasks = len(tasks)
-    answered_once = sum(1 for t, c in attempts.items() if c >= 1)
+    answered_once = progress.answered_count()
 
     # --- Overview ---
     st.subheader("🧮 Overview")
@@ -913,11 +899,121 @@ with tabs[2]:
 
     st.markdown("---")
 
+    # --- Review-Forecast bis zur Prüfung ---
+    st.subheader("📅 Review-Forecast")
+
+    today = date.today()
+    days_to_exam = (exam_date - today).days
+    horizon = min(30, days_to_exam) if days_to_exam > 0 else 30
+
+    # pro Session gecacht, neu berechnet nur wenn sich review_data ändert
+    forecast_key = (st.session_state["review_rev"], today, horizon)
+    cached = st.session_state.get("forecast_cache")
+    if cached is None or cached[0] != forecast_key:
+        import pandas as pd
+        import altair as alt
+
+        reviewed = progress.reviewed_ids()
+        counts = forecast_reviews(
+            reviewed,
+            progress.interval[reviewed],
+            progress.last_review[reviewed],
+            progress.rating[reviewed],
+            TASK_CATEGORY,
+            len(CATEGORIES),
+            start_ts=datetime.combine(today, datetime.min.time()).timestamp(),
+            n_days=horizon,
+        )
+        cat_idx, day_idx = np.nonzero(counts)
+        forecast_df = pd.DataFrame({
+            "date": [today + timedelta(days=int(d)) for d in day_idx],
+            "category": [format_category_label(CATEGORIES[c]) for c in cat_idx],
+            "reviews": counts[cat_idx, day_idx],
+        })
+        forecast_chart = (
+            alt.Chart(forecast_df)
+            .mark_bar()
+            .encode(
+                x=alt.X("date:T", title="Datum"),
+                y=alt.Y("sum(reviews):Q", title="Wiederholungen"),
+                color=alt.Color("category:N", title="Kategorie"),
+                tooltip=[
+                    alt.Tooltip("date:T", title="Datum"),
+                    alt.Tooltip("category:N", title="Kategorie"),
+                    alt.Tooltip("reviews:Q", title="Wiederholungen"),
+                ],
+            )
+        )
+        cached = (forecast_key, int(counts.sum()), forecast_chart)
+        st.session_state["forecast_cache"] = cached
+
+    _, total_reviews, forecast_chart = cached
+
+    if not total_reviews:
+        st.info("Noch keine bewerteten Aufgaben – nach der ersten Bewertung erscheint hier der Forecast.")
+    else:
+        if days_to_exam > 0:
+            st.caption(f"Fällige Wiederholungen pro Tag bis zur Prüfung ({horizon} Tage)")
+        else:
+            st.caption(f"Fällige Wiederholungen pro Tag (nächste {horizon} Tage)")
+
+        st.altair_chart(forecast_chart, width="stretch")
+        st.caption(
+            f"Σ {total_reviews} Wiederholungen · Annahme: jede Aufgabe wird am "
+            "Fälligkeitstag wiederholt und bekommt wieder ihre letzte Bewertung."
+        )
+
+    st.markdown("---")
+
     # --- Detailed attempts ---
     st.subheader("📋 Detailed Attempts per Task")
 
-    if attempts:
-        for tid, count in sorted(attempts.items()):
-            st.write(f"• **Task {tid}** → {count}× durchgeführt")
+    # eine einzige Tabelle statt eines Elements pro Aufgabe; DataFrame pro Session gecacht
+    table_key = st.session_state["review_rev"]
+    cached = st.session_state.get("attempts_table_cache")
+    if cached is None or cached[0] != table_key:
+        import pandas as pd
+
+        ids = np.flatnonzero(progress.attempts >= 1)
+        interval = progress.interval[ids]
+        last_review = progress.last_review[ids]
+
+        attempts_df = pd.DataFrame({
+            "Task": ids,
+            "Kategorie": [format_category_label(CATEGORIES[c]) for c in TASK_CATEGORY[ids]],
+            "Versuche": progress.attempts[ids],
+            "Letzte Bewertung": [progress.rating_name(i) for i in ids],
+            "Intervall (Tage)": interval.round(2),
+            "Nächste Wiederholung": pd.to_datetime(last_review + interval * SECONDS_PER_DAY, unit="s"),
+        })
+        cached = (table_key, attempts_df)
+        st.session_state["attempts_table_cache"] = cached
+
+    attempts_df = cached[1]
+
+    if not attempts_df.empty:
+        st.dataframe(
+            attempts_df,
+            hide_index=True,
+            width="stretch",
+            height=400,
+            column_config={
+                "Task": st.column_config.NumberColumn(format="%d"),
+                "Nächste Wiederholung": st.column_config.DatetimeColumn(format="DD.MM.YYYY HH:mm"),
+            },
+        )
+        st.caption("ℹ️ Spaltenköpfe anklicken zum Sortieren, Lupe in der Tabellenleiste zum Filtern.")
     else:
         st.info("Noch keine Aufgaben beantwortet.")
+
+
+# ============================================================
+# 🔮 Nächste Aufgabe vorbereiten (nachdem die Seite steht)
+# ============================================================
+# Wählt die nächste Aufgabe schon jetzt; "Nächste Aufgabe" ist dann nur noch ein
+# Nachschlagen. Alles Weitere (Referenzlösung, Datensätze, Lösungsblock,
+# Referenz-Abschnitt) lädt der Prefetcher im Hintergrund.
+if st.session_state.get("next_pick", (None,))[0] != next_pick_key():
+    upcoming = pick_next_task(current_filtered_tasks())
+    st.session_state["next_pick"] = (next_pick_key(), upcoming["id"])
+    get_prefetcher().warm(upcoming)